@@ -1,18 +1,67 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    HTTPException,
+    status,
+    Depends,
+    Query,
+    Response,
+)
+import time
+from datetime import date
 from typing import Optional, List
-from app.models.flights import FlightSearchRequest, FlightSearchResponse, Flight
+from app.models.flights import (
+    FlightSearchRequest,
+    FlightSearchResponse,
+    BatchFlightSearchRequest,
+    BatchFlightSearchResponse,
+    Flight,
+    FlightSortOption,
+    FlexibleDateSearchRequest,
+    FlexibleDateSearchResponse,
+    PriceCalendarResponse,
+    PriceTrendResponse,
+    ExploreResponse,
+    CabinClass,
+    MultiCitySearchRequest,
+    MultiCitySearchResponse,
+    RoundTripSearchRequest,
+    RoundTripSearchResponse,
+    BookingOptionsResponse,
+    AirportSearchResponse,
+    NearbyAirport,
+    NearbyAirportsResponse,
+)
+from app.geo import airport_tree
+from app.reference import reference
+from app.services.airport_search_service import airport_search_service
+from app.services.booking_service import BookingService
+from app.services.explore_service import ExploreService
 from app.services.flight_service import FlightService
+from app.services.price_calendar_service import PriceCalendarService
+from app.services.price_history_service import PriceHistoryService
+from app.services.itinerary_service import ItineraryService
+from app.services.search_session_service import SearchSessionService
 from app.api.deps import validate_search_params
+from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 flight_service = FlightService()
+price_calendar_service = PriceCalendarService()
+price_history_service = PriceHistoryService()
+itinerary_service = ItineraryService(flight_service)
+search_session_service = SearchSessionService()
+booking_service = BookingService()
+explore_service = ExploreService()
 
 
 @router.post("/search", response_model=FlightSearchResponse)
 async def search_flights(
-    search_request: FlightSearchRequest, _: dict = Depends(validate_search_params)
+    search_request: FlightSearchRequest,
+    background_tasks: BackgroundTasks,
+    _: dict = Depends(validate_search_params),
 ):
     """
     Search for flight deals
@@ -27,6 +76,17 @@ async def search_flights(
     - **cabin_class**: economy, premium_economy, business, or first
     - **max_price**: Maximum price filter in USD
     - **direct_flights_only**: Search for direct flights only
+    - **airlines**: Only include flights operated by these airline codes
+    - **departure_time_from/to**: Local departure time window (HH:MM)
+    - **arrival_time_from/to**: Local arrival time window (HH:MM)
+    - **max_duration_minutes**: Maximum total trip duration
+    - **max_stops**: Maximum number of stops (0-3)
+    - **sort_by**: best (default), price, duration or departure_time
+    - **nearby_airports**: Also price up to this many airports near each end (0-5)
+    - **nearby_radius_km**: How far those airports may be (default 150 km)
+
+    Filters and sort order are applied to the cached provider result set, so
+    changing them does not trigger a new provider search.
     """
     try:
         logger.info(
@@ -39,6 +99,9 @@ async def search_flights(
             logger.warning(
                 f"No flights found for {search_request.origin} -> {search_request.destination}"
             )
+        elif settings.booking_prefetch_count:
+            # Resolve booking options for the top results after responding
+            background_tasks.add_task(booking_service.prefetch, response.flights)
 
         return response
 
@@ -71,6 +134,36 @@ async def search_flights_get(
     cabin_class: str = Query("economy", description="Cabin class"),
     max_price: Optional[float] = Query(None, gt=0, description="Maximum price in USD"),
     direct_flights_only: bool = Query(False, description="Direct flights only"),
+    airlines: Optional[str] = Query(
+        None, description="Comma-separated airline IATA codes (e.g. 'AA,DL')"
+    ),
+    departure_time_from: Optional[str] = Query(
+        None, description="Earliest departure time (HH:MM)"
+    ),
+    departure_time_to: Optional[str] = Query(
+        None, description="Latest departure time (HH:MM)"
+    ),
+    arrival_time_from: Optional[str] = Query(
+        None, description="Earliest arrival time (HH:MM)"
+    ),
+    arrival_time_to: Optional[str] = Query(
+        None, description="Latest arrival time (HH:MM)"
+    ),
+    max_duration_minutes: Optional[int] = Query(
+        None, gt=0, description="Maximum trip duration in minutes"
+    ),
+    max_stops: Optional[int] = Query(None, ge=0, le=3, description="Maximum stops"),
+    sort_by: FlightSortOption = Query(
+        FlightSortOption.BEST,
+        description="Sort order: price, duration, departure_time or best",
+    ),
+    nearby_airports: int = Query(
+        0, ge=0, le=5, description="Also price this many nearby airports per end"
+    ),
+    nearby_radius_km: int = Query(
+        150, ge=10, le=500, description="How far nearby airports may be"
+    ),
+    background_tasks: BackgroundTasks = None,
 ):
     """
     Search for flights using GET parameters (for easy URL sharing and caching)
@@ -94,9 +187,19 @@ async def search_flights_get(
             cabin_class=cabin_class,
             max_price=max_price,
             direct_flights_only=direct_flights_only,
+            airlines=airlines.split(",") if airlines else None,
+            departure_time_from=departure_time_from,
+            departure_time_to=departure_time_to,
+            arrival_time_from=arrival_time_from,
+            arrival_time_to=arrival_time_to,
+            max_duration_minutes=max_duration_minutes,
+            max_stops=max_stops,
+            sort_by=sort_by,
+            nearby_airports=nearby_airports,
+            nearby_radius_km=nearby_radius_km,
         )
 
-        return await search_flights(search_request)
+        return await search_flights(search_request, background_tasks)
 
     except ValueError as e:
         raise HTTPException(
@@ -105,36 +208,359 @@ async def search_flights_get(
         )
 
 
+@router.post("/search/batch", response_model=BatchFlightSearchResponse)
+async def search_flights_batch(batch_request: BatchFlightSearchRequest):
+    """
+    Run several flight searches in one request
+
+    - **searches**: 1-20 searches, each with the same fields as `/search`
+    - **limit**: Flights returned per search (1-50, default 10)
+
+    Results come back in request order as `{result}` items, each with its own
+    search_id; a search whose providers failed comes back as `{error}`
+    without failing the rest. Searches that share a route, date and
+    passengers are fetched once, cached routes are read in a single cache
+    round trip, and the rest are fetched concurrently.
+    """
+    try:
+        start_time = time.time()
+        logger.info(f"Batch flight search: {len(batch_request.searches)} searches")
+        results = await flight_service.search_flights_batch(
+            batch_request.searches, batch_request.limit
+        )
+        return BatchFlightSearchResponse(
+            results=results,
+            search_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    except ValueError as e:
+        logger.error(f"Validation error in batch flight search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in batch flight search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during batch flight search",
+        )
+
+
+@router.post("/search/flexible", response_model=FlexibleDateSearchResponse)
+async def search_flights_flexible(search_request: FlexibleDateSearchRequest):
+    """
+    Search a window of dates around the departure date in one request
+
+    Accepts the same fields as `/search` plus **flexible_days** (1-7). Returns
+    the cheapest fare for each day in the window and the best flights across
+    it. Cached days are reused; only missing days are fetched from providers.
+    """
+    try:
+        logger.info(
+            f"Flexible flight search: {search_request.origin} -> {search_request.destination} "
+            f"on {search_request.departure_date} ±{search_request.flexible_days} days"
+        )
+        return await flight_service.search_flexible_dates(search_request)
+
+    except ValueError as e:
+        logger.error(f"Validation error in flexible flight search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in flexible flight search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during flexible flight search",
+        )
+
+
+@router.post("/search/multi-city", response_model=MultiCitySearchResponse)
+async def search_multi_city(search_request: MultiCitySearchRequest):
+    """
+    Search a multi-city or open-jaw trip
+
+    - **legs**: 2-6 legs, each with origin, destination and departure_date
+    - **min_connection_minutes**: Minimum gap between landing and the next leg
+    - **max_results**: Number of cheapest itineraries to return (1-50)
+
+    Legs are searched concurrently through the cached flight search and
+    combined into the cheapest valid itineraries.
+    """
+    try:
+        route = " -> ".join(
+            [search_request.legs[0].origin]
+            + [leg.destination for leg in search_request.legs]
+        )
+        logger.info(f"Multi-city flight search: {route}")
+        return await itinerary_service.search_multi_city(search_request)
+
+    except ValueError as e:
+        logger.error(f"Validation error in multi-city search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in multi-city search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during multi-city search",
+        )
+
+
+@router.post("/search/round-trip", response_model=RoundTripSearchResponse)
+async def search_round_trip(search_request: RoundTripSearchRequest):
+    """
+    Compose round trips from one-way outbound and return searches
+
+    Accepts the `/search` fields (return_date required) plus:
+    - **min_stay_hours**: Minimum time at the destination
+    - **max_results**: Number of cheapest pairs to return (1-50)
+
+    **max_price** caps the round-trip total. Both legs reuse cached one-way
+    searches.
+    """
+    try:
+        logger.info(
+            f"Round-trip search: {search_request.origin} <-> {search_request.destination} "
+            f"{search_request.departure_date} / {search_request.return_date}"
+        )
+        return await itinerary_service.compose_round_trip(search_request)
+
+    except ValueError as e:
+        logger.error(f"Validation error in round-trip search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in round-trip search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during round-trip search",
+        )
+
+
+@router.get("/calendar", response_model=PriceCalendarResponse)
+async def get_price_calendar(
+    origin: str = Query(
+        ..., description="Origin airport IATA code", min_length=3, max_length=3
+    ),
+    destination: str = Query(
+        ..., description="Destination airport IATA code", min_length=3, max_length=3
+    ),
+    month: str = Query(..., description="Calendar month (YYYY-MM)"),
+):
+    """
+    Get the lowest known one-way fare for each day of a month
+
+    Backed by one bulk provider call per route-month, cached and refreshed
+    incrementally - no live searches are run.
+    """
+    try:
+        month_start = date.fromisoformat(f"{month}-01")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid month format. Use YYYY-MM",
+        )
+
+    try:
+        return await price_calendar_service.get_calendar(
+            origin, destination, month_start
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in price calendar: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while loading price calendar",
+        )
+
+
+@router.get("/price-trend", response_model=PriceTrendResponse)
+async def get_price_trend(
+    origin: str = Query(
+        ..., description="Origin airport IATA code", min_length=3, max_length=3
+    ),
+    destination: str = Query(
+        ..., description="Destination airport IATA code", min_length=3, max_length=3
+    ),
+    departure_date: date = Query(..., description="Departure date (YYYY-MM-DD)"),
+    cabin_class: CabinClass = Query(CabinClass.ECONOMY, description="Cabin class"),
+    airline: Optional[str] = Query(
+        None, description="Validating airline IATA code", min_length=2, max_length=3
+    ),
+    resolution: str = Query("daily", pattern="^(hourly|daily)$"),
+    days: int = Query(30, ge=1, le=365, description="How far back to look"),
+):
+    """
+    Get how the lowest one-way fare for a departure date has moved
+
+    Read from downsampled price history recorded by live searches - no
+    provider calls. Includes a low/typical/high hint for the latest price.
+    """
+    if resolution == "hourly" and days > 30:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Hourly price history is kept for 30 days",
+        )
+
+    try:
+        return await price_history_service.get_trend(
+            origin,
+            destination,
+            departure_date,
+            cabin_class,
+            airline,
+            resolution,
+            days,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in price trend: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while loading price trend",
+        )
+
+
+@router.get("/explore", response_model=ExploreResponse)
+async def explore_destinations(
+    response: Response,
+    origin: str = Query(
+        ..., description="Origin airport or metro code", min_length=3, max_length=3
+    ),
+    month: str = Query(..., description="Departure month (YYYY-MM)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum destinations"),
+):
+    """
+    Get the cheapest destinations from an origin in a month
+
+    Read from a precomputed index of the cheapest fares seen by live
+    searches and warming jobs - a single cache read, no provider calls.
+    """
+    try:
+        month_start = date.fromisoformat(f"{month}-01")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid month format. Use YYYY-MM",
+        )
+
+    try:
+        result = await explore_service.cheapest_destinations(origin, month_start, limit)
+    except Exception as e:
+        logger.error(f"Unexpected error in explore: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while loading destinations",
+        )
+
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return result
+
+
+@router.get("/search/{search_id}", response_model=FlightSearchResponse)
+async def get_search_session(search_id: str):
+    """
+    Get a previous search response by its search_id (for sharing and reloads)
+
+    Sessions are kept for an hour; the search is not re-run.
+    """
+    session = await search_session_service.get_session(search_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Search not found or expired",
+        )
+    return session["response"]
+
+
 @router.get("/{flight_id}", response_model=Flight)
 async def get_flight_details(flight_id: str):
     """
     Get details for a specific flight by ID
+
+    Flight IDs are content-addressed and resolved from the search session
+    store, so any flight returned by a recent search can be looked up.
     """
-    # This would typically fetch from database or cache
-    # For now, return a 404 as this is a placeholder
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Flight details endpoint not implemented",
-    )
+    flight = await search_session_service.get_flight(flight_id)
+    if not flight:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flight not found or expired",
+        )
+    return flight
+
+
+@router.get("/{flight_id}/booking-options", response_model=BookingOptionsResponse)
+async def get_booking_options(flight_id: str):
+    """
+    Get booking offers (airline or agency, price, link) for a flight
+
+    Google Flights offers are resolved from the flight's booking token once
+    and cached; simultaneous requests for the same flight share one lookup.
+    """
+    try:
+        response = await booking_service.get_booking_options(flight_id)
+    except Exception as e:
+        logger.error(f"Unexpected error resolving booking options: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while loading booking options",
+        )
+
+    if not response:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flight not found or expired",
+        )
+    return response
 
 
-@router.get("/airports/search")
+@router.get("/airports/search", response_model=AirportSearchResponse)
 async def search_airports(
-    query: str = Query(..., min_length=2, description="Airport name or city"),
+    response: Response,
+    query: str = Query(..., min_length=2, description="Airport name, city or code"),
     limit: int = Query(10, ge=1, le=50, description="Maximum results"),
 ):
     """
-    Search for airports by name or city (for autocomplete)
-    """
-    # This would typically use a local airport database
-    # For now, return a placeholder response
-    return {
-        "airports": [
-            {
-                "code": "JFK",
-                "name": "John F. Kennedy International Airport",
-                "city": "New York",
-                "country": "United States",
-            }
+    Search for airports by code, city or name (for autocomplete)
+
+    Matches word prefixes and tolerates small typos; metro codes such as NYC
+    are returned alongside their airports. Served from an in-memory index of
+    the bundled airport data, so responses are cacheable for a day.
+    """
+    response.headers["Cache-Control"] = (
+        "public, max-age=86400, stale-while-revalidate=604800"
+    )
+    return AirportSearchResponse(airports=airport_search_service.search(query, limit))
+
+
+@router.get("/airports/nearby", response_model=NearbyAirportsResponse)
+async def nearby_airports(
+    response: Response,
+    code: str = Query(
+        ..., min_length=3, max_length=3, description="Airport or metro IATA code"
+    ),
+    radius_km: float = Query(150, gt=0, le=1000, description="Search radius in km"),
+    limit: int = Query(5, ge=1, le=20, description="Maximum results"),
+):
+    """
+    Airports within driving distance of an airport or metro area, nearest first
+    """
+    if reference.coordinates(code) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown airport code: {code.upper()}",
+        )
+
+    response.headers["Cache-Control"] = (
+        "public, max-age=86400, stale-while-revalidate=604800"
+    )
+    return NearbyAirportsResponse(
+        airports=[
+            NearbyAirport(
+                **reference.to_airport(nearby_code).model_dump(), distance_km=km
+            )
+            for nearby_code, km in airport_tree.nearby(code, radius_km, limit)
         ]
-    }
+    )
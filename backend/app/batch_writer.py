@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.database import supabase
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchTableWriter:
+    """
+    Buffered background inserts into one Supabase table.
+
+    ``write`` only puts the row on a bounded in-memory queue, so analytics
+    never add latency to a request. A single flusher task inserts queued rows
+    in batches of ``batch_size``, or whatever has queued up once
+    ``flush_interval_ms`` has passed. When the queue is full new rows are
+    dropped and counted rather than blocking the caller. The Supabase client
+    is synchronous, so each batch insert runs in a worker thread. ``stop``
+    lets the flusher finish its current batch and drain the queue before
+    shutdown.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
+        self.table = table
+        self.batch_size = batch_size or settings.log_batch_size
+        self.flush_interval = (
+            flush_interval_ms or settings.log_flush_interval_ms
+        ) / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max_queue or settings.log_queue_size
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def write(self, row: Dict[str, Any]) -> bool:
+        """Queue a row for insertion; returns False if it was dropped"""
+        if supabase is None:
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(
+                    f"{self.table} writer queue full, {self.dropped} rows dropped so far"
+                )
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    async def start(self):
+        if self._task is None and supabase is not None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher once it has inserted everything still queued"""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        # Rows written while the flusher was finishing
+        await self.flush()
+        logger.info(f"{self.table} writer stopped: {self.stats()}")
+
+    async def flush(self):
+        """Insert every queued row now"""
+        while not self._queue.empty():
+            await self._insert(self._take(self.batch_size))
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _next_row(self, timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+        """
+        The next queued row, or None on timeout or once stopping with the
+        queue empty
+        """
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if self._stopping.is_set():
+            return None
+        get = asyncio.ensure_future(self._queue.get())
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        done, pending = await asyncio.wait(
+            {get, stopping}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        return get.result() if get in done else None
+
+    async def _run(self):
+        while True:
+            # Wait for the first row, then give the batch until the deadline to fill
+            row = await self._next_row(None)
+            if row is None:
+                return
+            rows = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                row = await self._next_row(remaining)
+                if row is None:
+                    break
+                rows.append(row)
+                rows.extend(self._take(self.batch_size - len(rows)))
+            await self._insert(rows)
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(
+                lambda: supabase.table(self.table).insert(rows).execute()
+            )
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Failed to insert {len(rows)} rows into {self.table}: {e}")
+
+
+search_log_writer = BatchTableWriter("search_logs")
+price_history_writer = BatchTableWriter("route_price_observations")
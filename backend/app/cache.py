@@ -1,7 +1,7 @@
 import redis.asyncio as redis
 import json
 import hashlib
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from app.config import settings
 import logging
 
@@ -48,6 +48,17 @@ class RedisCache:
             logger.error(f"Cache get error: {e}")
             return None
 
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Fetch several keys in one round trip; misses come back as None"""
+        if not self.redis_client or not keys:
+            return [None] * len(keys)
+        try:
+            results = await self.redis_client.mget(keys)
+            return [json.loads(result) if result else None for result in results]
+        except Exception as e:
+            logger.error(f"Cache mget error: {e}")
+            return [None] * len(keys)
+
     async def set(self, key: str, value: Any, ttl: int = None) -> bool:
         if not self.redis_client:
             return False
@@ -59,6 +70,168 @@ class RedisCache:
             logger.error(f"Cache set error: {e}")
             return False
 
+    async def set_many(self, values: Dict[str, Any], ttl: int = None) -> bool:
+        """Write several keys with the same expiry in one pipelined round trip"""
+        if not self.redis_client or not values:
+            return False
+        try:
+            ttl = ttl or settings.cache_ttl
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.setex(key, ttl, json.dumps(value, default=str))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        """Read a whole hash; values are returned as raw strings"""
+        if not self.redis_client:
+            return {}
+        try:
+            return await self.redis_client.hgetall(key)
+        except Exception as e:
+            logger.error(f"Cache hgetall error: {e}")
+            return {}
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: int = None) -> bool:
+        """Merge fields into a hash and refresh its expiry"""
+        if not self.redis_client or not mapping:
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ttl or settings.cache_ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache hset error: {e}")
+            return False
+
+    async def replace_hash(
+        self, key: str, mapping: Dict[str, Any], ttl: int = None
+    ) -> bool:
+        """Atomically swap a hash's fields for ``mapping`` and set its expiry"""
+        if not self.redis_client or not mapping:
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ttl or settings.cache_ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache replace_hash error: {e}")
+            return False
+
+    async def update_field(
+        self,
+        key: str,
+        field: str,
+        update: Callable[[Optional[str]], str],
+        ttl: int = None,
+        retries: int = 5,
+    ) -> bool:
+        """
+        Read-modify-write one hash field atomically and refresh the expiry.
+
+        ``update`` maps the current value (None if unset) to the new one. The
+        key is WATCHed, so if another client changes it in between, the
+        transaction is retried with the fresh value.
+        """
+        if not self.redis_client:
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                for _ in range(retries):
+                    try:
+                        await pipe.watch(key)
+                        value = update(await pipe.hget(key, field))
+                        pipe.multi()
+                        pipe.hset(key, field, value)
+                        pipe.expire(key, ttl or settings.cache_ttl)
+                        await pipe.execute()
+                        return True
+                    except redis.WatchError:
+                        continue
+            logger.warning(f"Cache update of {key} gave up after {retries} conflicts")
+            return False
+        except Exception as e:
+            logger.error(f"Cache update error: {e}")
+            return False
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """Increment a hash field; returns the new value, or None without Redis"""
+        if not self.redis_client:
+            return None
+        try:
+            return await self.redis_client.hincrby(key, field, amount)
+        except Exception as e:
+            logger.error(f"Cache hincrby error: {e}")
+            return None
+
+    async def claim(self, key: str, ttl: int) -> bool:
+        """Set a marker key only if it doesn't exist (SET NX); True if this call set it"""
+        if not self.redis_client:
+            return True
+        try:
+            return bool(await self.redis_client.set(key, "1", ex=ttl, nx=True))
+        except Exception as e:
+            logger.error(f"Cache claim error: {e}")
+            return True
+
+    async def zadd(
+        self,
+        key: str,
+        mapping: Dict[str, float],
+        ttl: int = None,
+        only_lower: bool = False,
+    ) -> bool:
+        """
+        Set sorted-set scores and refresh the key's expiry.
+
+        With ``only_lower`` an existing member's score only ever decreases
+        (ZADD LT); new members are always added.
+        """
+        if not self.redis_client or not mapping:
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, mapping, lt=only_lower)
+                pipe.expire(key, ttl or settings.cache_ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache zadd error: {e}")
+            return False
+
+    async def zrange_with_scores(
+        self, key: str, start: int = 0, end: int = -1
+    ) -> List[Tuple[str, float]]:
+        """Members by ascending score as (member, score)"""
+        if not self.redis_client:
+            return []
+        try:
+            return await self.redis_client.zrange(key, start, end, withscores=True)
+        except Exception as e:
+            logger.error(f"Cache zrange error: {e}")
+            return []
+
+    async def zscores(self, items: List[Tuple[str, str]]) -> List[Optional[float]]:
+        """Scores of several (key, member) pairs in one round trip"""
+        if not self.redis_client or not items:
+            return [None] * len(items)
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, member in items:
+                    pipe.zscore(key, member)
+                return await pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache zscore error: {e}")
+            return [None] * len(items)
+
     async def delete(self, key: str) -> bool:
         if not self.redis_client:
             return False
@@ -18,6 +18,55 @@ class Settings(BaseSettings):
     # Redis Cache
     redis_url: Optional[str] = None
     cache_ttl: int = 300  # 5 minutes for search results
+    search_session_ttl: int = 3600  # Keep search sessions and flights for 1 hour
+
+    # Booking options (Google Flights booking_token lookups)
+    booking_options_ttl: int = 1800  # Resolved offers live as long as the token
+    # Resolve the top N results after each search; each costs one SerpAPI call
+    booking_prefetch_count: int = 0
+
+    # Provider fan-out
+    provider_concurrency: int = 4  # Max concurrent provider calls per request
+
+    # "Best" flight ranking weights (lower composite score ranks first)
+    ranking_price_weight: float = 1.0  # Per multiple of the cheapest price
+    ranking_duration_weight: float = 0.5  # Per multiple of the shortest duration
+    ranking_stops_weight: float = 0.25  # Per stop
+    ranking_dominated_penalty: float = 0.1  # Flights off the Pareto front
+    ranking_recommended_bonus: float = 0.05  # Provider's own "best" picks
+
+    # Currency normalization
+    fx_rates_url: Optional[str] = None  # JSON {"base", "rates"} endpoint
+    fx_rates_file: Optional[str] = None  # Defaults to the bundled app/data snapshot
+    fx_refresh_interval: int = 3600  # Reload rates hourly
+
+    # Analytics logging (search_logs and price history batch writers)
+    log_queue_size: int = 10000  # Rows buffered before new ones are dropped
+    log_batch_size: int = 500  # Rows per batch insert
+    log_flush_interval_ms: int = 1000  # Max time a row waits for its batch
+
+    # Price calendar
+    price_calendar_refresh: int = 21600  # Refetch a route-month after 6 hours
+    price_calendar_ttl: int = 604800  # Keep route-month calendars for 7 days
+
+    # Explore index (cheapest fare per origin, destination city and month)
+    explore_ttl: int = 2592000  # Drop an origin-month after 30 days without writes
+    explore_home_origin: str = "NYC"  # Origin for destination pages' flight prices
+    explore_price_months: int = 3  # Months ahead to take the cheapest fare from
+
+    # Negative route index (skip providers for routes that keep returning nothing)
+    negative_route_threshold: int = 3  # Empty answers in a row before skipping
+    negative_route_backoff: int = 21600  # First skip window: 6 hours
+    negative_route_max_backoff: int = 604800  # Re-probe at least weekly
+    negative_route_probe_lock: int = 120  # One re-probe per route at a time
+
+    # Price history
+    price_trend_cache_ttl: int = 300  # Buckets are refreshed every 5 minutes
+    price_sketch_compression: int = 100  # t-digest size/accuracy trade-off
+    price_sketch_ttl: int = 10368000  # Keep route-month fare sketches 120 days
+    price_sketch_refresh: int = 300  # Re-merge workers' sketches every 5 minutes
+    price_sketch_min_count: int = 200  # Prices seen before results get deal labels
+    price_sketch_flush_interval: int = 10  # Fold queued fares into Redis this often
 
     # External APIs
     kiwi_api_key: Optional[str] = None
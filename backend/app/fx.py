@@ -0,0 +1,153 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import os
+import time
+from typing import Any, Dict, Optional
+import httpx
+import numpy as np
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES_FILE = os.path.join(os.path.dirname(__file__), "data", "fx_rates.json")
+BASE_CURRENCY = "USD"
+
+
+def _parse_rates(payload: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Read ``{"base": "EUR", "rates": {"USD": 1.08, ...}}`` as units per USD.
+
+    Rates quoted against another base are rebased onto USD.
+    """
+    rates = {
+        code.upper(): float(rate)
+        for code, rate in payload["rates"].items()
+        if float(rate) > 0
+    }
+    base = payload.get("base", BASE_CURRENCY).upper()
+    rates[base] = 1.0
+    if base != BASE_CURRENCY:
+        per_usd = rates[BASE_CURRENCY]
+        rates = {code: rate / per_usd for code, rate in rates.items()}
+    return rates
+
+
+class RateSource(ABC):
+    """Where exchange rates come from; ``fetch`` returns units per USD"""
+
+    @abstractmethod
+    async def fetch(self) -> Dict[str, float]: ...
+
+
+class FileRateSource(RateSource):
+    """Rates from a local JSON file (the bundled snapshot by default)"""
+
+    def __init__(self, path: str = DEFAULT_RATES_FILE):
+        self.path = path
+
+    def read(self) -> Dict[str, float]:
+        with open(self.path) as f:
+            return _parse_rates(json.load(f))
+
+    async def fetch(self) -> Dict[str, float]:
+        return self.read()
+
+
+class HttpRateSource(RateSource):
+    """Rates from a JSON endpoint using the same ``base``/``rates`` shape"""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def fetch(self) -> Dict[str, float]:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            return _parse_rates(response.json())
+
+
+class FxRates:
+    """
+    Exchange rates for normalizing prices to USD.
+
+    Rates live in memory as a currency -> units-per-USD dict, loaded from a
+    pluggable RateSource at startup and refreshed in the background every
+    ``settings.fx_refresh_interval`` seconds. A failed refresh keeps the
+    previous rates. Without the app lifespan (scripts), the bundled snapshot
+    is loaded on first use.
+    """
+
+    def __init__(self, source: Optional[RateSource] = None):
+        self.source = source
+        self.rates: Dict[str, float] = {}
+        self.updated_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _default_source(self) -> RateSource:
+        if settings.fx_rates_url:
+            return HttpRateSource(settings.fx_rates_url)
+        return FileRateSource(settings.fx_rates_file or DEFAULT_RATES_FILE)
+
+    async def refresh(self) -> bool:
+        """Reload rates from the source; returns False and keeps the old ones on failure"""
+        source = self.source or self._default_source()
+        try:
+            rates = await source.fetch()
+        except Exception as e:
+            logger.error(f"FX rate refresh failed: {e}")
+            return False
+
+        self.rates = rates
+        self.updated_at = time.time()
+        logger.info(f"FX rates loaded: {len(rates)} currencies")
+        return True
+
+    async def start(self):
+        """Load rates and schedule the periodic refresh"""
+        await self.refresh()
+        if settings.fx_refresh_interval > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.fx_refresh_interval)
+            await self.refresh()
+
+    def _ensure_loaded(self):
+        if not self.rates:
+            self.rates = FileRateSource().read()
+            self.updated_at = time.time()
+
+    def rate(self, currency: str) -> Optional[float]:
+        """Units of ``currency`` per USD, or None if unknown"""
+        self._ensure_loaded()
+        return self.rates.get((currency or "").strip().upper())
+
+    def to_usd(self, amount: float, currency: str) -> Optional[float]:
+        rate = self.rate(currency)
+        return round(amount / rate, 2) if rate else None
+
+    def to_usd_array(self, amounts: np.ndarray, currencies: np.ndarray) -> np.ndarray:
+        """
+        Convert a whole column of prices at once.
+
+        Looks up each distinct currency once; unknown currencies give NaN.
+        """
+        self._ensure_loaded()
+        if not len(amounts):
+            return np.zeros(0, dtype=np.float64)
+        codes, inverse = np.unique(currencies, return_inverse=True)
+        per_usd = np.array(
+            [self.rates.get(str(code).strip().upper(), np.nan) for code in codes]
+        )
+        return np.round(np.asarray(amounts, dtype=np.float64) / per_usd[inverse], 2)
+
+
+fx = FxRates()
@@ -0,0 +1,244 @@
+import math
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from app.reference import ReferenceIndex, reference
+import logging
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+# Block time = fixed taxi/climb/descent overhead + distance at cruise speed
+BLOCK_OVERHEAD_MINUTES = 30
+CRUISE_SPEED_KMH = 820.0
+BLOCK_ROUNDING_MINUTES = 5
+DEFAULT_BLOCK_MINUTES = 240  # Used when either airport is unknown
+
+
+def haversine_km(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance in km; broadcasts over NumPy arrays of degrees"""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class RouteMatrix:
+    """
+    Airport-pair distance and estimated block-time matrix.
+
+    Built from the reference index coordinates with one vectorized haversine
+    on first use and kept for the life of the process (about 0.5 MB for a
+    few hundred airports), so an estimate is two dict hits and an array
+    lookup. Metro codes resolve to their busiest airport.
+    """
+
+    def __init__(self, reference_index: ReferenceIndex = reference):
+        self.reference = reference_index
+        self._distance: Optional[np.ndarray] = None
+        self._block: Optional[np.ndarray] = None
+
+    def _ensure_built(self):
+        if self._distance is not None and len(self._distance) == len(
+            self.reference.codes
+        ):
+            return
+        self.reference._ensure_loaded()
+        lat, lon = self.reference.latitude, self.reference.longitude
+        distance = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+        block = BLOCK_OVERHEAD_MINUTES + distance / CRUISE_SPEED_KMH * 60
+        block = np.round(block / BLOCK_ROUNDING_MINUTES) * BLOCK_ROUNDING_MINUTES
+        np.fill_diagonal(block, 0)
+
+        self._distance = distance.astype(np.float32)
+        self._block = block.astype(np.int16)
+        logger.info(f"Route matrix built for {len(distance)} airports")
+
+    def _pair(self, origin: str, destination: str) -> Optional[Tuple[int, int]]:
+        self._ensure_built()
+        origin_row = self.reference._primary_row(origin)
+        destination_row = self.reference._primary_row(destination)
+        if origin_row is None or destination_row is None:
+            return None
+        return origin_row, destination_row
+
+    def distance_km(self, origin: str, destination: str) -> Optional[float]:
+        pair = self._pair(origin, destination)
+        return float(self._distance[pair]) if pair else None
+
+    def block_minutes(
+        self, origin: str, destination: str, default: int = DEFAULT_BLOCK_MINUTES
+    ) -> int:
+        """Estimated gate-to-gate time, or ``default`` for unknown airports"""
+        pair = self._pair(origin, destination)
+        return int(self._block[pair]) if pair else default
+
+    def estimate_arrival(
+        self, origin: str, destination: str, departure: datetime
+    ) -> Tuple[datetime, int]:
+        """
+        Estimated local arrival time and block minutes for a local departure.
+
+        Crosses midnight and time zones correctly; if either time zone is
+        unknown the arrival is departure + block time.
+        """
+        minutes = self.block_minutes(origin, destination)
+        arrival = departure + timedelta(minutes=minutes)
+        origin_tz = self.reference.timezone(origin)
+        destination_tz = self.reference.timezone(destination)
+        if origin_tz and destination_tz and departure.tzinfo is None:
+            try:
+                arrival = (
+                    (
+                        departure.replace(tzinfo=ZoneInfo(origin_tz))
+                        + timedelta(minutes=minutes)
+                    )
+                    .astimezone(ZoneInfo(destination_tz))
+                    .replace(tzinfo=None)
+                )
+            except ZoneInfoNotFoundError:
+                pass
+        return arrival, minutes
+
+
+def _unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Points on the unit sphere; chord length grows with great-circle distance"""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+    )
+
+
+class AirportKDTree:
+    """
+    KD-tree over airport coordinates for radius queries.
+
+    Airports are stored as 3D unit vectors so a great-circle radius becomes
+    a straight-line (chord) bound with no wrap-around at the antimeridian.
+    The tree is implicit: ``_order`` is permuted so every subtree is a
+    contiguous slice with its splitting point in the middle, and leaves of
+    up to ``LEAF_SIZE`` points are scanned directly.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, reference_index: ReferenceIndex = reference):
+        self.reference = reference_index
+        self._points: Optional[np.ndarray] = None
+        self._order = np.zeros(0, dtype=np.int64)
+        self._axis = np.zeros(0, dtype=np.int8)
+
+    def _ensure_built(self):
+        if self._points is not None and len(self._points) == len(self.reference.codes):
+            return
+        self.reference._ensure_loaded()
+        self._points = _unit_vectors(self.reference.latitude, self.reference.longitude)
+        self._order = np.arange(len(self._points))
+        self._axis = np.zeros(len(self._points), dtype=np.int8)
+        self._build(0, len(self._points))
+        self._tree_rows: List[int] = self._order.tolist()
+        self._tree_points = [tuple(p) for p in self._points[self._order].tolist()]
+        self._tree_axis: List[int] = self._axis.tolist()
+
+    def _build(self, lo: int, hi: int):
+        if hi - lo <= self.LEAF_SIZE:
+            return
+        rows = self._order[lo:hi]
+        points = self._points[rows]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        mid = (lo + hi) // 2
+        self._order[lo:hi] = rows[np.argpartition(points[:, axis], mid - lo)]
+        self._axis[mid] = axis
+        self._build(lo, mid)
+        self._build(mid + 1, hi)
+
+    def within(
+        self, latitude: float, longitude: float, radius_km: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Reference rows within ``radius_km`` of a point as (row, km), nearest first"""
+        self._ensure_built()
+        if radius_km is None:
+            max_chord = 2.0
+        else:
+            max_chord = 2 * math.sin(
+                min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)
+            )
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        query = (
+            math.cos(lat) * math.cos(lon),
+            math.cos(lat) * math.sin(lon),
+            math.sin(lat),
+        )
+        found: List[Tuple[int, float]] = []
+        self._search(0, len(self._tree_points), query, max_chord * max_chord, found)
+
+        found.sort(key=lambda item: item[1])
+        return [
+            (
+                row,
+                round(2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(d2) / 2, 1.0)), 1),
+            )
+            for row, d2 in found
+        ]
+
+    def _search(self, lo: int, hi: int, query, max_d2: float, found):
+        # Plain floats: for a handful of points per node this beats NumPy calls
+        qx, qy, qz = query
+        points = self._tree_points
+        if hi - lo <= self.LEAF_SIZE:
+            for i in range(lo, hi):
+                x, y, z = points[i]
+                d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                if d2 <= max_d2:
+                    found.append((self._tree_rows[i], d2))
+            return
+
+        mid = (lo + hi) // 2
+        x, y, z = points[mid]
+        d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+        if d2 <= max_d2:
+            found.append((self._tree_rows[mid], d2))
+
+        axis = self._tree_axis[mid]
+        offset = query[axis] - points[mid][axis]
+        if offset <= 0:
+            near, far = (lo, mid), (mid + 1, hi)
+        else:
+            near, far = (mid + 1, hi), (lo, mid)
+        self._search(*near, query, max_d2, found)
+        if offset * offset <= max_d2:
+            self._search(*far, query, max_d2, found)
+
+    def nearby(
+        self,
+        code: str,
+        radius_km: Optional[float] = None,
+        limit: int = 5,
+        exclude: Sequence[str] = (),
+    ) -> List[Tuple[str, float]]:
+        """
+        Other airports near an airport or metro area as (code, km), nearest first.
+
+        A metro's own airports are never returned for it; ``exclude`` drops
+        further codes.
+        """
+        coordinates = self.reference.coordinates(code)
+        if coordinates is None:
+            return []
+        skip = {code.upper(), *self.reference.expand(code), *exclude}
+        results = []
+        for row, km in self.within(*coordinates, radius_km):
+            if self.reference.codes[row] not in skip:
+                results.append((self.reference.codes[row], km))
+                if len(results) == limit:
+                    break
+        return results
+
+
+routes = RouteMatrix()
+airport_tree = AirportKDTree()
@@ -6,11 +6,10 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
-    Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -213,26 +212,13 @@ class AmadeusAPI:
             flight_number = f"{airline_code}{segment_data.get('number', '')}"
 
             return FlightSegment(
-                origin=Airport(
-                    code=origin_code,
-                    name=departure.get("terminal", ""),
-                    city="",
-                    country="",
-                ),
-                destination=Airport(
-                    code=dest_code,
-                    name=arrival.get("terminal", ""),
-                    city="",
-                    country="",
-                ),
+                origin=reference.to_airport(origin_code),
+                destination=reference.to_airport(dest_code),
                 departure_time=dep_time,
                 arrival_time=arr_time,
                 duration_minutes=duration_minutes,
                 flight_number=flight_number,
-                airline=Airline(
-                    code=airline_code,
-                    name=airline_code,  # Would need airline lookup for full name
-                ),
+                airline=reference.to_airline(airline_code),
                 cabin_class=cabin_class,
                 booking_class=segment_data.get("pricingDetailPerAdult", {}).get(
                     "fareClass", ""
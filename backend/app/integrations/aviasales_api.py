@@ -5,11 +5,10 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
-    Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -83,10 +82,9 @@ class AviasalesAPI:
             duration_to = int(item.get("duration_to", 0))
             duration_back = int(item.get("duration_back", 0))
 
-            # Minimal Airport/Airline info (expand as needed)
-            origin_airport = Airport(code=origin_code, name=origin_code, city="", country="")
-            dest_airport = Airport(code=dest_code, name=dest_code, city="", country="")
-            airline = Airline(code=airline_code, name=airline_code, logo_url=None)
+            origin_airport = reference.to_airport(origin_code)
+            dest_airport = reference.to_airport(dest_code)
+            airline = reference.to_airline(airline_code)
 
             # Outbound segment
             segments = [
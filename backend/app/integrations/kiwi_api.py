@@ -6,11 +6,10 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
-    Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,11 +21,18 @@ class KiwiAPI:
         self.api_key = settings.kiwi_api_key
         self.headers = {"accept": "application/json", "apikey": self.api_key}
 
-    async def search_flights(self, search_request: FlightSearchRequest) -> List[Flight]:
-        """Search for flights using Kiwi.com API"""
+    async def search_flights(
+        self, search_request: FlightSearchRequest, date_to: Optional[date] = None
+    ) -> List[Flight]:
+        """
+        Search for flights using Kiwi.com API
+
+        When ``date_to`` is given, one call covers every departure date from
+        ``search_request.departure_date`` through ``date_to``.
+        """
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                params = self._build_search_params(search_request)
+                params = self._build_search_params(search_request, date_to)
 
                 response = await client.get(
                     f"{self.base_url}/v2/search", params=params, headers=self.headers
@@ -44,20 +50,21 @@ class KiwiAPI:
             return []
 
     def _build_search_params(
-        self, search_request: FlightSearchRequest
+        self, search_request: FlightSearchRequest, date_to: Optional[date] = None
     ) -> Dict[str, Any]:
+        date_to = date_to or search_request.departure_date
         params = {
             "fly_from": search_request.origin,
             "fly_to": search_request.destination,
             "date_from": search_request.departure_date.strftime("%d/%m/%Y"),
-            "date_to": search_request.departure_date.strftime("%d/%m/%Y"),
+            "date_to": date_to.strftime("%d/%m/%Y"),
             "adults": search_request.adults,
             "children": search_request.children,
             "infants": search_request.infants,
             "selected_cabins": search_request.cabin_class.value,
             "curr": "USD",
             "sort": "price",
-            "limit": 50,
+            "limit": 50 if date_to == search_request.departure_date else 200,
             "partner": "picky",
         }
 
@@ -105,26 +112,17 @@ class KiwiAPI:
 
         for segment_data in route:
             segment = FlightSegment(
-                origin=Airport(
-                    code=segment_data["flyFrom"],
-                    name=segment_data.get("cityFrom", ""),
-                    city=segment_data.get("cityFrom", ""),
-                    country="",
+                origin=reference.to_airport(
+                    segment_data["flyFrom"], city=segment_data.get("cityFrom", "")
                 ),
-                destination=Airport(
-                    code=segment_data["flyTo"],
-                    name=segment_data.get("cityTo", ""),
-                    city=segment_data.get("cityTo", ""),
-                    country="",
+                destination=reference.to_airport(
+                    segment_data["flyTo"], city=segment_data.get("cityTo", "")
                 ),
                 departure_time=datetime.fromtimestamp(segment_data["dTimeUTC"]),
                 arrival_time=datetime.fromtimestamp(segment_data["aTimeUTC"]),
                 duration_minutes=segment_data.get("duration", {}).get("total", 0) // 60,
                 flight_number=f"{segment_data.get('airline', '')}{segment_data.get('flight_no', '')}",
-                airline=Airline(
-                    code=segment_data.get("airline", ""),
-                    name=segment_data.get("airline", ""),
-                ),
+                airline=reference.to_airline(segment_data.get("airline", "")),
                 cabin_class=search_request.cabin_class,
                 booking_class=segment_data.get("fare_category", ""),
             )
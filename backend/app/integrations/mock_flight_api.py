@@ -5,11 +5,12 @@ import random
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
     Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.geo import routes
+from app.reference import reference
 
 
 class MockFlightAPI:
@@ -25,17 +26,6 @@ class MockFlightAPI:
             {"code": "AS", "name": "Alaska Airlines"},
         ]
 
-        self.airports = {
-            "NYC": {"name": "New York", "city": "New York"},
-            "LAX": {"name": "Los Angeles International", "city": "Los Angeles"},
-            "CHI": {"name": "Chicago O'Hare", "city": "Chicago"},
-            "MIA": {"name": "Miami International", "city": "Miami"},
-            "LAS": {"name": "Las Vegas McCarran", "city": "Las Vegas"},
-            "SFO": {"name": "San Francisco International", "city": "San Francisco"},
-            "SEA": {"name": "Seattle-Tacoma International", "city": "Seattle"},
-            "DEN": {"name": "Denver International", "city": "Denver"},
-        }
-
     async def search_flights(self, search_request: FlightSearchRequest) -> List[Flight]:
         """Generate realistic mock flight data"""
         await asyncio.sleep(0.5)  # Simulate API delay
@@ -93,31 +83,20 @@ class MockFlightAPI:
             .replace(hour=random.randint(6, 22), minute=random.choice([0, 15, 30, 45])),
         )
 
-        duration = random.randint(90, 360)  # 1.5 to 6 hours
-        arrival_time = departure_time + timedelta(minutes=duration)
-
-        origin_info = self.airports.get(
-            search_request.origin,
-            {"name": search_request.origin, "city": search_request.origin},
-        )
-        dest_info = self.airports.get(
-            search_request.destination,
-            {"name": search_request.destination, "city": search_request.destination},
+        # Route's estimated block time, give or take a few minutes
+        arrival_time, duration = routes.estimate_arrival(
+            search_request.origin, search_request.destination, departure_time
         )
+        jitter = random.randint(-3, 6) * 5
+        duration += jitter
+        arrival_time += timedelta(minutes=jitter)
+
+        origin = reference.to_airport(search_request.origin)
+        destination = reference.to_airport(search_request.destination)
 
         segment = FlightSegment(
-            origin=Airport(
-                code=search_request.origin,
-                name=origin_info["name"],
-                city=origin_info["city"],
-                country="US",
-            ),
-            destination=Airport(
-                code=search_request.destination,
-                name=dest_info["name"],
-                city=dest_info["city"],
-                country="US",
-            ),
+            origin=origin,
+            destination=destination,
             departure_time=departure_time,
             arrival_time=arrival_time,
             duration_minutes=duration,
@@ -139,12 +118,7 @@ class MockFlightAPI:
             # Mock connecting segment
             connecting_segment = FlightSegment(
                 origin=segment.destination,
-                destination=Airport(
-                    code=search_request.destination,
-                    name=dest_info["name"],
-                    city=dest_info["city"],
-                    country="US",
-                ),
+                destination=destination,
                 departure_time=departure_time,
                 arrival_time=arrival_time,
                 duration_minutes=duration,
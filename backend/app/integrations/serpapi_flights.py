@@ -6,170 +6,17 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
-    Airline,
     CabinClass,
     FlightSearchRequest,
+    BookingOption,
 )
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
 
-
-# Airport code to currency mapping for SerpAPI
-AIRPORT_CURRENCY_MAP = {
-    # United States
-    "JFK": "USD",
-    "LAX": "USD",
-    "ORD": "USD",
-    "MIA": "USD",
-    "SFO": "USD",
-    "LAS": "USD",
-    "SEA": "USD",
-    "DEN": "USD",
-    "ATL": "USD",
-    "DFW": "USD",
-    "PHX": "USD",
-    "IAH": "USD",
-    "BOS": "USD",
-    "MSP": "USD",
-    "DTW": "USD",
-    "PHL": "USD",
-    "LGA": "USD",
-    "BWI": "USD",
-    "DCA": "USD",
-    "IAD": "USD",
-    # United Kingdom
-    "LHR": "GBP",
-    "LGW": "GBP",
-    "STN": "GBP",
-    "LTN": "GBP",
-    "MAN": "GBP",
-    "EDI": "GBP",
-    "GLA": "GBP",
-    "BHX": "GBP",
-    "NCL": "GBP",
-    # Eurozone
-    "CDG": "EUR",
-    "ORY": "EUR",  # France
-    "FRA": "EUR",
-    "MUC": "EUR",
-    "DUS": "EUR",
-    "BER": "EUR",  # Germany
-    "AMS": "EUR",  # Netherlands
-    "MAD": "EUR",
-    "BCN": "EUR",  # Spain
-    "FCO": "EUR",
-    "MXP": "EUR",
-    "LIN": "EUR",  # Italy
-    "VIE": "EUR",  # Austria
-    "BRU": "EUR",  # Belgium
-    "LIS": "EUR",  # Portugal
-    "ATH": "EUR",  # Greece
-    "DUB": "EUR",  # Ireland
-    "HEL": "EUR",  # Finland
-    # Non-Eurozone Europe
-    "ZUR": "CHF",  # Switzerland
-    "CPH": "DKK",  # Denmark
-    "ARN": "SEK",
-    "GOT": "SEK",  # Sweden
-    "OSL": "NOK",  # Norway
-    # Asia Pacific
-    "NRT": "JPY",
-    "HND": "JPY",
-    "KIX": "JPY",  # Japan
-    "ICN": "KRW",
-    "GMP": "KRW",  # South Korea
-    "PVG": "CNY",
-    "PEK": "CNY",
-    "CAN": "CNY",
-    "SZX": "CNY",  # China
-    "HKG": "HKD",  # Hong Kong
-    "TPE": "TWD",  # Taiwan
-    "SIN": "SGD",  # Singapore
-    "BKK": "THB",
-    "DMK": "THB",  # Thailand
-    "KUL": "MYR",
-    "PEN": "MYR",  # Malaysia
-    "CGK": "IDR",
-    "DPS": "IDR",  # Indonesia
-    "MNL": "PHP",  # Philippines
-    "SYD": "AUD",
-    "MEL": "AUD",
-    "BNE": "AUD",
-    "PER": "AUD",
-    "ADL": "AUD",  # Australia
-    "AKL": "NZD",
-    "CHC": "NZD",  # New Zealand
-    # India
-    "DEL": "INR",
-    "BOM": "INR",
-    "MAA": "INR",
-    "BLR": "INR",
-    "HYD": "INR",
-    "CCU": "INR",
-    "COK": "INR",
-    "GOI": "INR",
-    "AMD": "INR",
-    "PNQ": "INR",
-    # Middle East
-    "DXB": "AED",
-    "AUH": "AED",  # UAE
-    "DOH": "QAR",  # Qatar
-    "KWI": "KWD",  # Kuwait
-    "RUH": "SAR",
-    "JED": "SAR",
-    "DMM": "SAR",  # Saudi Arabia
-    "BAH": "BHD",  # Bahrain
-    "MCT": "OMR",  # Oman
-    "IST": "TRY",
-    "SAW": "TRY",  # Turkey
-    "TLV": "ILS",  # Israel
-    # Canada
-    "YYZ": "CAD",
-    "YVR": "CAD",
-    "YUL": "CAD",
-    "YYC": "CAD",
-    "YOW": "CAD",
-    # South America
-    "GRU": "BRL",
-    "GIG": "BRL",
-    "BSB": "BRL",  # Brazil
-    "EZE": "ARS",
-    "AEP": "ARS",  # Argentina
-    "SCL": "CLP",  # Chile
-    "LIM": "PEN",  # Peru
-    "BOG": "COP",  # Colombia
-    "UIO": "USD",  # Ecuador (uses USD)
-    # Africa
-    "CAI": "EGP",  # Egypt
-    "JNB": "ZAR",
-    "CPT": "ZAR",
-    "DUR": "ZAR",  # South Africa
-    "LOS": "NGN",
-    "ABV": "NGN",  # Nigeria
-    "ADD": "ETB",  # Ethiopia
-    "NBO": "KES",  # Kenya
-    "CMN": "MAD",
-    "RAK": "MAD",  # Morocco
-    # Eastern Europe
-    "SVO": "RUB",
-    "DME": "RUB",
-    "VKO": "RUB",  # Russia
-    "WAW": "PLN",
-    "KRK": "PLN",  # Poland
-    "PRG": "CZK",  # Czech Republic
-    "BUD": "HUF",  # Hungary
-    "OTP": "RON",  # Romania
-    "SOF": "BGN",  # Bulgaria
-    "ZAG": "HRK",  # Croatia
-    "BEG": "RSD",  # Serbia
-}
-
-
-def get_airport_currency(airport_code: str) -> str:
-    """Get the currency for an airport code"""
-    return AIRPORT_CURRENCY_MAP.get(airport_code.upper(), "USD")
+# SerpAPI reports a search with no flights as this error
+NO_RESULTS_ERROR = "hasn't returned any results"
 
 
 class SerpAPIFlights:
@@ -199,37 +46,105 @@ class SerpAPIFlights:
 
                 response = await client.get(self.base_url, params=params)
                 logger.info(f"SerpAPI response status: {response.status_code}")
-
-                if response.status_code != 200:
-                    logger.error(
-                        f"SerpAPI error {response.status_code}: {response.text}"
-                    )
-                    return []
+                response.raise_for_status()
 
                 data = response.json()
                 logger.info(f"SerpAPI response keys: {list(data.keys())}")
 
                 if "error" in data:
-                    logger.error(f"SerpAPI returned error: {data['error']}")
-                    return []
+                    # An empty search is reported as an error; it's a real answer
+                    if NO_RESULTS_ERROR in data["error"]:
+                        logger.info(f"SerpAPI found no flights: {data['error']}")
+                        return []
+                    raise RuntimeError(data["error"])
 
                 return self._parse_flights(data, search_request)
 
+        # Failures propagate so callers can tell them from an empty result
         except httpx.TimeoutException as e:
             logger.warning(f"SerpAPI timeout after 20s: {e}")
-            return []
+            raise
         except httpx.HTTPStatusError as e:
             logger.error(
                 f"SerpAPI HTTP error {e.response.status_code}: {e.response.text}"
             )
-            return []
+            raise
         except httpx.RequestError as e:
             logger.error(f"SerpAPI request error: {e}")
-            return []
+            raise
         except Exception as e:
             logger.error(f"SerpAPI error: {e}")
+            raise
+
+    async def get_booking_options(self, flight: Flight) -> List[BookingOption]:
+        """Resolve a Google Flights booking_token (kept in deep_link) to offers"""
+        if not self.api_key or not flight.deep_link:
+            return []
+
+        first_segment = flight.segments[0]
+        params = {
+            "engine": "google_flights",
+            "booking_token": flight.deep_link,
+            "departure_id": first_segment.origin.code,
+            "arrival_id": flight.segments[-1].destination.code,
+            "outbound_date": first_segment.departure_time.strftime("%Y-%m-%d"),
+            "type": "2",  # Only one-way results keep their token
+            "currency": flight.currency,
+            "hl": "en",
+            "api_key": self.api_key,
+        }
+
+        try:
+            async with httpx.AsyncClient(timeout=20.0) as client:
+                response = await client.get(self.base_url, params=params)
+
+                if response.status_code != 200:
+                    logger.error(
+                        f"SerpAPI booking options error {response.status_code}: {response.text}"
+                    )
+                    return []
+
+                data = response.json()
+                if "error" in data:
+                    logger.error(f"SerpAPI returned error: {data['error']}")
+                    return []
+
+                return self._parse_booking_options(data, flight.currency)
+
+        except httpx.TimeoutException as e:
+            logger.warning(f"SerpAPI booking options timeout after 20s: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"SerpAPI booking options error: {e}")
             return []
 
+    def _parse_booking_options(
+        self, data: Dict[str, Any], currency: str
+    ) -> List[BookingOption]:
+        """Parse the booking_options block of a booking_token lookup"""
+        options = []
+        for option_data in data.get("booking_options", []):
+            separate_tickets = bool(option_data.get("separate_tickets"))
+            # Separately ticketed options list each leg; the first carries the link
+            offer = option_data.get("together") or option_data.get("departing") or {}
+            if not offer.get("book_with"):
+                continue
+
+            booking_request = offer.get("booking_request") or {}
+            options.append(
+                BookingOption(
+                    book_with=offer["book_with"],
+                    price=offer.get("price"),
+                    currency=currency,
+                    option_title=offer.get("option_title"),
+                    url=booking_request.get("url"),
+                    post_data=booking_request.get("post_data"),
+                    phone=offer.get("booking_phone"),
+                    separate_tickets=separate_tickets,
+                )
+            )
+        return options
+
     def _build_search_params(
         self, search_request: FlightSearchRequest
     ) -> Dict[str, Any]:
@@ -238,59 +153,13 @@ class SerpAPIFlights:
         origin_code = search_request.origin.upper()
         destination_code = search_request.destination.upper()
 
-        # Map common city codes to specific airport codes for SerpAPI
-        airport_mapping = {
-            "NYC": "JFK",  # Use JFK for New York
-            "CHI": "ORD",  # Use ORD for Chicago
-            "WAS": "DCA",  # Use DCA for Washington
-            "LON": "LHR",  # Use LHR for London
-            "PAR": "CDG",  # Use CDG for Paris
-            "TOK": "NRT",  # Use NRT for Tokyo
-            "BER": "BER",  # Use BER for Berlin
-            "ROM": "FCO",  # Use FCO for Rome
-            "MIL": "MXP",  # Use MXP for Milan
-            "BAR": "BCN",  # Use BCN for Barcelona
-            "MAD": "MAD",  # MAD is fine for Madrid
-            "AMS": "AMS",  # AMS is fine for Amsterdam
-            "FRA": "FRA",  # FRA is fine for Frankfurt
-            "ZUR": "ZUR",  # ZUR is fine for Zurich
-            "VIE": "VIE",  # VIE is fine for Vienna
-            "CPH": "CPH",  # CPH is fine for Copenhagen
-            "STO": "ARN",  # Use ARN for Stockholm
-            "OSL": "OSL",  # OSL is fine for Oslo
-            "HEL": "HEL",  # HEL is fine for Helsinki
-            "DUB": "DUB",  # DUB is fine for Dublin
-            "EDI": "EDI",  # EDI is fine for Edinburgh
-            "MAN": "MAN",  # MAN is fine for Manchester
-            "BRU": "BRU",  # BRU is fine for Brussels
-            "LIS": "LIS",  # LIS is fine for Lisbon
-            "ATH": "ATH",  # ATH is fine for Athens
-            "IST": "IST",  # IST is fine for Istanbul
-            "MOW": "SVO",  # Use SVO for Moscow
-            "LED": "LED",  # LED is fine for St. Petersburg
-            "WAW": "WAW",  # WAW is fine for Warsaw
-            "PRG": "PRG",  # PRG is fine for Prague
-            "BUD": "BUD",  # BUD is fine for Budapest
-            "BUH": "OTP",  # Use OTP for Bucharest
-            "SOF": "SOF",  # SOF is fine for Sofia
-            "ZAG": "ZAG",  # ZAG is fine for Zagreb
-            "BEG": "BEG",  # BEG is fine for Belgrade
-            "SKP": "SKP",  # SKP is fine for Skopje
-            "TIA": "TIA",  # TIA is fine for Tirana
-            "LJU": "LJU",  # LJU is fine for Ljubljana
-            "SJJ": "SJJ",  # SJJ is fine for Sarajevo
-            "DBV": "DBV",  # DBV is fine for Dubrovnik
-            "SPU": "SPU",  # SPU is fine for Split
-            "PUY": "PUY",  # PUY is fine for Pula
-            "RJK": "RJK",  # RJK is fine for Rijeka
-            "ZAD": "ZAD",  # ZAD is fine for Zadar
-        }
-
-        origin = airport_mapping.get(origin_code, origin_code)
-        destination = airport_mapping.get(destination_code, destination_code)
+        # Metro codes (NYC, LON...) expand to their airports; SerpAPI takes a
+        # comma-separated list
+        origin = ",".join(reference.expand(origin_code))
+        destination = ",".join(reference.expand(destination_code))
 
         # Get currency based on origin airport
-        origin_currency = get_airport_currency(origin)
+        origin_currency = reference.currency(origin_code)
 
         params = {
             "engine": "google_flights",
@@ -339,15 +208,17 @@ class SerpAPIFlights:
         """Parse SerpAPI Google Flights response"""
         flights = []
 
-        # SerpAPI returns flights in 'best_flights' and 'other_flights'
+        # SerpAPI returns flights in 'best_flights' and 'other_flights'; keep
+        # Google's own pick as a ranking signal
         all_flights = []
-        all_flights.extend(data.get("best_flights", []))
-        all_flights.extend(data.get("other_flights", []))
+        all_flights.extend((f, True) for f in data.get("best_flights", []))
+        all_flights.extend((f, False) for f in data.get("other_flights", []))
 
-        for flight_data in all_flights:
+        for flight_data, recommended in all_flights:
             try:
                 flight = self._parse_single_flight(flight_data, search_request)
                 if flight:
+                    flight.provider_recommended = recommended
                     flights.append(flight)
             except Exception as e:
                 logger.warning(f"Failed to parse SerpAPI flight: {e}")
@@ -369,7 +240,7 @@ class SerpAPIFlights:
                 return None
 
             # Use currency based on origin airport (same as what we sent to SerpAPI)
-            currency = get_airport_currency(search_request.origin)
+            currency = reference.currency(search_request.origin)
 
             if not currency or currency.strip() == "":
                 logger.debug(f"Skipping flight with invalid currency: {currency}")
@@ -399,25 +270,28 @@ class SerpAPIFlights:
             # Calculate stops
             stops = len(segments) - 1
 
-            # Generate flight ID using first segment's flight number
-            first_segment = segments[0]
-            flight_number = (
-                first_segment.flight_number.replace(" ", "_")
-                if first_segment.flight_number
-                else "unknown"
+            # Booking tokens are only resolved as one-way ("type": "2"); a
+            # round-trip result's token would need its return leg, which a
+            # Flight doesn't carry, so those results get no booking lookup
+            booking_token = (
+                flight_data.get("booking_token", "")
+                if not search_request.return_date
+                else ""
             )
-            flight_id = f"serpapi_{flight_number}_{search_request.departure_date}"
 
-            return Flight(
-                id=flight_id,
+            flight = Flight(
+                id="",
                 segments=segments,
                 total_duration_minutes=total_duration,
                 stops=stops,
                 price=float(price),
                 currency=currency,
-                deep_link=flight_data.get("booking_token", ""),
+                deep_link=booking_token,
                 provider="Google Flights",
             )
+            # Itineraries can share a first segment, so the ID covers all of them
+            flight.id = flight.content_id()
+            return flight
 
         except Exception as e:
             logger.warning(f"Error parsing SerpAPI flight: {e}")
@@ -456,23 +330,18 @@ class SerpAPIFlights:
             airline_code = flight_number.split()[0] if flight_number else ""
 
             return FlightSegment(
-                origin=Airport(
-                    code=departure.get("id", ""),
-                    name=departure.get("name", ""),
-                    city="",  # Not provided in this format
-                    country="",
+                # City and country aren't in the response; fill them from reference data
+                origin=reference.to_airport(
+                    departure.get("id", ""), name=departure.get("name", "")
                 ),
-                destination=Airport(
-                    code=arrival.get("id", ""),
-                    name=arrival.get("name", ""),
-                    city="",  # Not provided in this format
-                    country="",
+                destination=reference.to_airport(
+                    arrival.get("id", ""), name=arrival.get("name", "")
                 ),
                 departure_time=dep_time,
                 arrival_time=arr_time,
                 duration_minutes=duration_minutes,
                 flight_number=flight_number,
-                airline=Airline(code=airline_code, name=airline_name),
+                airline=reference.to_airline(airline_code, airline_name),
                 cabin_class=cabin_class,
                 booking_class="",
             )
@@ -2,15 +2,20 @@
 SerpAPI Google Hotels integration for hotel search functionality.
 """
 
+import asyncio
 import os
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-import requests
+import httpx
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+# One pool per worker; searches beyond this wait for a free connection
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
 
 class HotelLocation(BaseModel):
     address: str
@@ -82,12 +87,18 @@ class HotelSearchResponse(BaseModel):
 
 
 class SerpAPIHotelsClient:
-    """Client for SerpAPI Google Hotels search."""
+    """
+    Client for SerpAPI Google Hotels search.
+
+    Requests go through one pooled ``httpx.AsyncClient`` per worker, created
+    on first use and closed with ``aclose()`` at shutdown, so hotel searches
+    reuse connections and never block the event loop.
+    """
 
     def __init__(self):
         self.api_key = None
         self.base_url = "https://serpapi.com/search.json"
-        self.session = requests.Session()
+        self._client: Optional[httpx.AsyncClient] = None
 
     def _ensure_api_key(self):
         """Ensure API key is available."""
@@ -96,12 +107,26 @@ class SerpAPIHotelsClient:
             if not self.api_key:
                 raise ValueError("SERPAPI_KEY environment variable is required")
 
-    def search_hotels(self, params: HotelSearchParams) -> HotelSearchResponse:
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+        return self._client
+
+    async def aclose(self):
+        """Close the shared connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def search_hotels(
+        self, params: HotelSearchParams, client: Optional[httpx.AsyncClient] = None
+    ) -> HotelSearchResponse:
         """
         Search for hotels using SerpAPI Google Hotels engine.
 
         Args:
             params: Hotel search parameters
+            client: HTTP client to use instead of the shared pool
 
         Returns:
             HotelSearchResponse with hotel results
@@ -118,7 +143,9 @@ class SerpAPIHotelsClient:
             logger.info(f"Searching hotels with SerpAPI: {query_params}")
 
             # Make API request
-            response = self.session.get(self.base_url, params=query_params, timeout=30)
+            response = await (client or self._get_client()).get(
+                self.base_url, params=query_params
+            )
             response.raise_for_status()
 
             data = response.json()
@@ -138,7 +165,7 @@ class SerpAPIHotelsClient:
                 search_time_ms=search_time_ms,
             )
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"SerpAPI request failed: {e}")
             raise Exception(f"Hotel search failed: {str(e)}")
         except Exception as e:
@@ -299,12 +326,34 @@ serpapi_hotels_client = SerpAPIHotelsClient()
 
 def search_hotels_serpapi(params: HotelSearchParams) -> HotelSearchResponse:
     """
-    Search for hotels using SerpAPI.
+    Search for hotels using SerpAPI, blocking until the results arrive.
+
+    For scripts and other synchronous callers; async code should await
+    ``serpapi_hotels_client.search_hotels`` instead. Each call runs its own
+    event loop with a short-lived HTTP client, since the shared pool is
+    bound to the application's loop.
 
     Args:
         params: Hotel search parameters
 
     Returns:
         HotelSearchResponse with results
+
+    Raises:
+        RuntimeError: If called from a running event loop
     """
-    return serpapi_hotels_client.search_hotels(params)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError(
+            "search_hotels_serpapi() blocks and can't run inside an event loop; "
+            "await serpapi_hotels_client.search_hotels() instead"
+        )
+
+    async def search():
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
+            return await serpapi_hotels_client.search_hotels(params, client)
+
+    return asyncio.run(search())
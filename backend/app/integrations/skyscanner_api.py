@@ -6,11 +6,11 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
     Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -153,12 +153,8 @@ class SkyscannerAPI:
         for leg in itinerary.get("legs", []):
             # Simplified segment parsing
             segment = FlightSegment(
-                origin=Airport(
-                    code=search_request.origin, name="", city="", country=""
-                ),
-                destination=Airport(
-                    code=search_request.destination, name="", city="", country=""
-                ),
+                origin=reference.to_airport(search_request.origin),
+                destination=reference.to_airport(search_request.destination),
                 departure_time=datetime.now(),
                 arrival_time=datetime.now(),
                 duration_minutes=leg.get("duration", 0),
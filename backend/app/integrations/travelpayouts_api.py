@@ -6,11 +6,11 @@ from app.config import settings
 from app.models.flights import (
     Flight,
     FlightSegment,
-    Airport,
-    Airline,
     CabinClass,
     FlightSearchRequest,
 )
+from app.geo import routes
+from app.reference import reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -97,6 +97,99 @@ class TravelpayoutsAPI:
 
             return self._parse_flights(data, search_request)
 
+    async def get_month_prices(
+        self, origin: str, destination: str, month: date
+    ) -> Dict[date, float]:
+        """
+        Get the lowest cached one-way price per departure day for a month.
+
+        One ``prices_for_dates`` call returns the whole month, so this is the
+        cheap way to fill a price calendar. Prices are in USD.
+        """
+        if not self.api_token:
+            logger.warning("Travelpayouts token not configured")
+            return {}
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            params = {
+                "origin": origin,
+                "destination": destination,
+                "departure_at": month.strftime("%Y-%m"),
+                "one_way": "true",
+                "sorting": "price",
+                "limit": 1000,
+                "currency": "usd",
+                "token": self.api_token,
+            }
+
+            if self.marker:
+                params["marker"] = self.marker
+
+            response = await client.get(
+                f"{self.base_url}/aviasales/v3/prices_for_dates", params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        lowest: Dict[date, float] = {}
+        for entry in data.get("data", []):
+            try:
+                day = datetime.fromisoformat(entry["departure_at"][:10]).date()
+                price = float(entry["price"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if price > 0 and (day not in lowest or price < lowest[day]):
+                lowest[day] = price
+
+        return lowest
+
+    async def get_origin_month_prices(
+        self, origin: str, month: date
+    ) -> Dict[str, float]:
+        """
+        Get the lowest cached one-way price to every destination from an origin.
+
+        ``prices_for_dates`` without a destination returns the cheapest known
+        fares from the origin (airport or city code) for the whole month, so
+        one call warms an explore page. Returns destination code -> USD price.
+        """
+        if not self.api_token:
+            logger.warning("Travelpayouts token not configured")
+            return {}
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            params = {
+                "origin": origin,
+                "departure_at": month.strftime("%Y-%m"),
+                "one_way": "true",
+                "unique": "true",
+                "sorting": "price",
+                "limit": 1000,
+                "currency": "usd",
+                "token": self.api_token,
+            }
+
+            if self.marker:
+                params["marker"] = self.marker
+
+            response = await client.get(
+                f"{self.base_url}/aviasales/v3/prices_for_dates", params=params
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        lowest: Dict[str, float] = {}
+        for entry in data.get("data", []):
+            try:
+                destination = entry["destination"].upper()
+                price = float(entry["price"])
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            if price > 0 and (destination not in lowest or price < lowest[destination]):
+                lowest[destination] = price
+
+        return lowest
+
     def _parse_flights(
         self, data: Dict[str, Any], search_request: FlightSearchRequest
     ) -> List[Flight]:
@@ -151,30 +244,19 @@ class TravelpayoutsAPI:
                 # Add estimated time (Travelpayouts doesn't provide exact times)
                 dep_time = dep_time.replace(hour=10, minute=0)  # Default 10:00 AM
 
-                # Estimate arrival time (rough calculation)
-                duration_hours = self._estimate_flight_duration(origin, destination)
-                arr_time = dep_time.replace(hour=dep_time.hour + duration_hours)
+                # Estimate arrival from the route's great-circle block time
+                arr_time, duration = routes.estimate_arrival(
+                    origin, destination, dep_time
+                )
 
                 outbound_segment = FlightSegment(
-                    origin=Airport(
-                        code=origin,
-                        name=self._get_airport_name(origin),
-                        city=self._get_city_name(origin),
-                        country="",
-                    ),
-                    destination=Airport(
-                        code=destination,
-                        name=self._get_airport_name(destination),
-                        city=self._get_city_name(destination),
-                        country="",
-                    ),
+                    origin=reference.to_airport(origin),
+                    destination=reference.to_airport(destination),
                     departure_time=dep_time,
                     arrival_time=arr_time,
-                    duration_minutes=duration_hours * 60,
+                    duration_minutes=duration,
                     flight_number=flight_number,
-                    airline=Airline(
-                        code=airline_code, name=self._get_airline_name(airline_code)
-                    ),
+                    airline=reference.to_airline(airline_code),
                     cabin_class=search_request.cabin_class,
                     booking_class="",
                 )
@@ -185,29 +267,18 @@ class TravelpayoutsAPI:
                 ret_time = datetime.strptime(return_date, "%Y-%m-%d")
                 ret_time = ret_time.replace(hour=15, minute=0)  # Default 3:00 PM
 
-                duration_hours = self._estimate_flight_duration(destination, origin)
-                ret_arr_time = ret_time.replace(hour=ret_time.hour + duration_hours)
+                ret_arr_time, duration = routes.estimate_arrival(
+                    destination, origin, ret_time
+                )
 
                 return_segment = FlightSegment(
-                    origin=Airport(
-                        code=destination,
-                        name=self._get_airport_name(destination),
-                        city=self._get_city_name(destination),
-                        country="",
-                    ),
-                    destination=Airport(
-                        code=origin,
-                        name=self._get_airport_name(origin),
-                        city=self._get_city_name(origin),
-                        country="",
-                    ),
+                    origin=reference.to_airport(destination),
+                    destination=reference.to_airport(origin),
                     departure_time=ret_time,
                     arrival_time=ret_arr_time,
-                    duration_minutes=duration_hours * 60,
+                    duration_minutes=duration,
                     flight_number=f"{airline_code}{int(flight_number[-3:]) + 1}",
-                    airline=Airline(
-                        code=airline_code, name=self._get_airline_name(airline_code)
-                    ),
+                    airline=reference.to_airline(airline_code),
                     cabin_class=search_request.cabin_class,
                     booking_class="",
                 )
@@ -237,63 +308,3 @@ class TravelpayoutsAPI:
         except Exception as e:
             logger.warning(f"Error parsing Travelpayouts flight: {e}")
             return None
-
-    def _estimate_flight_duration(self, origin: str, destination: str) -> int:
-        """Estimate flight duration in hours based on route"""
-        # Simple duration estimates for common routes
-        duration_map = {
-            ("NYC", "LAX"): 6,
-            ("LAX", "NYC"): 5,
-            ("NYC", "MIA"): 3,
-            ("MIA", "NYC"): 3,
-            ("NYC", "CHI"): 2,
-            ("CHI", "NYC"): 2,
-            ("LAX", "SFO"): 1,
-            ("SFO", "LAX"): 1,
-            ("NYC", "LAS"): 5,
-            ("LAS", "NYC"): 4,
-        }
-
-        return duration_map.get((origin, destination), 4)  # Default 4 hours
-
-    def _get_airport_name(self, code: str) -> str:
-        """Get airport name from code"""
-        airport_names = {
-            "NYC": "New York Area Airports",
-            "LAX": "Los Angeles International",
-            "MIA": "Miami International",
-            "CHI": "Chicago Area Airports",
-            "SFO": "San Francisco International",
-            "LAS": "Las Vegas McCarran",
-            "SEA": "Seattle-Tacoma International",
-            "DEN": "Denver International",
-        }
-        return airport_names.get(code, code)
-
-    def _get_city_name(self, code: str) -> str:
-        """Get city name from airport code"""
-        city_names = {
-            "NYC": "New York",
-            "LAX": "Los Angeles",
-            "MIA": "Miami",
-            "CHI": "Chicago",
-            "SFO": "San Francisco",
-            "LAS": "Las Vegas",
-            "SEA": "Seattle",
-            "DEN": "Denver",
-        }
-        return city_names.get(code, code)
-
-    def _get_airline_name(self, code: str) -> str:
-        """Get airline name from code"""
-        airline_names = {
-            "AA": "American Airlines",
-            "DL": "Delta Air Lines",
-            "UA": "United Airlines",
-            "SW": "Southwest Airlines",
-            "B6": "JetBlue Airways",
-            "AS": "Alaska Airlines",
-            "F9": "Frontier Airlines",
-            "NK": "Spirit Airlines",
-        }
-        return airline_names.get(code, code)
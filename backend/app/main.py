@@ -7,6 +7,12 @@ import logging
 
 from app.config import settings
 from app.cache import cache
+from app.reference import reference
+from app.fx import fx
+from app.batch_writer import search_log_writer, price_history_writer
+from app.integrations.serpapi_hotels import serpapi_hotels_client
+from app.services.airport_search_service import airport_search_service
+from app.services.price_sketch_service import price_sketches
 from app.api.v1 import flights, hotels
 from app.database import create_tables, check_database_connection
 from app.routers import destinations
@@ -36,9 +42,30 @@ async def lifespan(app: FastAPI):
     # Initialize cache
     await cache.connect()
 
+    # Load airport/airline reference data
+    reference.load()
+
+    # Build the autocomplete trie and typo index before the first keystroke
+    airport_search_service.load()
+
+    # Load exchange rates and keep them refreshed
+    await fx.start()
+
+    # Start the background analytics writers
+    await search_log_writer.start()
+    await price_history_writer.start()
+
+    # Fold observed fares into the route price sketches in the background
+    await price_sketches.start()
+
     yield
 
     logger.info("Shutting down application...")
+    await search_log_writer.stop()
+    await price_history_writer.stop()
+    await price_sketches.stop()
+    await fx.stop()
+    await serpapi_hotels_client.aclose()
     await cache.close()
 
 
@@ -128,6 +155,8 @@ async def health_check():
         "status": app_status,
         "database": "connected" if db_status else "disconnected (optional)",
         "cache": "connected" if cache_status else "disconnected",
+        "search_logs": search_log_writer.stats(),
+        "price_history": price_history_writer.stats(),
         "timestamp": datetime.utcnow().isoformat(),
         "version": "1.0.0",
         "message": "API is operational"
@@ -4,8 +4,31 @@ from .flights import (
     Flight,
     FlightSegment,
     Airport,
+    AirportSuggestion,
+    AirportSearchResponse,
+    NearbyAirport,
+    NearbyAirportsResponse,
+    NearbyAlternative,
     Airline,
     CabinClass,
+    FlightSortOption,
+    FlightFacets,
+    AirlineFacet,
+    StopsFacet,
+    PriceBucket,
+    FlexibleDateSearchRequest,
+    FlexibleDateSearchResponse,
+    DailyFare,
+    PriceCalendarDay,
+    PriceCalendarResponse,
+    FlightLeg,
+    MultiCitySearchRequest,
+    MultiCitySearchResponse,
+    Itinerary,
+    RoundTripSearchRequest,
+    RoundTripSearchResponse,
+    BookingOption,
+    BookingOptionsResponse,
 )
 from .hotels import (
     HotelSearchRequest,
@@ -23,8 +46,31 @@ __all__ = [
     "Flight",
     "FlightSegment",
     "Airport",
+    "AirportSuggestion",
+    "AirportSearchResponse",
+    "NearbyAirport",
+    "NearbyAirportsResponse",
+    "NearbyAlternative",
     "Airline",
     "CabinClass",
+    "FlightSortOption",
+    "FlightFacets",
+    "AirlineFacet",
+    "StopsFacet",
+    "PriceBucket",
+    "FlexibleDateSearchRequest",
+    "FlexibleDateSearchResponse",
+    "DailyFare",
+    "PriceCalendarDay",
+    "PriceCalendarResponse",
+    "FlightLeg",
+    "MultiCitySearchRequest",
+    "MultiCitySearchResponse",
+    "Itinerary",
+    "RoundTripSearchRequest",
+    "RoundTripSearchResponse",
+    "BookingOption",
+    "BookingOptionsResponse",
     "HotelSearchRequest",
     "HotelSearchResponse",
     "Hotel",
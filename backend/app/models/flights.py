@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
+import hashlib
 from typing import List, Optional, Dict, Any
-from datetime import datetime, date
+from datetime import datetime, date, time
 from enum import Enum
 
 
@@ -11,6 +12,13 @@ class CabinClass(str, Enum):
     FIRST = "first"
 
 
+class FlightSortOption(str, Enum):
+    PRICE = "price"
+    DURATION = "duration"
+    DEPARTURE_TIME = "departure_time"
+    BEST = "best"
+
+
 class FlightSearchRequest(BaseModel):
     origin: str = Field(
         ..., description="IATA airport code", min_length=3, max_length=3
@@ -26,10 +34,45 @@ class FlightSearchRequest(BaseModel):
     cabin_class: CabinClass = Field(
         CabinClass.ECONOMY, description="Cabin class preference"
     )
-    max_price: Optional[float] = Field(None, gt=0, description="Maximum price filter")
+    max_price: Optional[float] = Field(
+        None, gt=0, description="Maximum price filter in USD"
+    )
     direct_flights_only: bool = Field(
         False, description="Search for direct flights only"
     )
+    airlines: Optional[List[str]] = Field(
+        None, description="Only include flights operated by these IATA airline codes"
+    )
+    departure_time_from: Optional[time] = Field(
+        None, description="Earliest local departure time (HH:MM)"
+    )
+    departure_time_to: Optional[time] = Field(
+        None, description="Latest local departure time (HH:MM)"
+    )
+    arrival_time_from: Optional[time] = Field(
+        None, description="Earliest local arrival time (HH:MM)"
+    )
+    arrival_time_to: Optional[time] = Field(
+        None, description="Latest local arrival time (HH:MM)"
+    )
+    max_duration_minutes: Optional[int] = Field(
+        None, gt=0, description="Maximum total trip duration in minutes"
+    )
+    max_stops: Optional[int] = Field(
+        None, ge=0, le=3, description="Maximum number of stops"
+    )
+    sort_by: FlightSortOption = Field(
+        FlightSortOption.BEST, description="Result ordering"
+    )
+    nearby_airports: int = Field(
+        0,
+        ge=0,
+        le=5,
+        description="Also price up to this many alternative airports near each end",
+    )
+    nearby_radius_km: int = Field(
+        150, ge=10, le=500, description="How far alternative airports may be"
+    )
 
     @validator("departure_date")
     def departure_date_must_be_valid(cls, v):
@@ -60,6 +103,27 @@ class FlightSearchRequest(BaseModel):
                 raise ValueError("Return date cannot be more than 11 months in advance")
         return v
 
+    @validator("airlines")
+    def normalize_airline_codes(cls, v):
+        if v is None:
+            return v
+        codes = [code.strip().upper() for code in v if code and code.strip()]
+        return codes or None
+
+    def is_reference_fare_search(self, any_cabin: bool = False) -> bool:
+        """
+        Whether this search's fares are comparable to published lowest fares:
+        one adult, connections allowed, and economy unless ``any_cabin`` (for
+        data kept per cabin)
+        """
+        return (
+            (any_cabin or self.cabin_class == CabinClass.ECONOMY)
+            and self.adults == 1
+            and not self.children
+            and not self.infants
+            and not self.direct_flights_only
+        )
+
 
 class Airport(BaseModel):
     code: str = Field(..., description="IATA airport code")
@@ -68,6 +132,22 @@ class Airport(BaseModel):
     country: str = Field(..., description="Country name")
 
 
+class AirportSuggestion(Airport):
+    type: str = Field("airport", description="airport or metro (all airports)")
+
+
+class AirportSearchResponse(BaseModel):
+    airports: List[AirportSuggestion]
+
+
+class NearbyAirport(Airport):
+    distance_km: float = Field(..., description="Great-circle distance")
+
+
+class NearbyAirportsResponse(BaseModel):
+    airports: List[NearbyAirport]
+
+
 class Airline(BaseModel):
     code: str = Field(..., description="IATA airline code")
     name: str = Field(..., description="Airline name")
@@ -92,16 +172,95 @@ class Flight(BaseModel):
     segments: List[FlightSegment] = Field(..., description="Flight segments")
     total_duration_minutes: int
     stops: int = Field(..., description="Number of stops")
-    price: float = Field(..., description="Price in USD")
+    price: float = Field(..., description="Price in ``currency``")
     currency: str = Field("USD", description="Price currency")
+    price_usd: Optional[float] = Field(
+        None, description="Price converted to USD, used for sorting and filtering"
+    )
     deep_link: str = Field(..., description="Booking URL")
     provider: str = Field(..., description="Data provider (Kiwi, Skyscanner)")
     last_updated: datetime = Field(default_factory=datetime.utcnow)
+    provider_recommended: bool = Field(
+        False, description="Provider listed this among its best flights"
+    )
+    score: Optional[float] = Field(
+        None, description="Composite ranking score (lower is better)"
+    )
+    ranking_tags: List[str] = Field(
+        default_factory=list,
+        description="Why the flight ranks where it does (e.g. cheapest, pareto_optimal)",
+    )
+    price_percentile: Optional[float] = Field(
+        None, description="Percentile of the USD price among fares seen for the route"
+    )
+    price_label: Optional[str] = Field(
+        None, description="great_deal, typical or high relative to price history"
+    )
 
     @property
     def is_direct(self) -> bool:
         return self.stops == 0
 
+    def content_id(self) -> str:
+        """Stable ID derived from the provider, segments and fare"""
+        parts = [self.provider, f"{self.price:.2f}", self.currency]
+        parts.extend(
+            f"{s.flight_number}/{s.origin.code}/{s.destination.code}/"
+            f"{s.departure_time.isoformat()}/{s.cabin_class.value}"
+            for s in self.segments
+        )
+        content_hash = hashlib.sha1("|".join(parts).encode())
+        return f"flight_{content_hash.hexdigest()[:16]}"
+
+
+class AirlineFacet(BaseModel):
+    code: str = Field(..., description="IATA airline code")
+    name: str = Field(..., description="Airline name")
+    count: int = Field(..., description="Flights with a segment on this airline")
+
+
+class StopsFacet(BaseModel):
+    stops: int
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min_price: float
+    max_price: float
+    count: int
+
+
+class FlightFacets(BaseModel):
+    """Filter counts over the full deduplicated result set of a search (prices in USD)"""
+
+    airlines: List[AirlineFacet] = Field(default_factory=list)
+    stops: List[StopsFacet] = Field(default_factory=list)
+    price_histogram: List[PriceBucket] = Field(default_factory=list)
+    departure_hours: List[int] = Field(
+        default_factory=lambda: [0] * 24,
+        description="Flights departing in each hour of the day, 0-23",
+    )
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_duration_minutes: Optional[int] = None
+    max_duration_minutes: Optional[int] = None
+
+
+class NearbyAlternative(BaseModel):
+    """The same search from or to an airport near the requested one"""
+
+    origin: str
+    destination: str
+    distance_km: float = Field(
+        ..., description="Distance from the requested airport it replaces"
+    )
+    min_price: Optional[float] = Field(None, description="Cheapest fare, in USD")
+    savings: Optional[float] = Field(
+        None, description="USD saved against the requested route's cheapest fare"
+    )
+    flight_count: int = Field(0, description="Flights matching the filters")
+    cache_hit: bool = Field(False, description="Whether results came from cache")
+
 
 class FlightSearchResponse(BaseModel):
     flights: List[Flight]
@@ -111,3 +270,237 @@ class FlightSearchResponse(BaseModel):
     providers: List[str] = Field(..., description="Data providers used")
     cache_hit: bool = Field(False, description="Whether results came from cache")
     search_time_ms: int = Field(..., description="Search duration in milliseconds")
+    facets: Optional[FlightFacets] = Field(
+        None, description="Filter counts over all results, before filters"
+    )
+    nearby_alternatives: Optional[List[NearbyAlternative]] = Field(
+        None, description="Cheapest fares via nearby airports, when requested"
+    )
+
+
+class BatchFlightSearchRequest(BaseModel):
+    searches: List[FlightSearchRequest] = Field(
+        ..., min_length=1, max_length=20, description="Searches to run, up to 20"
+    )
+    limit: int = Field(10, ge=1, le=50, description="Flights returned per search")
+
+
+class BatchFlightSearchItem(BaseModel):
+    result: Optional[FlightSearchResponse] = None
+    error: Optional[str] = Field(None, description="Why the search failed, if it did")
+
+
+class BatchFlightSearchResponse(BaseModel):
+    results: List[BatchFlightSearchItem] = Field(
+        ..., description="One result or error per search, in request order"
+    )
+    search_time_ms: int = Field(..., description="Search duration in milliseconds")
+
+
+class FlexibleDateSearchRequest(FlightSearchRequest):
+    flexible_days: int = Field(
+        3, ge=1, le=7, description="Search this many days either side of the date"
+    )
+
+
+class DailyFare(BaseModel):
+    departure_date: date
+    return_date: Optional[date] = None
+    min_price: Optional[float] = Field(
+        None, description="Cheapest fare that day, in USD"
+    )
+    currency: Optional[str] = None
+    flight_count: int = Field(0, description="Flights matching the filters that day")
+    cache_hit: bool = Field(False, description="Whether the day came from cache")
+
+
+class FlexibleDateSearchResponse(BaseModel):
+    daily_fares: List[DailyFare] = Field(..., description="Cheapest fare per day")
+    best_flights: List[Flight] = Field(..., description="Best flights in the window")
+    search_id: str = Field(..., description="Unique search identifier")
+    search_params: FlexibleDateSearchRequest
+    providers: List[str] = Field(..., description="Data providers used")
+    cache_hits: int = Field(0, description="Days served from cache")
+    search_time_ms: int = Field(..., description="Search duration in milliseconds")
+
+
+class PriceCalendarDay(BaseModel):
+    date: date
+    price: float = Field(..., description="Lowest known one-way fare")
+
+
+class PriceCalendarResponse(BaseModel):
+    origin: str
+    destination: str
+    month: str = Field(..., description="Calendar month (YYYY-MM)")
+    currency: str = Field("USD", description="Price currency")
+    days: List[PriceCalendarDay] = Field(..., description="Days with a known fare")
+    cheapest_day: Optional[PriceCalendarDay] = None
+    updated_at: Optional[datetime] = Field(
+        None, description="When the calendar was last refreshed from the provider"
+    )
+    cache_hit: bool = Field(False, description="Whether the calendar came from cache")
+
+
+class PriceTrendPoint(BaseModel):
+    bucket_start: datetime = Field(..., description="Bucket start (UTC)")
+    low: float = Field(..., description="Lowest fare seen in the bucket")
+    high: float = Field(..., description="Highest lowest-fare seen in the bucket")
+    close: float = Field(..., description="Latest lowest fare in the bucket")
+    average: float = Field(..., description="Average lowest fare")
+    average_median: float = Field(..., description="Average median fare")
+    observations: int
+
+
+class PriceTrendResponse(BaseModel):
+    origin: str
+    destination: str
+    departure_date: date
+    cabin_class: CabinClass
+    airline: Optional[str] = Field(None, description="Validating airline, if filtered")
+    resolution: str = Field(..., description="hourly or daily")
+    currency: str = Field("USD", description="Price currency")
+    points: List[PriceTrendPoint] = Field(..., description="Oldest first")
+    latest_price: Optional[float] = Field(
+        None, description="Most recently observed lowest fare"
+    )
+    typical_low: Optional[float] = Field(
+        None, description="25th percentile of the average lowest fare"
+    )
+    typical_high: Optional[float] = Field(
+        None, description="75th percentile of the average lowest fare"
+    )
+    price_level: Optional[str] = Field(
+        None, description="low, typical or high compared with the window"
+    )
+    cache_hit: bool = Field(False, description="Whether the trend came from cache")
+
+
+class ExploreDestination(BaseModel):
+    code: str = Field(..., description="Metro or airport code of the destination city")
+    city: str
+    country: str
+    price: float = Field(..., description="Cheapest fare seen for the month (USD)")
+
+
+class ExploreResponse(BaseModel):
+    origin: str
+    month: str = Field(..., description="Departure month (YYYY-MM)")
+    currency: str = Field("USD", description="Price currency")
+    destinations: List[ExploreDestination] = Field(..., description="Cheapest first")
+
+
+class FlightLeg(BaseModel):
+    origin: str = Field(
+        ..., description="IATA airport code", min_length=3, max_length=3
+    )
+    destination: str = Field(
+        ..., description="IATA airport code", min_length=3, max_length=3
+    )
+    departure_date: date = Field(..., description="Departure date")
+
+    @validator("departure_date")
+    def departure_date_must_be_valid(cls, v):
+        from datetime import timedelta
+
+        today = date.today()
+        max_date = today + timedelta(days=330)  # ~11 months
+
+        if v < today:
+            raise ValueError("Departure date cannot be in the past")
+        if v > max_date:
+            raise ValueError("Departure date cannot be more than 11 months in advance")
+        return v
+
+
+class MultiCitySearchRequest(BaseModel):
+    legs: List[FlightLeg] = Field(
+        ..., min_length=2, max_length=6, description="Trip legs in travel order"
+    )
+    adults: int = Field(1, ge=1, le=9, description="Number of adult passengers")
+    children: int = Field(0, ge=0, le=9, description="Number of child passengers")
+    infants: int = Field(0, ge=0, le=9, description="Number of infant passengers")
+    cabin_class: CabinClass = Field(
+        CabinClass.ECONOMY, description="Cabin class preference"
+    )
+    direct_flights_only: bool = Field(
+        False, description="Search for direct flights only"
+    )
+    min_connection_minutes: int = Field(
+        120, ge=0, description="Minimum time between arriving and the next leg"
+    )
+    max_results: int = Field(20, ge=1, le=50, description="Itineraries to return")
+
+    @validator("legs")
+    def legs_must_be_in_date_order(cls, v):
+        for previous, leg in zip(v, v[1:]):
+            if leg.departure_date < previous.departure_date:
+                raise ValueError("Legs must be in departure date order")
+        return v
+
+
+class Itinerary(BaseModel):
+    id: str = Field(..., description="Stable itinerary identifier")
+    legs: List[Flight] = Field(..., description="One flight per trip leg")
+    total_price: float
+    currency: str = Field("USD", description="Price currency")
+    total_duration_minutes: int
+    total_stops: int
+
+
+class MultiCitySearchResponse(BaseModel):
+    itineraries: List[Itinerary]
+    search_id: str = Field(..., description="Unique search identifier")
+    search_params: MultiCitySearchRequest
+    providers: List[str] = Field(..., description="Data providers used")
+    cache_hits: int = Field(0, description="Legs served from cache")
+    truncated: bool = Field(
+        False, description="Combination search hit its cap; more itineraries may exist"
+    )
+    search_time_ms: int = Field(..., description="Search duration in milliseconds")
+
+
+class RoundTripSearchRequest(FlightSearchRequest):
+    min_stay_hours: int = Field(
+        0, ge=0, description="Minimum time at the destination before flying back"
+    )
+    max_results: int = Field(20, ge=1, le=50, description="Round trips to return")
+
+    @validator("return_date", always=True)
+    def return_date_required(cls, v):
+        if v is None:
+            raise ValueError("Return date is required for round-trip search")
+        return v
+
+
+class RoundTripSearchResponse(BaseModel):
+    itineraries: List[Itinerary] = Field(..., description="Outbound and return pairs")
+    search_id: str = Field(..., description="Unique search identifier")
+    search_params: RoundTripSearchRequest
+    providers: List[str] = Field(..., description="Data providers used")
+    cache_hits: int = Field(0, description="Legs served from cache")
+    truncated: bool = Field(
+        False, description="Combination search hit its cap; more itineraries may exist"
+    )
+    search_time_ms: int = Field(..., description="Search duration in milliseconds")
+
+
+class BookingOption(BaseModel):
+    book_with: str = Field(..., description="Airline or agency selling the fare")
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    option_title: Optional[str] = Field(None, description="Fare name, e.g. Basic")
+    url: Optional[str] = Field(None, description="Booking URL")
+    post_data: Optional[str] = Field(
+        None, description="Form data to POST to the booking URL, when required"
+    )
+    phone: Optional[str] = None
+    separate_tickets: bool = Field(
+        False, description="Legs are sold as separate tickets"
+    )
+
+
+class BookingOptionsResponse(BaseModel):
+    flight_id: str
+    options: List[BookingOption]
+    cache_hit: bool = Field(False, description="Whether options came from cache")
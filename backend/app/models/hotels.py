@@ -65,9 +65,15 @@ class Hotel(BaseModel):
         None, ge=0, le=10, description="Guest review score"
     )
     review_count: Optional[int] = Field(None, ge=0, description="Number of reviews")
-    price_per_night: float = Field(..., description="Price per night in USD")
-    total_price: float = Field(..., description="Total price for stay in USD")
+    price_per_night: float = Field(..., description="Price per night in ``currency``")
+    total_price: float = Field(..., description="Total price for stay in ``currency``")
     currency: str = Field("USD", description="Price currency")
+    price_per_night_usd: Optional[float] = Field(
+        None, description="Price per night converted to USD, used for sorting"
+    )
+    total_price_usd: Optional[float] = Field(
+        None, description="Total price converted to USD"
+    )
     room_type: RoomType
     amenities: List[HotelAmenity] = []
     images: List[HotelImage] = []
@@ -0,0 +1,213 @@
+import csv
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.models.flights import Airline, Airport
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_CURRENCY = "USD"
+
+# City codes accepted before the bundled dataset that aren't IATA codes in
+# it; kept so existing links and saved searches resolve as they used to
+LEGACY_ALIASES = {
+    "TOK": "TYO",  # Tokyo
+    "BAR": "BCN",  # Barcelona
+    "ZUR": "ZRH",  # Zurich
+}
+
+
+class AirportInfo(NamedTuple):
+    code: str
+    name: str
+    city: str
+    country: str
+    currency: str
+    timezone: str
+    latitude: float
+    longitude: float
+    metro: Optional[str]
+    passengers_m: float  # Annual passengers in millions, used as popularity
+
+
+class ReferenceIndex:
+    """
+    Airport, metro and airline reference data bundled in ``app/data``.
+
+    Airports are stored column-wise - one list per text field and NumPy arrays
+    for coordinates and traffic - with a code -> row dict on top, so every
+    lookup is a single dict hit. Metro codes (NYC, LON, TYO...) map to their
+    airports, busiest first. Loaded once at startup; accessors load lazily
+    for scripts that run without the app lifespan.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.cities: List[str] = []
+        self.countries: List[str] = []
+        self.currencies: List[str] = []
+        self.timezones: List[str] = []
+        self.metros: List[Optional[str]] = []
+        self.latitude = np.zeros(0)
+        self.longitude = np.zeros(0)
+        self.passengers = np.zeros(0)
+        self._rows: Dict[str, int] = {}
+        self._metro_rows: Dict[str, List[int]] = {}
+        self._airlines: Dict[str, str] = {}
+
+    def load(self, data_dir: str = DATA_DIR):
+        """Read the bundled CSV files and build the lookup tables"""
+        with open(os.path.join(data_dir, "airports.csv"), newline="") as f:
+            rows = list(csv.DictReader(f))
+
+        self.codes = [r["code"] for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.cities = [r["city"] for r in rows]
+        self.countries = [r["country"] for r in rows]
+        self.currencies = [r["currency"] for r in rows]
+        self.timezones = [r["timezone"] for r in rows]
+        self.metros = [r["metro"] or None for r in rows]
+        self.latitude = np.array([float(r["latitude"]) for r in rows])
+        self.longitude = np.array([float(r["longitude"]) for r in rows])
+        self.passengers = np.array([float(r["passengers_m"]) for r in rows])
+        self._rows = {code: row for row, code in enumerate(self.codes)}
+
+        metro_rows: Dict[str, List[int]] = {}
+        for row, metro in enumerate(self.metros):
+            if metro:
+                metro_rows.setdefault(metro, []).append(row)
+        self._metro_rows = {
+            metro: sorted(members, key=lambda row: -self.passengers[row])
+            for metro, members in metro_rows.items()
+        }
+
+        with open(os.path.join(data_dir, "airlines.csv"), newline="") as f:
+            self._airlines = {r["code"]: r["name"] for r in csv.DictReader(f)}
+
+        self.loaded = True
+        logger.info(
+            f"Reference data loaded: {len(self.codes)} airports, "
+            f"{len(self._metro_rows)} metro areas, {len(self._airlines)} airlines"
+        )
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    @staticmethod
+    def canonical(code: str) -> str:
+        """Upper-cased code with legacy aliases resolved"""
+        code = code.upper()
+        return LEGACY_ALIASES.get(code, code)
+
+    def row(self, code: str) -> Optional[int]:
+        """Row index of an airport code, or None if unknown"""
+        self._ensure_loaded()
+        return self._rows.get(self.canonical(code))
+
+    def airport(self, code: str) -> Optional[AirportInfo]:
+        row = self.row(code)
+        if row is None:
+            return None
+        return AirportInfo(
+            code=self.codes[row],
+            name=self.names[row],
+            city=self.cities[row],
+            country=self.countries[row],
+            currency=self.currencies[row],
+            timezone=self.timezones[row],
+            latitude=float(self.latitude[row]),
+            longitude=float(self.longitude[row]),
+            metro=self.metros[row],
+            passengers_m=float(self.passengers[row]),
+        )
+
+    def is_metro(self, code: str) -> bool:
+        self._ensure_loaded()
+        return self.canonical(code) in self._metro_rows
+
+    def expand(self, code: str) -> List[str]:
+        """Airports for a metro code (busiest first); other codes map to themselves"""
+        self._ensure_loaded()
+        code = self.canonical(code)
+        members = self._metro_rows.get(code)
+        if members and code not in self._rows:
+            return [self.codes[row] for row in members]
+        return [code]
+
+    def _primary_row(self, code: str) -> Optional[int]:
+        """Row of an airport, or of a metro's busiest airport"""
+        row = self.row(code)
+        if row is None:
+            members = self._metro_rows.get(self.canonical(code))
+            row = members[0] if members else None
+        return row
+
+    def city_code(self, code: str) -> str:
+        """Metro code of an airport that belongs to one, otherwise the code itself"""
+        row = self.row(code)
+        if row is not None and self.metros[row]:
+            return self.metros[row]
+        return self.canonical(code)
+
+    def currency(self, code: str, default: str = DEFAULT_CURRENCY) -> str:
+        """Local currency of an airport or metro area"""
+        row = self._primary_row(code)
+        return self.currencies[row] if row is not None else default
+
+    def timezone(self, code: str) -> Optional[str]:
+        row = self._primary_row(code)
+        return self.timezones[row] if row is not None else None
+
+    def coordinates(self, code: str) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of an airport or metro's main airport"""
+        row = self._primary_row(code)
+        if row is None:
+            return None
+        return float(self.latitude[row]), float(self.longitude[row])
+
+    def city_name(self, code: str) -> str:
+        row = self._primary_row(code)
+        return self.cities[row] if row is not None else code
+
+    def airport_name(self, code: str) -> str:
+        """Airport name; metro codes read as '<city> (all airports)'"""
+        row = self.row(code)
+        if row is not None:
+            return self.names[row]
+        if self.is_metro(code):
+            return f"{self.city_name(code)} (all airports)"
+        return code
+
+    def to_airport(self, code: str, name: str = "", city: str = "") -> Airport:
+        """
+        Build an Airport model from reference data.
+
+        ``name`` and ``city`` from the provider are used only for codes the
+        index doesn't know.
+        """
+        code = code.upper()
+        row = self._primary_row(code)
+        if row is None:
+            return Airport(code=code, name=name or code, city=city, country="")
+        return Airport(
+            code=code,
+            name=self.airport_name(code),
+            city=self.cities[row],
+            country=self.countries[row],
+        )
+
+    def airline_name(self, code: str, default: Optional[str] = None) -> str:
+        self._ensure_loaded()
+        return self._airlines.get(code.upper()) or default or code
+
+    def to_airline(self, code: str, name: str = "") -> Airline:
+        """Airline model, preferring the provider's name when it has one"""
+        return Airline(code=code, name=name or self.airline_name(code))
+
+
+reference = ReferenceIndex()
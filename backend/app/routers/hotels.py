@@ -8,7 +8,7 @@ import logging
 from datetime import datetime
 
 from ..integrations.serpapi_hotels import (
-    search_hotels_serpapi,
+    serpapi_hotels_client,
     HotelSearchParams,
     HotelSearchResponse,
 )
@@ -68,7 +68,7 @@ async def search_hotels(params: HotelSearchParams) -> HotelSearchResponse:
         )
 
         # Search hotels using SerpAPI
-        results = search_hotels_serpapi(params)
+        results = await serpapi_hotels_client.search_hotels(params)
 
         logger.info(f"Found {len(results.hotels)} hotels for {params.destination}")
 
@@ -0,0 +1,238 @@
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set
+from app.models.flights import AirportSuggestion
+from app.reference import ReferenceIndex, reference
+
+# Match quality by field, best first; typo matches rank after all exact ones
+EXACT_CODE, CODE, CITY, NAME, COUNTRY = range(5)
+FUZZY_PENALTY = 5
+
+
+class _Entry(NamedTuple):
+    code: str
+    name: str
+    city: str
+    country: str
+    type: str
+    popularity: float
+
+
+class _TrieNode:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Every entry with a token through this node -> its best field rank
+        self.matches: Dict[int, int] = {}
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercase, accent-free alphanumeric tokens"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _deletions(text: str) -> Set[str]:
+    """The string itself plus every variant with one character removed"""
+    return {text} | {text[:i] + text[i + 1 :] for i in range(len(text))}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance where swapping two adjacent characters costs one"""
+    before: List[int] = []
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = min(
+                current[j - 1] + 1,
+                row[j] + 1,
+                row[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        before, row = row, current
+    return row[-1]
+
+
+class AirportSearchIndex:
+    """
+    In-memory autocomplete over the bundled airports and metro areas.
+
+    Codes, city, name and country tokens go into one prefix trie whose nodes
+    hold every entry below them, so a keystroke costs one walk per query
+    token plus a dict intersection. Tokens with no prefix match fall back to
+    prefixes one typo away, found through a deletion index over the trie.
+    Both are built up front, so no query pays for construction.
+    Results rank by field (code, then city, name, country), then by passenger
+    traffic.
+    """
+
+    def __init__(self, reference_index: ReferenceIndex):
+        reference_index._ensure_loaded()
+        self.entries: List[_Entry] = []
+        self.root = _TrieNode()
+        self._prefix_nodes: Dict[str, _TrieNode] = {}
+        self._deletions: Dict[str, Set[str]] = {}
+
+        for row, code in enumerate(reference_index.codes):
+            self._add(
+                _Entry(
+                    code=code,
+                    name=reference_index.names[row],
+                    city=reference_index.cities[row],
+                    country=reference_index.countries[row],
+                    type="airport",
+                    popularity=float(reference_index.passengers[row]),
+                )
+            )
+
+        for metro, rows in reference_index._metro_rows.items():
+            if len(rows) < 2:
+                continue  # Single-airport metros would just duplicate the airport
+            self._add(
+                _Entry(
+                    code=metro,
+                    name=reference_index.airport_name(metro),
+                    city=reference_index.cities[rows[0]],
+                    country=reference_index.countries[rows[0]],
+                    type="metro",
+                    popularity=float(reference_index.passengers[rows].sum()),
+                )
+            )
+
+        self._build_typo_index()
+
+    def _add(self, entry: _Entry):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        fields = (
+            (CODE, [entry.code.lower()]),
+            (CITY, _tokens(entry.city)),
+            (NAME, _tokens(entry.name)),
+            (COUNTRY, _tokens(entry.country)),
+        )
+        for rank, tokens in fields:
+            for token in tokens:
+                node = self.root
+                for char in token:
+                    node = node.children.setdefault(char, _TrieNode())
+                    if node.matches.get(entry_id, rank + 1) > rank:
+                        node.matches[entry_id] = rank
+
+    def search(self, query: str, limit: int = 10) -> List[AirportSuggestion]:
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+
+        ranked: Optional[Dict[int, int]] = None
+        for token in tokens:
+            matches = self._prefix_matches(token)
+            if not matches and len(token) >= 3:
+                matches = self._fuzzy_matches(token)
+            if ranked is None:
+                ranked = dict(matches)
+            else:
+                # Every query token must match; keep the best field rank
+                ranked = {
+                    entry_id: min(rank, matches[entry_id])
+                    for entry_id, rank in ranked.items()
+                    if entry_id in matches
+                }
+            if not ranked:
+                return []
+
+        if len(tokens) == 1:
+            code = tokens[0].upper()
+            for entry_id in ranked:
+                if self.entries[entry_id].code == code:
+                    ranked[entry_id] = EXACT_CODE
+
+        best = sorted(ranked, key=lambda e: (ranked[e], -self.entries[e].popularity))[
+            :limit
+        ]
+        return [
+            AirportSuggestion(
+                code=entry.code,
+                name=entry.name,
+                city=entry.city,
+                country=entry.country,
+                type=entry.type,
+            )
+            for entry in (self.entries[entry_id] for entry_id in best)
+        ]
+
+    def _prefix_matches(self, token: str) -> Dict[int, int]:
+        node = self.root
+        for char in token:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        return node.matches
+
+    def _build_typo_index(self):
+        """Map every one-letter deletion of each trie prefix to that prefix"""
+        stack = [("", self.root)]
+        while stack:
+            prefix, node = stack.pop()
+            for char, child in node.children.items():
+                stack.append((prefix + char, child))
+            if len(prefix) < 2:
+                continue
+            self._prefix_nodes[prefix] = node
+            for variant in _deletions(prefix):
+                self._deletions.setdefault(variant, set()).add(prefix)
+
+    def _fuzzy_matches(self, token: str) -> Dict[int, int]:
+        """
+        Entries with a token prefix one edit away from ``token``.
+
+        Two strings within one edit share a one-letter deletion (or one is a
+        deletion of the other), so candidates come from the deletion index and
+        are confirmed with an edit distance that counts adjacent swaps as one.
+        """
+        candidates: Set[str] = set()
+        for variant in _deletions(token):
+            candidates.update(self._deletions.get(variant, ()))
+        candidates.update(p for p in _deletions(token) if p in self._prefix_nodes)
+
+        matches: Dict[int, int] = {}
+        for prefix in candidates:
+            if _edit_distance(token, prefix) > 1:
+                continue
+            for entry_id, rank in self._prefix_nodes[prefix].matches.items():
+                rank += FUZZY_PENALTY
+                if matches.get(entry_id, rank + 1) > rank:
+                    matches[entry_id] = rank
+        return matches
+
+
+class AirportSearchService:
+    """
+    Airport autocomplete backed by an AirportSearchIndex.
+
+    The app builds the index at startup with ``load``; anything that
+    searches before that (scripts, tests) builds it on first use.
+    """
+
+    def __init__(self):
+        self._index: Optional[AirportSearchIndex] = None
+
+    def load(self):
+        """Build the trie and typo index from the loaded reference data"""
+        self._index = AirportSearchIndex(reference)
+
+    @property
+    def index(self) -> AirportSearchIndex:
+        if self._index is None:
+            self.load()
+        return self._index
+
+    def search(self, query: str, limit: int = 10) -> List[AirportSuggestion]:
+        return self.index.search(query, limit)
+
+
+airport_search_service = AirportSearchService()
@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from app.cache import cache
+from app.config import settings
+from app.integrations.serpapi_flights import SerpAPIFlights
+from app.models.flights import BookingOption, BookingOptionsResponse, Flight
+from app.services.search_session_service import SearchSessionService
+import logging
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_FLIGHTS_PROVIDER = "Google Flights"
+
+
+class BookingService:
+    """
+    Resolves flights to booking offers.
+
+    Google Flights results carry a SerpAPI ``booking_token`` instead of a URL,
+    and resolving it is a second SerpAPI call. Resolved offers are cached per
+    token for ``settings.booking_options_ttl``; concurrent requests for the same
+    token share one in-flight lookup, and the top results of a search can be
+    resolved in the background before anyone clicks.
+    """
+
+    def __init__(self):
+        self.serpapi_flights = SerpAPIFlights()
+        self.search_session_service = SearchSessionService()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    async def get_booking_options(
+        self, flight_id: str
+    ) -> Optional[BookingOptionsResponse]:
+        """Booking offers for a flight from a recent search, or None if unknown"""
+        flight = await self.search_session_service.get_flight(flight_id)
+        if not flight:
+            return None
+
+        options, cache_hit = await self.resolve(flight)
+        return BookingOptionsResponse(
+            flight_id=flight.id, options=options, cache_hit=cache_hit
+        )
+
+    async def resolve(self, flight: Flight) -> Tuple[List[BookingOption], bool]:
+        """Return (options, cache_hit) for a flight"""
+        if flight.provider != GOOGLE_FLIGHTS_PROVIDER:
+            # Other providers already link straight to a booking page
+            if not flight.deep_link:
+                return [], False
+            option = BookingOption(
+                book_with=flight.provider,
+                price=flight.price,
+                currency=flight.currency,
+                url=flight.deep_link,
+            )
+            return [option], False
+
+        if not flight.deep_link:
+            return [], False
+
+        cache_key = self._cache_key(flight.deep_link)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return [BookingOption(**option) for option in cached], True
+
+        task = self._pending.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(cache_key, flight))
+            self._pending[cache_key] = task
+            task.add_done_callback(lambda _: self._pending.pop(cache_key, None))
+
+        # Shielded so one client disconnecting doesn't cancel the shared lookup
+        return await asyncio.shield(task), False
+
+    async def prefetch(self, flights: List[Flight]):
+        """Resolve the first few Google Flights results ahead of any click"""
+        candidates = [
+            f for f in flights if f.provider == GOOGLE_FLIGHTS_PROVIDER and f.deep_link
+        ][: settings.booking_prefetch_count]
+        if not candidates:
+            return
+
+        results = await asyncio.gather(
+            *(self.resolve(f) for f in candidates), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Booking options prefetch failed: {result}")
+
+    async def _fetch(self, cache_key: str, flight: Flight) -> List[BookingOption]:
+        options = await self.serpapi_flights.get_booking_options(flight)
+        # Empty answers are usually failures or expired tokens - don't pin them
+        if options:
+            await cache.set(
+                cache_key,
+                [option.model_dump() for option in options],
+                ttl=settings.booking_options_ttl,
+            )
+        return options
+
+    @staticmethod
+    def _cache_key(booking_token: str) -> str:
+        # Tokens are long opaque strings; hash them into a compact key
+        return f"booking_options:{hashlib.md5(booking_token.encode()).hexdigest()}"
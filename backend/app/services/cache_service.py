@@ -1,6 +1,6 @@
-from typing import Any, Optional, List
+from typing import Any, Dict, Optional, List
 from app.cache import cache
-from app.models.flights import FlightSearchRequest, FlightSearchResponse
+from app.models.flights import FlightSearchRequest
 from app.models.hotels import HotelSearchRequest, HotelSearchResponse
 import hashlib
 import json
@@ -9,6 +9,22 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Request fields that change what providers return. Everything else on
+# FlightSearchRequest (price cap, airline/time/duration filters, sort order) is
+# applied server-side over the cached result set.
+FLIGHT_PROVIDER_FIELDS = {
+    "origin",
+    "destination",
+    "departure_date",
+    "return_date",
+    "adults",
+    "children",
+    "infants",
+    "cabin_class",
+    "direct_flights_only",
+}
+
+
 class CacheService:
     @staticmethod
     def _generate_cache_key(prefix: str, search_request: Any) -> str:
@@ -20,33 +36,44 @@ class CacheService:
         return f"{prefix}:{hash_object.hexdigest()}"
 
     @staticmethod
-    async def get_flight_results(
-        search_request: FlightSearchRequest,
-    ) -> Optional[FlightSearchResponse]:
-        """Get cached flight search results"""
-        cache_key = CacheService._generate_cache_key("flights", search_request)
-        cached_data = await cache.get(cache_key)
+    def flight_superset_key(
+        search_request: FlightSearchRequest, prefix: str = "flight_superset"
+    ) -> str:
+        """Cache key for the unfiltered provider result set of a search"""
+        request_dict = search_request.model_dump(include=FLIGHT_PROVIDER_FIELDS)
+        request_str = json.dumps(request_dict, sort_keys=True, default=str)
+        hash_object = hashlib.md5(request_str.encode())
+        return f"{prefix}:{hash_object.hexdigest()}"
 
-        if cached_data:
-            try:
-                return FlightSearchResponse(**cached_data)
-            except Exception as e:
-                logger.error(f"Failed to deserialize cached flight data: {e}")
-                await cache.delete(cache_key)
+    @staticmethod
+    async def get_flight_superset(
+        search_request: FlightSearchRequest,
+    ) -> Optional[Dict[str, Any]]:
+        """Get the cached, deduplicated provider result set for a search"""
+        cache_key = CacheService.flight_superset_key(search_request)
+        return await cache.get(cache_key)
 
-        return None
+    @staticmethod
+    async def get_flight_supersets(
+        search_requests: List[FlightSearchRequest],
+        prefix: str = "flight_superset",
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Get cached result sets for several searches in one round trip"""
+        cache_keys = [
+            CacheService.flight_superset_key(r, prefix) for r in search_requests
+        ]
+        return await cache.mget(cache_keys)
 
     @staticmethod
-    async def cache_flight_results(
+    async def cache_flight_superset(
         search_request: FlightSearchRequest,
-        response: FlightSearchResponse,
+        superset: Dict[str, Any],
         ttl: int = None,
+        prefix: str = "flight_superset",
     ) -> bool:
-        """Cache flight search results"""
-        cache_key = CacheService._generate_cache_key("flights", search_request)
-        response_dict = response.model_dump()
-
-        return await cache.set(cache_key, response_dict, ttl)
+        """Cache the deduplicated provider result set for a search"""
+        cache_key = CacheService.flight_superset_key(search_request, prefix)
+        return await cache.set(cache_key, superset, ttl)
 
     @staticmethod
     async def get_hotel_results(
@@ -4,6 +4,7 @@ from sqlalchemy import desc, asc, func
 from ..models.destinations import Destination, DestinationPricing, TravelGuide
 from ..database import get_db
 from ..config import settings
+from .explore_service import ExploreService
 import requests
 import redis
 import json
@@ -162,25 +163,13 @@ class DestinationService:
         self.db.commit()
 
     async def _fetch_current_flight_price(self, city_code: str) -> Optional[float]:
-        """Fetch current flight price from external API"""
-        # This would integrate with your flight API
-        # For now, return a mock price with some variation
-        import random
-
-        base_prices = {
-            "paris": 650,
-            "london": 550,
-            "rome": 580,
-            "barcelona": 520,
-            "berlin": 480,
-            "amsterdam": 520,
-            "athens": 590,
-            "istanbul": 650,
-        }
-        base_price = base_prices.get(city_code.lower(), 600)
-        # Add 10% random variation
-        variation = random.uniform(0.9, 1.1)
-        return round(base_price * variation, 2)
+        """Cheapest indexed fare to the city from the home origin, if any"""
+        explore_service = ExploreService()
+        code = explore_service.resolve_city(city_code)
+        if code is None:
+            print(f"No airport found for destination {city_code}")
+            return None
+        return await explore_service.cheapest_fare_to(code)
 
     def _format_destination(self, dest: Destination) -> Dict[str, Any]:
         """Format destination for API response"""
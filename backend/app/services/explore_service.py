@@ -0,0 +1,122 @@
+from datetime import date
+from typing import Dict, List, Optional
+from app.cache import cache
+from app.config import settings
+from app.models.flights import ExploreDestination, ExploreResponse
+from app.reference import reference
+from app.services.airport_search_service import airport_search_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def explore_key(origin: str, month: date) -> str:
+    return f"explore:{origin.upper()}:{month.strftime('%Y-%m')}"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class ExploreService:
+    """
+    Cheapest known fare from an origin to every destination, per month.
+
+    Each origin-month is one Redis sorted set of destination cities (metro
+    code, or airport code outside metros) scored by the lowest USD fare,
+    so "cheapest places from X in month Y" is a single ZRANGE. Live
+    searches only ever lower a score; warming jobs overwrite scores with
+    fresh bulk provider prices, which is what lets stale lows age out.
+    Only economy one-adult searches are recorded, matching the bulk prices.
+    Fares from an airport are recorded under its metro code as well.
+    """
+
+    @staticmethod
+    def _origins(origin: str) -> List[str]:
+        origin = origin.upper()
+        city = reference.city_code(origin)
+        return [origin] if city == origin else [origin, city]
+
+    async def record(
+        self, origin: str, destination: str, departure_date: date, price: float
+    ):
+        """Fold a live search's cheapest USD fare into the index"""
+        if price <= 0:
+            return
+        mapping = {reference.city_code(destination): round(price, 2)}
+        for key_origin in self._origins(origin):
+            await cache.zadd(
+                explore_key(key_origin, departure_date),
+                mapping,
+                ttl=settings.explore_ttl,
+                only_lower=True,
+            )
+
+    async def record_bulk(self, origin: str, month: date, prices: Dict[str, float]):
+        """Replace scores with a warming job's fresh per-destination prices"""
+        lowest: Dict[str, float] = {}
+        for destination, price in prices.items():
+            city = reference.city_code(destination)
+            if price > 0 and (city not in lowest or price < lowest[city]):
+                lowest[city] = round(price, 2)
+        lowest.pop(reference.city_code(origin), None)
+        if lowest:
+            await cache.zadd(
+                explore_key(origin, month), lowest, ttl=settings.explore_ttl
+            )
+
+    async def cheapest_destinations(
+        self, origin: str, month: date, limit: int = 20
+    ) -> ExploreResponse:
+        """Cheapest destinations from an airport or metro in a month, cheapest first"""
+        origin = origin.upper()
+        ranked = await cache.zrange_with_scores(
+            explore_key(origin, month), 0, limit - 1
+        )
+        return ExploreResponse(
+            origin=origin,
+            month=month.strftime("%Y-%m"),
+            destinations=[
+                ExploreDestination(
+                    code=code,
+                    city=reference.city_name(code),
+                    country=self._country(code),
+                    price=round(float(price), 2),
+                )
+                for code, price in ranked
+            ],
+        )
+
+    async def cheapest_fare_to(
+        self,
+        destination: str,
+        origin: Optional[str] = None,
+        months: Optional[int] = None,
+    ) -> Optional[float]:
+        """Lowest indexed fare to a destination city over the coming months"""
+        origin = origin or settings.explore_home_origin
+        months = months or settings.explore_price_months
+        this_month = date.today().replace(day=1)
+        member = reference.city_code(destination)
+        scores = await cache.zscores(
+            [
+                (explore_key(origin, add_months(this_month, n)), member)
+                for n in range(months)
+            ]
+        )
+        prices = [float(score) for score in scores if score is not None]
+        return min(prices) if prices else None
+
+    def resolve_city(self, city: str) -> Optional[str]:
+        """Metro or airport code for a city name or slug (e.g. "paris" -> PAR)"""
+        name = city.replace("-", " ").strip().lower()
+        for suggestion in airport_search_service.search(name, limit=3):
+            if suggestion.city.lower() == name:
+                return reference.city_code(suggestion.code)
+        return None
+
+    @staticmethod
+    def _country(code: str) -> str:
+        row = reference._primary_row(code)
+        return reference.countries[row] if row is not None else ""
@@ -0,0 +1,441 @@
+import calendar
+import hashlib
+from datetime import datetime, time as dt_time
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from app.fx import fx
+from app.models.flights import Flight, FlightSearchRequest, FlightSortOption
+from app.services.ranking_service import FlightRanker
+
+# Per-flight columns and their dtypes. Airlines are stored separately as a
+# vocabulary plus one flat array of segment airline indices.
+COLUMN_DTYPES = {
+    "price": np.float64,
+    "price_usd": np.float64,  # Price normalized to USD; NaN for unknown currencies
+    "duration": np.int32,
+    "stops": np.int16,
+    "departure": np.int64,  # Departure wall-clock time as epoch seconds
+    "departure_minute": np.int16,  # Minute of day of the first departure
+    "arrival_minute": np.int16,  # Minute of day of the final arrival
+    "signature": np.int64,  # Hash of the dedup signature
+    "recommended": bool,
+    "currency": "<U3",
+    "segment_count": np.int32,
+}
+
+PRICE_HISTOGRAM_BUCKETS = 10
+
+
+def _signature_hash(flight: Flight) -> int:
+    """64-bit hash of the dedup signature (route, departure time, fare)"""
+    first_segment = flight.segments[0]
+    last_segment = flight.segments[-1]
+    signature = f"{first_segment.origin.code}_{last_segment.destination.code}_{first_segment.departure_time.isoformat()}_{flight.price}_{flight.currency}"
+    digest = hashlib.blake2b(signature.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _minute_of_day(value: datetime) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _window_mask(
+    minutes: np.ndarray, start: Optional[dt_time], end: Optional[dt_time]
+) -> np.ndarray:
+    """Vectorized time-of-day window check; windows may wrap past midnight"""
+    low = start.hour * 60 + start.minute if start else 0
+    high = end.hour * 60 + end.minute if end else 24 * 60 - 1
+    if low <= high:
+        return (minutes >= low) & (minutes <= high)
+    return (minutes >= low) | (minutes <= high)
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + count)`` for each pair, vectorized"""
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    run_starts = np.cumsum(counts) - counts
+    return np.repeat(starts - run_starts, counts) + np.arange(total)
+
+
+class FlightColumns:
+    """
+    Columnar view of a flight result set.
+
+    Price, duration, stops, departure time, a dedup signature hash and the
+    other filter inputs live in NumPy arrays; dedup, filters, facet counts
+    and ordering all work on index arrays over them. Prices are compared in
+    USD (``price_usd``), converted for the whole set at once. Records are kept as
+    they came (``Flight`` models from providers, or their dicts from cache)
+    and only the selected page is materialized as ``Flight`` models.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Union[Flight, Dict[str, Any]]],
+        columns: Dict[str, Any],
+    ):
+        self.records = list(records)
+        for name, dtype in COLUMN_DTYPES.items():
+            setattr(self, name, np.asarray(columns[name], dtype=dtype))
+
+        self.airline_codes: List[str] = list(columns["airline_codes"])
+        self.airline_names: List[str] = list(columns["airline_names"])
+        self.segment_airline = np.asarray(columns["segment_airline"], dtype=np.int32)
+        self.segment_offsets = (
+            np.cumsum(self.segment_count, dtype=np.int64) - self.segment_count
+        )
+        self._facets: Optional[Dict[str, Any]] = columns.get("facets")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def from_flights(cls, flights: Sequence[Flight]) -> "FlightColumns":
+        """Build columns from parsed provider flights in one pass"""
+        vocabulary: Dict[str, int] = {}
+        airline_names: List[str] = []
+        columns: Dict[str, List[Any]] = {name: [] for name in COLUMN_DTYPES}
+        segment_airline: List[int] = []
+
+        for flight in flights:
+            departure = flight.segments[0].departure_time
+            arrival = flight.segments[-1].arrival_time
+            columns["price"].append(flight.price)
+            columns["duration"].append(flight.total_duration_minutes)
+            columns["stops"].append(flight.stops)
+            columns["departure"].append(calendar.timegm(departure.timetuple()))
+            columns["departure_minute"].append(_minute_of_day(departure))
+            columns["arrival_minute"].append(_minute_of_day(arrival))
+            columns["signature"].append(_signature_hash(flight))
+            columns["recommended"].append(flight.provider_recommended)
+            columns["currency"].append((flight.currency or "").strip())
+            columns["segment_count"].append(len(flight.segments))
+
+            for segment in flight.segments:
+                code = segment.airline.code.upper()
+                if code not in vocabulary:
+                    vocabulary[code] = len(vocabulary)
+                    airline_names.append(segment.airline.name or code)
+                segment_airline.append(vocabulary[code])
+
+        columns["price_usd"] = fx.to_usd_array(
+            np.asarray(columns["price"], dtype=np.float64),
+            np.asarray(columns["currency"]),
+        )
+        for flight, price_usd in zip(flights, columns["price_usd"].tolist()):
+            flight.price_usd = None if np.isnan(price_usd) else price_usd
+
+        columns["airline_codes"] = list(vocabulary)
+        columns["airline_names"] = airline_names
+        columns["segment_airline"] = segment_airline
+        return cls(flights, columns)
+
+    @classmethod
+    def from_cache(cls, cached: Dict[str, Any]) -> "FlightColumns":
+        """Rebuild columns from a cached result set without parsing any flights"""
+        return cls(cached["flights"], cached["columns"])
+
+    def to_cache(self) -> Dict[str, Any]:
+        """Serialize as flight dicts plus their column lists and facets"""
+        columns = {name: getattr(self, name).tolist() for name in COLUMN_DTYPES}
+        columns["airline_codes"] = self.airline_codes
+        columns["airline_names"] = self.airline_names
+        columns["segment_airline"] = self.segment_airline.tolist()
+        columns["facets"] = self.facets()
+        return {
+            "flights": [
+                r.model_dump() if isinstance(r, Flight) else r for r in self.records
+            ],
+            "columns": columns,
+        }
+
+    def take(self, indices: np.ndarray) -> "FlightColumns":
+        """New column set holding only ``indices``, in that order"""
+        columns = {name: getattr(self, name)[indices] for name in COLUMN_DTYPES}
+        columns["airline_codes"] = self.airline_codes
+        columns["airline_names"] = self.airline_names
+        columns["segment_airline"] = self.segment_airline[
+            _ranges(self.segment_offsets[indices], self.segment_count[indices])
+        ]
+        return FlightColumns([self.records[i] for i in indices], columns)
+
+    @classmethod
+    def concat(cls, parts: Sequence["FlightColumns"]) -> "FlightColumns":
+        """Stack several column sets, merging their airline vocabularies"""
+        vocabulary: Dict[str, int] = {}
+        airline_names: List[str] = []
+        remapped = []
+        for part in parts:
+            mapping = []
+            for code, name in zip(part.airline_codes, part.airline_names):
+                if code not in vocabulary:
+                    vocabulary[code] = len(vocabulary)
+                    airline_names.append(name)
+                mapping.append(vocabulary[code])
+            remapped.append(np.asarray(mapping, dtype=np.int32)[part.segment_airline])
+
+        columns: Dict[str, Any] = {
+            name: (
+                np.concatenate([getattr(p, name) for p in parts])
+                if parts
+                else np.zeros(0, dtype=dtype)
+            )
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+        columns["airline_codes"] = list(vocabulary)
+        columns["airline_names"] = airline_names
+        columns["segment_airline"] = (
+            np.concatenate(remapped) if remapped else np.zeros(0, dtype=np.int32)
+        )
+        return cls([r for p in parts for r in p.records], columns)
+
+    def ids(self, indices: np.ndarray) -> List[str]:
+        """Flight IDs of ``indices`` without materializing the flights"""
+        return [
+            r.id if isinstance(r, Flight) else r["id"]
+            for r in (self.records[i] for i in indices)
+        ]
+
+    def all(self) -> np.ndarray:
+        return np.arange(len(self), dtype=np.int64)
+
+    def valid(self, indices: np.ndarray) -> np.ndarray:
+        """Drop rows with non-positive prices or a missing or unknown currency"""
+        mask = (
+            (self.price[indices] > 0)
+            & (self.currency[indices] != "")
+            & np.isfinite(self.price_usd[indices])
+        )
+        return indices[mask]
+
+    def deduplicate(self, indices: np.ndarray) -> np.ndarray:
+        """Keep the first row of each signature hash, preserving input order"""
+        if not len(indices):
+            return indices
+        _, first = np.unique(self.signature[indices], return_index=True)
+        return indices[np.sort(first)]
+
+    def filter(
+        self, indices: np.ndarray, search_request: FlightSearchRequest
+    ) -> np.ndarray:
+        """Apply every FlightSearchRequest filter as one boolean mask"""
+        indices = self.valid(indices)
+        mask = np.ones(len(indices), dtype=bool)
+
+        if search_request.max_price:
+            mask &= self.price_usd[indices] <= search_request.max_price
+        if search_request.direct_flights_only:
+            mask &= self.stops[indices] == 0
+        if search_request.max_stops is not None:
+            mask &= self.stops[indices] <= search_request.max_stops
+        if search_request.max_duration_minutes:
+            mask &= self.duration[indices] <= search_request.max_duration_minutes
+        if search_request.airlines:
+            mask &= self._airline_mask(set(search_request.airlines))[indices]
+        if search_request.departure_time_from or search_request.departure_time_to:
+            mask &= _window_mask(
+                self.departure_minute[indices],
+                search_request.departure_time_from,
+                search_request.departure_time_to,
+            )
+        if search_request.arrival_time_from or search_request.arrival_time_to:
+            mask &= _window_mask(
+                self.arrival_minute[indices],
+                search_request.arrival_time_from,
+                search_request.arrival_time_to,
+            )
+
+        return indices[mask]
+
+    def _airline_mask(self, airlines: set) -> np.ndarray:
+        """Rows whose every segment is flown by one of ``airlines``"""
+        if not len(self):
+            return np.zeros(0, dtype=bool)
+        # One slot per vocabulary entry; every segment_airline indexes into the
+        # vocabulary, so no sentinel slot is needed for unknown carriers
+        allowed = np.zeros(len(self.airline_codes), dtype=bool)
+        for i, code in enumerate(self.airline_codes):
+            allowed[i] = code in airlines
+        return np.logical_and.reduceat(
+            allowed[self.segment_airline], self.segment_offsets
+        )
+
+    def order(
+        self,
+        indices: np.ndarray,
+        sort_by: FlightSortOption,
+        ranker: FlightRanker,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Return ``indices`` ordered by ``sort_by``, truncated to ``limit``.
+
+        With a limit, ``np.partition`` finds the cutoff in linear time and
+        only rows at or under it are sorted; price breaks ties.
+        """
+        if not len(indices):
+            return indices
+
+        price = self.price_usd[indices]
+        if sort_by == FlightSortOption.BEST:
+            scores, _ = self._score(indices, ranker)
+            keys = (price, scores)
+        elif sort_by == FlightSortOption.DURATION:
+            keys = (price, self.duration[indices])
+        elif sort_by == FlightSortOption.DEPARTURE_TIME:
+            keys = (price, self.departure[indices])
+        else:
+            keys = (price,)
+
+        if limit is not None and limit < len(indices):
+            primary = keys[-1]
+            cutoff = np.partition(primary, limit - 1)[limit - 1]
+            candidates = np.flatnonzero(primary <= cutoff)
+            ordered = candidates[np.lexsort(tuple(k[candidates] for k in keys))]
+            return indices[ordered[:limit]]
+
+        return indices[np.lexsort(keys)]
+
+    def facets(self) -> Dict[str, Any]:
+        """
+        Filter counts over every row, as a FlightFacets-shaped dict.
+
+        Computed once with array reductions (bincount / unique / histogram)
+        and kept with the cached columns, so cache hits reuse it.
+        """
+        if self._facets is None:
+            self._facets = self._compute_facets()
+        return self._facets
+
+    def _compute_facets(self) -> Dict[str, Any]:
+        if not len(self):
+            return {"departure_hours": [0] * 24}
+
+        # Count each airline once per flight, even when it flies several segments
+        vocabulary_size = len(self.airline_codes)
+        segment_flight = np.repeat(self.all(), self.segment_count)
+        flight_airlines = np.unique(
+            segment_flight * vocabulary_size + self.segment_airline
+        )
+        airline_counts = np.bincount(
+            flight_airlines % vocabulary_size, minlength=vocabulary_size
+        )
+        airlines = [
+            {
+                "code": self.airline_codes[i],
+                "name": self.airline_names[i],
+                "count": int(airline_counts[i]),
+            }
+            for i in np.lexsort((np.arange(vocabulary_size), -airline_counts))
+            if airline_counts[i]
+        ]
+
+        stop_values, stop_counts = np.unique(self.stops, return_counts=True)
+        bucket_counts, edges = np.histogram(
+            self.price_usd, bins=PRICE_HISTOGRAM_BUCKETS
+        )
+        hour_counts = np.bincount(self.departure_minute // 60, minlength=24)
+
+        return {
+            "airlines": airlines,
+            "stops": [
+                {"stops": int(value), "count": int(count)}
+                for value, count in zip(stop_values, stop_counts)
+            ],
+            "price_histogram": [
+                {
+                    "min_price": round(float(edges[i]), 2),
+                    "max_price": round(float(edges[i + 1]), 2),
+                    "count": int(count),
+                }
+                for i, count in enumerate(bucket_counts)
+            ],
+            "departure_hours": hour_counts[:24].tolist(),
+            "min_price": float(self.price_usd.min()),
+            "max_price": float(self.price_usd.max()),
+            "min_duration_minutes": int(self.duration.min()),
+            "max_duration_minutes": int(self.duration.max()),
+        }
+
+    def price_summary(self) -> List[Dict[str, Any]]:
+        """
+        Min and median USD price and offer count, overall and per airline.
+
+        The overall row has airline ""; airlines are keyed by the first
+        segment's (validating) carrier. One sort groups every airline's
+        prices contiguously.
+        """
+        if not len(self):
+            return []
+
+        def summarize(airline: str, prices: np.ndarray) -> Dict[str, Any]:
+            return {
+                "airline": airline,
+                "min_price_usd": round(float(prices[0]), 2),
+                "median_price_usd": round(float(np.median(prices)), 2),
+                "offers": int(len(prices)),
+            }
+
+        order = np.argsort(self.price_usd, kind="stable")
+        summary = [summarize("", self.price_usd[order])]
+
+        carrier = self.segment_airline[self.segment_offsets][order]
+        grouped = order[np.argsort(carrier, kind="stable")]
+        codes, starts = np.unique(np.sort(carrier), return_index=True)
+        for code, prices in zip(codes, np.split(self.price_usd[grouped], starts[1:])):
+            summary.append(summarize(self.airline_codes[code], prices))
+        return summary
+
+    def _score(self, indices: np.ndarray, ranker: FlightRanker):
+        return ranker.score_arrays(
+            self.price_usd[indices],
+            self.duration[indices],
+            self.stops[indices],
+            self.recommended[indices],
+        )
+
+    def materialize(
+        self,
+        page: np.ndarray,
+        ranker: Optional[FlightRanker] = None,
+        population: Optional[np.ndarray] = None,
+    ) -> List[Flight]:
+        """
+        Turn the selected rows into Flight models.
+
+        With a ranker, each flight gets its score and ranking tags relative
+        to ``population`` (the full filtered set the page was taken from).
+        """
+        flights = [self._as_flight(self.records[i]) for i in page]
+        if ranker is None or not flights:
+            return flights
+
+        population = page if population is None else population
+        scores, on_front = self._score(population, ranker)
+        position = {int(row): n for n, row in enumerate(population)}
+        rows = np.array([position[int(row)] for row in page])
+        tags = ranker.tags(
+            self.price_usd[population],
+            self.duration[population],
+            self.stops[population],
+            self.recommended[population],
+            on_front,
+            rows,
+        )
+        best = int(np.lexsort((self.price_usd[population], scores))[0])
+
+        for flight, row, reasons in zip(flights, rows, tags):
+            if row == best:
+                reasons.append("best_value")
+            flight.score = round(float(scores[row]), 4)
+            flight.ranking_tags = reasons
+
+        return flights
+
+    @staticmethod
+    def _as_flight(record: Union[Flight, Dict[str, Any]]) -> Flight:
+        if isinstance(record, Flight):
+            return record.model_copy()
+        return Flight(**record)
@@ -1,20 +1,46 @@
 import asyncio
 import time
 import uuid
-from typing import List, Set
-from app.models.flights import FlightSearchRequest, FlightSearchResponse, Flight
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.models.flights import (
+    FlightSearchRequest,
+    FlightSearchResponse,
+    BatchFlightSearchItem,
+    Flight,
+    FlightSortOption,
+    FlightFacets,
+    FlexibleDateSearchRequest,
+    FlexibleDateSearchResponse,
+    DailyFare,
+    NearbyAlternative,
+)
 from app.integrations import KiwiAPI, SkyscannerAPI, AviasalesAPI
 from app.integrations.amadeus_api import AmadeusAPI
 from app.integrations.mock_flight_api import MockFlightAPI
 from app.integrations.serpapi_flights import SerpAPIFlights
 from app.integrations.travelpayouts_api import TravelpayoutsAPI
 from app.config import settings
+from app.geo import airport_tree
+from app.reference import reference
 from app.services.cache_service import CacheService
-from app.database import supabase
+from app.services.explore_service import ExploreService
+from app.services.flight_columns import FlightColumns
+from app.services.negative_route_service import NegativeRouteIndex
+from app.services.price_calendar_service import PriceCalendarService
+from app.services.price_history_service import PriceHistoryService
+from app.services.price_sketch_service import price_sketches, price_label
+from app.services.ranking_service import FlightRanker
+from app.services.search_session_service import SearchSessionService
+from app.batch_writer import search_log_writer
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cache prefix for Kiwi date-range answers, kept apart from full result sets
+KIWI_WINDOW_PREFIX = "kiwi_window"
+
 
 class FlightService:
     def __init__(self):
@@ -26,6 +52,12 @@ class FlightService:
         self.travelpayouts_api = TravelpayoutsAPI()
         self.mock_api = MockFlightAPI()
         self.cache_service = CacheService()
+        self.price_calendar_service = PriceCalendarService()
+        self.price_history_service = PriceHistoryService()
+        self.explore_service = ExploreService()
+        self.negative_routes = NegativeRouteIndex()
+        self.ranker = FlightRanker()
+        self.search_session_service = SearchSessionService()
 
     async def search_flights(
         self, search_request: FlightSearchRequest
@@ -38,126 +70,785 @@ class FlightService:
         search_request.origin = search_request.origin.upper()
         search_request.destination = search_request.destination.upper()
 
-        # Check cache first
-        cached_response = await self.cache_service.get_flight_results(search_request)
-        if cached_response:
-            cached_response.cache_hit = True
-            cached_response.search_time_ms = int((time.time() - start_time) * 1000)
-            logger.info(
-                f"Flight search cache hit for {search_request.origin}-{search_request.destination}"
+        providers_used = []
+
+        try:
+            columns, providers_used, cache_hit = await self._get_flight_superset(
+                search_request
+            )
+            return await self._build_search_response(
+                search_request,
+                search_id,
+                columns,
+                providers_used,
+                cache_hit,
+                start_time,
             )
 
-            # Log search to database
-            await self._log_search(search_request, cached_response, True)
-            return cached_response
+        except Exception as e:
+            logger.error(f"Flight search error: {e}")
+            # Return empty response on error
+            return self._empty_search_response(
+                search_request, search_id, providers_used, start_time
+            )
 
-        # Search across providers concurrently
-        providers_used = []
-        all_flights = []
+    async def search_flights_batch(
+        self, search_requests: List[FlightSearchRequest], limit: int = 50
+    ) -> List[BatchFlightSearchItem]:
+        """
+        Search several routes at once, returning one item per search in order.
+
+        Airport pairs shared between the searches are looked up and fetched
+        only once: every cached pair comes back in one MGET and the misses
+        are fetched concurrently. One provider concurrency cap covers the
+        whole batch, nearby-airport alternatives included. Each search then
+        gets its own filters, sort and page of ``limit`` flights; a search
+        whose providers failed gets an error without failing the others.
+        """
+        start_time = time.time()
+        for search_request in search_requests:
+            search_request.origin = search_request.origin.upper()
+            search_request.destination = search_request.destination.upper()
+        semaphore = asyncio.Semaphore(settings.provider_concurrency)
 
         try:
-            # Only use SerpAPI for clean, real flight data
-            tasks = []
-            providers_used = []
-
-            # SerpAPI Google Flights (primary source)
-            if settings.serpapi_key:
-                tasks.append(self._search_serpapi(search_request))
-                providers_used.append("Google Flights")
-            else:
-                logger.warning(
-                    "SerpAPI key not configured, no flight results available"
+            supersets = await self._get_flight_supersets(
+                search_requests, semaphore=semaphore, return_exceptions=True
+            )
+        except Exception as e:
+            logger.error(f"Batch flight search error: {e}")
+            return [
+                BatchFlightSearchItem(error="Flight search failed")
+                for _ in search_requests
+            ]
+
+        async def build(search_request, superset) -> BatchFlightSearchItem:
+            try:
+                if isinstance(superset, Exception):
+                    raise superset
+                columns, providers_used, cache_hit = superset
+                response = await self._build_search_response(
+                    search_request,
+                    str(uuid.uuid4()),
+                    columns,
+                    providers_used,
+                    cache_hit,
+                    start_time,
+                    limit,
+                    semaphore,
                 )
-                # Return empty results if no SerpAPI key
-                return FlightSearchResponse(
-                    flights=[],
-                    search_id=search_id,
-                    total_results=0,
-                    search_params=search_request,
-                    providers=["No API configured"],
-                    cache_hit=False,
-                    search_time_ms=int((time.time() - start_time) * 1000),
+                return BatchFlightSearchItem(result=response)
+            except Exception as e:
+                logger.error(
+                    f"Flight search {search_request.origin}-"
+                    f"{search_request.destination} in batch failed: {e}"
                 )
+                return BatchFlightSearchItem(error="Flight search failed")
 
-            # Execute SerpAPI search with timeout
-            if tasks:
-                try:
-                    results = await asyncio.wait_for(
-                        asyncio.gather(*tasks, return_exceptions=True),
-                        timeout=15.0,  # 15 second timeout for SerpAPI
-                    )
-                except asyncio.TimeoutError:
-                    logger.warning("SerpAPI search timed out after 15s")
-                    return FlightSearchResponse(
-                        flights=[],
-                        search_id=search_id,
-                        total_results=0,
-                        search_params=search_request,
-                        providers=["Search timeout"],
-                        cache_hit=False,
-                        search_time_ms=int((time.time() - start_time) * 1000),
-                    )
+        return await asyncio.gather(
+            *(
+                build(search_request, superset)
+                for search_request, superset in zip(search_requests, supersets)
+            )
+        )
+
+    async def _build_search_response(
+        self,
+        search_request: FlightSearchRequest,
+        search_id: str,
+        columns: FlightColumns,
+        providers_used: List[str],
+        cache_hit: bool,
+        start_time: float,
+        limit: int = 50,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> FlightSearchResponse:
+        """Filter, order and page a result set, then save and log the search"""
+        # Filters and ordering run over the full provider result set, so a
+        # change of sort or filter is served from cache without a provider call
+        filtered = columns.filter(columns.all(), search_request)
+        page = columns.order(filtered, search_request.sort_by, self.ranker, limit=limit)
+
+        nearby_alternatives = None
+        if search_request.nearby_airports:
+            nearby_alternatives = await self._search_nearby_alternatives(
+                search_request,
+                (float(columns.price_usd[filtered].min()) if len(filtered) else None),
+                semaphore,
+            )
+
+        flights = columns.materialize(page, self.ranker, filtered)
+        await self._label_prices(search_request, flights)
+
+        # Create response
+        response = FlightSearchResponse(
+            flights=flights,
+            search_id=search_id,
+            total_results=len(filtered),
+            search_params=search_request,
+            providers=providers_used,
+            cache_hit=cache_hit,
+            search_time_ms=int((time.time() - start_time) * 1000),
+            facets=FlightFacets(**columns.facets()),
+            nearby_alternatives=nearby_alternatives,
+        )
+
+        # Keep the search addressable for detail, booking and share views
+        await self.search_session_service.save_session(response, columns.ids(filtered))
+
+        # Log search to database
+        await self._log_search(search_request, response, cache_hit)
+
+        logger.info(
+            f"Flight search completed: {len(filtered)} results in {response.search_time_ms}ms"
+            + (" (cache hit)" if cache_hit else "")
+        )
+        return response
+
+    @staticmethod
+    def _empty_search_response(
+        search_request: FlightSearchRequest,
+        search_id: str,
+        providers_used: List[str],
+        start_time: float,
+    ) -> FlightSearchResponse:
+        return FlightSearchResponse(
+            flights=[],
+            search_id=search_id,
+            total_results=0,
+            search_params=search_request,
+            providers=providers_used,
+            cache_hit=False,
+            search_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    async def _label_prices(
+        self, search_request: FlightSearchRequest, flights: List[Flight]
+    ):
+        """Tag each flight with its price percentile against the route's history"""
+        # The history only holds one-adult fares with connections allowed
+        if not flights or not search_request.is_reference_fare_search(any_cabin=True):
+            return
+        try:
+            ranks = await price_sketches.percentile_ranks(
+                search_request,
+                np.array([f.price_usd for f in flights], dtype=np.float64),
+            )
+        except Exception as e:
+            logger.error(f"Price labelling failed: {e}")
+            return
+        if ranks is None:
+            return
+        for flight, rank in zip(flights, ranks.tolist()):
+            flight.price_percentile = rank
+            flight.price_label = price_label(rank)
+
+    async def get_flight_results(
+        self, search_request: FlightSearchRequest, limit: Optional[int] = None
+    ) -> Tuple[List[Flight], List[str], bool]:
+        """
+        Get the filtered, ordered flights for a search without building a response.
+
+        Goes through the same cached result set as ``search_flights``, for
+        services that compose searches (multi-city, round trips). Only the
+        first ``limit`` flights are materialized.
+        Returns (flights, providers, cache_hit).
+        """
+        search_request.origin = search_request.origin.upper()
+        search_request.destination = search_request.destination.upper()
+
+        columns, providers, cache_hit = await self._get_flight_superset(search_request)
+        filtered = columns.filter(columns.all(), search_request)
+        page = columns.order(filtered, search_request.sort_by, self.ranker, limit)
+        return columns.materialize(page), providers, cache_hit
+
+    async def search_flexible_dates(
+        self, search_request: FlexibleDateSearchRequest
+    ) -> FlexibleDateSearchResponse:
+        """
+        Search a window of departure dates around the requested one.
+
+        All per-date result sets are looked up in one cache round trip, with
+        metro codes fanned out to their airport pairs; only the missing dates
+        go to the providers, concurrently and capped by
+        ``settings.provider_concurrency``. Round trips keep the requested
+        length of stay.
+        """
+        start_time = time.time()
+        search_id = str(uuid.uuid4())
+
+        search_request.origin = search_request.origin.upper()
+        search_request.destination = search_request.destination.upper()
+
+        day_requests = self._expand_date_window(search_request)
+        supersets = await self._get_flight_supersets(
+            day_requests, fetch=self._fetch_date_window
+        )
+
+        day_columns: Dict[date, FlightColumns] = {}
+        day_cache_hits: Set[date] = set()
+        providers_used: Set[str] = set()
+
+        for day_request, (columns, providers, cache_hit) in zip(
+            day_requests, supersets
+        ):
+            day_columns[day_request.departure_date] = columns
+            providers_used.update(providers)
+            if cache_hit:
+                day_cache_hits.add(day_request.departure_date)
+
+        daily_fares = []
+        window_parts = []
+        for day_request in day_requests:
+            columns = day_columns.get(day_request.departure_date)
+            filtered = (
+                columns.filter(columns.all(), search_request)
+                if columns is not None
+                else np.zeros(0, dtype=np.int64)
+            )
+            min_price = (
+                float(columns.price_usd[filtered].min()) if len(filtered) else None
+            )
+            daily_fares.append(
+                DailyFare(
+                    departure_date=day_request.departure_date,
+                    return_date=day_request.return_date,
+                    min_price=min_price,
+                    currency="USD" if min_price is not None else None,
+                    flight_count=len(filtered),
+                    cache_hit=day_request.departure_date in day_cache_hits,
+                )
+            )
+            if len(filtered):
+                window_parts.append(columns.take(filtered))
+
+        window = FlightColumns.concat(window_parts)
+        population = window.all()
+        best_page = window.order(
+            population, search_request.sort_by, self.ranker, limit=20
+        )
+        best_flights = window.materialize(best_page, self.ranker, population)
+
+        logger.info(
+            f"Flexible search {search_request.origin}-{search_request.destination}: "
+            f"{len(day_requests)} days, {len(day_cache_hits)} from cache"
+        )
+
+        return FlexibleDateSearchResponse(
+            daily_fares=daily_fares,
+            best_flights=best_flights,
+            search_id=search_id,
+            search_params=search_request,
+            providers=sorted(providers_used),
+            cache_hits=len(day_cache_hits),
+            search_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    async def _search_nearby_alternatives(
+        self,
+        search_request: FlightSearchRequest,
+        requested_min_price: Optional[float],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[NearbyAlternative]:
+        """
+        Price the same search via airports near the requested origin and destination.
+
+        Up to ``nearby_airports`` alternatives within ``nearby_radius_km`` are
+        taken for each end from the spatial index and searched concurrently
+        through the cached path, so they share cache entries with direct
+        searches. Results are cheapest first, with savings against the
+        requested route. Provider calls share ``semaphore`` when given, so a
+        caller can keep one concurrency cap across several searches.
+        """
+        origin, destination = search_request.origin, search_request.destination
+        alternatives: List[Tuple[str, str, float]] = []
+        for code, km in airport_tree.nearby(
+            origin,
+            search_request.nearby_radius_km,
+            search_request.nearby_airports,
+            exclude=reference.expand(destination),
+        ):
+            alternatives.append((code, destination, km))
+        for code, km in airport_tree.nearby(
+            destination,
+            search_request.nearby_radius_km,
+            search_request.nearby_airports,
+            exclude=reference.expand(origin),
+        ):
+            alternatives.append((origin, code, km))
+        if not alternatives:
+            return []
+
+        semaphore = semaphore or asyncio.Semaphore(settings.provider_concurrency)
+
+        async def price(alternative_origin: str, alternative_destination: str):
+            alternative_request = search_request.model_copy(
+                update={
+                    "origin": alternative_origin,
+                    "destination": alternative_destination,
+                    "nearby_airports": 0,
+                }
+            )
+            columns, _, cache_hit = await self._get_flight_superset(
+                alternative_request, semaphore
+            )
+            filtered = columns.filter(columns.all(), search_request)
+            min_price = (
+                float(columns.price_usd[filtered].min()) if len(filtered) else None
+            )
+            return min_price, len(filtered), cache_hit
+
+        results = await asyncio.gather(
+            *(price(o, d) for o, d, _ in alternatives), return_exceptions=True
+        )
+
+        nearby = []
+        for (alternative_origin, alternative_destination, km), result in zip(
+            alternatives, results
+        ):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Nearby search {alternative_origin}-{alternative_destination} failed: {result}"
+                )
+                continue
+            min_price, flight_count, cache_hit = result
+            nearby.append(
+                NearbyAlternative(
+                    origin=alternative_origin,
+                    destination=alternative_destination,
+                    distance_km=km,
+                    min_price=min_price,
+                    savings=(
+                        round(requested_min_price - min_price, 2)
+                        if min_price is not None and requested_min_price is not None
+                        else None
+                    ),
+                    flight_count=flight_count,
+                    cache_hit=cache_hit,
+                )
+            )
+
+        nearby.sort(key=lambda a: (a.min_price is None, a.min_price or 0))
+        return nearby
+
+    def _expand_date_window(
+        self, search_request: FlexibleDateSearchRequest
+    ) -> List[FlightSearchRequest]:
+        """Build one search per departure date in the flexible window"""
+        today = date.today()
+        max_date = today + timedelta(days=330)  # Same limit as FlightSearchRequest
+        base = FlightSearchRequest(
+            **search_request.model_dump(exclude={"flexible_days"})
+        )
+
+        day_requests = []
+        for offset in range(
+            -search_request.flexible_days, search_request.flexible_days + 1
+        ):
+            departure = search_request.departure_date + timedelta(days=offset)
+            return_date = (
+                search_request.return_date + timedelta(days=offset)
+                if search_request.return_date
+                else None
+            )
+            if departure < today or (return_date or departure) > max_date:
+                continue
+            day_requests.append(
+                base.model_copy(
+                    update={"departure_date": departure, "return_date": return_date}
+                )
+            )
+
+        return day_requests
+
+    async def _fetch_date_window(
+        self, day_requests: List[FlightSearchRequest]
+    ) -> List[Tuple[FlightColumns, List[str]]]:
+        """
+        Fetch uncached dates of a flexible window from the providers.
 
-                # Collect results from SerpAPI
-                for i, result in enumerate(results):
-                    if isinstance(result, list):
-                        all_flights.extend(result)
-                        logger.info(f"SerpAPI returned {len(result)} flights")
-                    else:
-                        logger.error(f"SerpAPI search failed: {result}")
-                        return FlightSearchResponse(
-                            flights=[],
-                            search_id=search_id,
-                            total_results=0,
-                            search_params=search_request,
-                            providers=["Search failed"],
-                            cache_hit=False,
-                            search_time_ms=int((time.time() - start_time) * 1000),
+        Kiwi can answer a whole one-way date range of an airport pair in a
+        single call. Its answers are partial next to a full search, so they
+        are cached under their own prefix and never served to ``/search``;
+        dates Kiwi has no flights for go through the regular per-date path.
+        """
+        results: Dict[int, Tuple[FlightColumns, List[str]]] = {}
+
+        if settings.kiwi_api_key and not any(r.return_date for r in day_requests):
+            cached = await self.cache_service.get_flight_supersets(
+                day_requests, prefix=KIWI_WINDOW_PREFIX
+            )
+            routes: Dict[Tuple[str, str], List[int]] = {}
+            for i, (day_request, superset) in enumerate(zip(day_requests, cached)):
+                if superset:
+                    try:
+                        results[i] = (
+                            FlightColumns.from_cache(superset),
+                            superset["providers"],
                         )
+                        continue
+                    except Exception as e:
+                        logger.error(f"Failed to deserialize cached Kiwi window: {e}")
+                routes.setdefault(
+                    (day_request.origin, day_request.destination), []
+                ).append(i)
+
+            windows = [indexes for indexes in routes.values() if len(indexes) > 1]
+            semaphore = asyncio.Semaphore(settings.provider_concurrency)
+
+            async def fetch(indexes: List[int]):
+                async with semaphore:
+                    return await self._fetch_date_window_kiwi(
+                        [day_requests[i] for i in indexes]
+                    )
 
-            # Remove duplicates and sort by price
-            unique_flights = self._deduplicate_flights(all_flights)
-            sorted_flights = sorted(unique_flights, key=lambda x: x.price)
-
-            # Apply filters
-            filtered_flights = self._apply_filters(sorted_flights, search_request)
-
-            # Create response
-            response = FlightSearchResponse(
-                flights=filtered_flights[:50],  # Limit to top 50 results
-                search_id=search_id,
-                total_results=len(filtered_flights),
-                search_params=search_request,
-                providers=providers_used,
-                cache_hit=False,
-                search_time_ms=int((time.time() - start_time) * 1000),
+            fetched = await asyncio.gather(
+                *(fetch(indexes) for indexes in windows), return_exceptions=True
+            )
+            for indexes, window in zip(windows, fetched):
+                if isinstance(window, Exception):
+                    logger.error(f"Kiwi date range search failed: {window}")
+                    continue
+                for i, columns in zip(indexes, window):
+                    if columns is not None:
+                        results[i] = (columns, ["Kiwi"])
+
+        missing = [i for i in range(len(day_requests)) if i not in results]
+        if missing:
+            fetched = await self._fetch_flight_supersets(
+                [day_requests[i] for i in missing]
+            )
+            results.update(zip(missing, fetched))
+        return [results[i] for i in range(len(day_requests))]
+
+    async def _fetch_date_window_kiwi(
+        self, day_requests: List[FlightSearchRequest]
+    ) -> List[Optional[FlightColumns]]:
+        """
+        Serve a one-way date window of one airport pair with one Kiwi range query.
+
+        Returns columns per date, or None for dates Kiwi has no flights for.
+        Routes the negative route index knows to be empty are not queried.
+        """
+        if await self.negative_routes.should_skip(day_requests[0]):
+            return [None] * len(day_requests)
+
+        dates = [r.departure_date for r in day_requests]
+        flights = await self.kiwi_api.search_flights(
+            day_requests[0].model_copy(update={"departure_date": min(dates)}),
+            date_to=max(dates),
+        )
+        # Kiwi returns nothing on errors too, so only a hit says anything
+        if flights:
+            await self.negative_routes.record(day_requests[0], len(flights))
+
+        by_date: Dict[date, List[Flight]] = {}
+        for flight in flights:
+            by_date.setdefault(flight.segments[0].departure_time.date(), []).append(
+                flight
             )
 
-            # Cache results for 5 minutes (search results change frequently)
-            await self.cache_service.cache_flight_results(
-                search_request, response, ttl=300
+        results = []
+        for day_request in day_requests:
+            day_flights = by_date.get(day_request.departure_date)
+            if not day_flights:
+                results.append(None)
+                continue
+            columns = self._deduplicate_flights(day_flights)
+            cached = columns.to_cache()
+            await self.cache_service.cache_flight_superset(
+                day_request,
+                {**cached, "providers": ["Kiwi"]},
+                ttl=300,
+                prefix=KIWI_WINDOW_PREFIX,
             )
+            await self.search_session_service.store_flights(cached["flights"])
+            results.append(columns)
+        return results
 
-            # Log search to database
-            await self._log_search(search_request, response, False)
+    async def _get_flight_superset(
+        self,
+        search_request: FlightSearchRequest,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Tuple[FlightColumns, List[str], bool]:
+        """
+        Return the deduplicated provider result set for a search, as columns.
+
+        Results are cached by the provider-relevant request fields only, so
+        requests that differ in filters or sort order share one cache entry.
+        Cache hits are loaded straight into columns; no Flight models are
+        built until a page is materialized. Provider calls are made under
+        ``semaphore`` when given.
+        Returns (columns, providers, cache_hit).
+        """
+        if reference.is_metro(search_request.origin) or reference.is_metro(
+            search_request.destination
+        ):
+            (superset,) = await self._get_flight_supersets(
+                [search_request], semaphore=semaphore
+            )
+            return superset
+
+        cached = await self.cache_service.get_flight_superset(search_request)
+        if cached:
+            try:
+                columns = FlightColumns.from_cache(cached)
+                logger.info(
+                    f"Flight search cache hit for {search_request.origin}-{search_request.destination}"
+                )
+                return columns, cached["providers"], True
+            except Exception as e:
+                logger.error(f"Failed to deserialize cached flight superset: {e}")
+
+        if semaphore is None:
+            columns, providers_used = await self._fetch_flight_superset(search_request)
+        else:
+            async with semaphore:
+                columns, providers_used = await self._fetch_flight_superset(
+                    search_request
+                )
+        return columns, providers_used, False
 
+    async def _get_flight_supersets(
+        self,
+        search_requests: List[FlightSearchRequest],
+        fetch: Optional[
+            Callable[
+                [List[FlightSearchRequest]],
+                Awaitable[List[Tuple[FlightColumns, List[str]]]],
+            ]
+        ] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        return_exceptions: bool = False,
+    ) -> List[Tuple[FlightColumns, List[str], bool]]:
+        """
+        Result sets for several searches, built from their airport pairs.
+
+        Metro codes fan out (NYC-LON to JFK/EWR/LGA x LHR/LGW/...), other
+        searches are a single pair. Each pair is cached as its own result set,
+        so a later JFK-LHR search reuses it, and pairs shared between the
+        searches are looked up and fetched once. Cached pairs come back in
+        one round trip, the rest are fetched concurrently (by ``fetch`` if
+        given), and searches with several pairs get the merged set after the
+        usual dedup.
+        Returns (columns, providers, cache_hit) per search, in order;
+        cache_hit means every pair was cached. With ``return_exceptions``, a
+        search with a pair that failed to fetch gets the exception instead.
+        """
+        pair_keys: List[List[str]] = []
+        pair_requests: Dict[str, FlightSearchRequest] = {}
+        for search_request in search_requests:
+            route_pairs = [
+                (origin, destination)
+                for origin in reference.expand(search_request.origin)
+                for destination in reference.expand(search_request.destination)
+                if origin != destination
+            ] or [(search_request.origin, search_request.destination)]
+            keys = []
+            for origin, destination in route_pairs:
+                pair_request = search_request.model_copy(
+                    update={"origin": origin, "destination": destination}
+                )
+                key = self.cache_service.flight_superset_key(pair_request)
+                pair_requests.setdefault(key, pair_request)
+                keys.append(key)
+            pair_keys.append(keys)
+
+        unique_keys = list(pair_requests)
+        cached = await self.cache_service.get_flight_supersets(
+            [pair_requests[key] for key in unique_keys]
+        )
+
+        pairs: Dict[str, Tuple[FlightColumns, List[str], bool]] = {}
+        missing: List[str] = []
+        for key, superset in zip(unique_keys, cached):
+            if superset:
+                try:
+                    pairs[key] = (
+                        FlightColumns.from_cache(superset),
+                        superset["providers"],
+                        True,
+                    )
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to deserialize cached flight superset: {e}")
+            missing.append(key)
+
+        if missing:
+            missing_requests = [pair_requests[key] for key in missing]
+            if fetch:
+                fetched = await fetch(missing_requests)
+            else:
+                fetched = await self._fetch_flight_supersets(
+                    missing_requests, semaphore, return_exceptions
+                )
+            for key, result in zip(missing, fetched):
+                pairs[key] = (
+                    result if isinstance(result, Exception) else (*result, False)
+                )
+
+        logger.info(
+            f"Flight supersets for {len(search_requests)} searches: "
+            f"{len(unique_keys)} airport pairs, {len(unique_keys) - len(missing)} from cache"
+        )
+
+        results = []
+        for keys in pair_keys:
+            parts = [pairs[key] for key in keys]
+            failed = next((p for p in parts if isinstance(p, Exception)), None)
+            if failed is not None:
+                results.append(failed)
+                continue
+            if len(parts) == 1:
+                results.append(parts[0])
+                continue
+            merged = FlightColumns.concat([columns for columns, _, _ in parts])
+            merged = merged.take(merged.deduplicate(merged.all()))
+            providers_used = {p for _, providers, _ in parts for p in providers}
+            cache_hit = all(hit for _, _, hit in parts)
+            results.append((merged, sorted(providers_used), cache_hit))
+        return results
+
+    async def _fetch_flight_supersets(
+        self,
+        search_requests: List[FlightSearchRequest],
+        semaphore: Optional[asyncio.Semaphore] = None,
+        return_exceptions: bool = False,
+    ) -> List[Tuple[FlightColumns, List[str]]]:
+        """Fetch several searches concurrently, capped by ``settings.provider_concurrency``"""
+        semaphore = semaphore or asyncio.Semaphore(settings.provider_concurrency)
+
+        async def fetch(search_request: FlightSearchRequest):
+            async with semaphore:
+                return await self._fetch_flight_superset(search_request)
+
+        return await asyncio.gather(
+            *(fetch(r) for r in search_requests), return_exceptions=return_exceptions
+        )
+
+    async def _fetch_flight_superset(
+        self, search_request: FlightSearchRequest
+    ) -> Tuple[FlightColumns, List[str]]:
+        """
+        Fetch a search from the providers, deduplicate it and cache it.
+
+        Routes the negative route index knows to be empty are answered with
+        no flights and no provider call.
+        """
+        if await self.negative_routes.should_skip(search_request):
             logger.info(
-                f"Flight search completed: {len(filtered_flights)} results in {response.search_time_ms}ms"
+                f"Skipping providers for {search_request.origin}-"
+                f"{search_request.destination}: route keeps returning no flights"
             )
-            return response
+            return FlightColumns.from_flights([]), []
+
+        all_flights, providers_used, complete = await self._fetch_from_providers(
+            search_request
+        )
+        if complete:
+            await self.negative_routes.record(search_request, len(all_flights))
+        columns = await self._store_flight_superset(
+            search_request, all_flights, providers_used, complete
+        )
+        return columns, providers_used
+
+    @staticmethod
+    def _deduplicate_flights(flights: List[Flight]) -> FlightColumns:
+        # Content-addressed IDs stay the same across searches and cache refreshes
+        for flight in flights:
+            flight.id = flight.content_id()
 
-        except Exception as e:
-            logger.error(f"Flight search error: {e}")
-            # Return empty response on error
-            return FlightSearchResponse(
-                flights=[],
-                search_id=search_id,
-                total_results=0,
-                search_params=search_request,
-                providers=providers_used,
-                cache_hit=False,
-                search_time_ms=int((time.time() - start_time) * 1000),
+        # Drop duplicates and flights with invalid prices once, before caching
+        columns = FlightColumns.from_flights(flights)
+        return columns.take(columns.deduplicate(columns.valid(columns.all())))
+
+    async def _store_flight_superset(
+        self,
+        search_request: FlightSearchRequest,
+        flights: List[Flight],
+        providers_used: List[str],
+        complete: bool = True,
+    ) -> FlightColumns:
+        """Deduplicate provider flights and cache them as the search's result set"""
+        columns = self._deduplicate_flights(flights)
+
+        # Only cache complete provider answers - timeouts and failures are retried
+        if complete:
+            # Cache results for 5 minutes (search results change frequently)
+            cached = columns.to_cache()
+            await self.cache_service.cache_flight_superset(
+                search_request, {**cached, "providers": providers_used}, ttl=300
+            )
+            # Flights stay resolvable by ID for the lifetime of a search session
+            await self.search_session_service.store_flights(cached["flights"])
+
+            # Keep the route's price calendar and the origin's explore index
+            # current with live one-way fares; both hold cheapest economy
+            # fares for one adult
+            if (
+                not search_request.return_date
+                and len(columns)
+                and search_request.is_reference_fare_search()
+            ):
+                cheapest = float(columns.price_usd.min())
+                await self.price_calendar_service.record_search(
+                    search_request.origin,
+                    search_request.destination,
+                    search_request.departure_date,
+                    cheapest,
+                )
+                await self.explore_service.record(
+                    search_request.origin,
+                    search_request.destination,
+                    search_request.departure_date,
+                    cheapest,
+                )
+            # Keep the observed fares for price trends once the cache expires
+            self.price_history_service.record(search_request, columns)
+            # Sketches are kept per cabin for one-adult fares with connections
+            if search_request.is_reference_fare_search(any_cabin=True):
+                price_sketches.observe(search_request, columns.price_usd)
+
+        return columns
+
+    async def _fetch_from_providers(
+        self, search_request: FlightSearchRequest
+    ) -> Tuple[List[Flight], List[str], bool]:
+        """
+        Query the configured providers for a search.
+
+        Returns (flights, providers, complete); ``complete`` is False when the
+        provider call timed out or failed and the result must not be cached.
+        """
+        # Only use SerpAPI for clean, real flight data
+        if not settings.serpapi_key:
+            logger.warning("SerpAPI key not configured, no flight results available")
+            return [], ["No API configured"], False
+
+        tasks = [self._search_serpapi(search_request)]
+        providers_used = ["Google Flights"]
+
+        # Execute SerpAPI search with timeout
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*tasks, return_exceptions=True),
+                timeout=15.0,  # 15 second timeout for SerpAPI
             )
+        except asyncio.TimeoutError:
+            logger.warning("SerpAPI search timed out after 15s")
+            return [], ["Search timeout"], False
+
+        # Collect results from SerpAPI
+        all_flights = []
+        for result in results:
+            if isinstance(result, list):
+                all_flights.extend(result)
+                logger.info(f"SerpAPI returned {len(result)} flights")
+            else:
+                logger.error(f"SerpAPI search failed: {result}")
+                return [], ["Search failed"], False
+
+        return all_flights, providers_used, True
 
     async def _search_kiwi(self, search_request: FlightSearchRequest) -> List[Flight]:
         """Search flights using Kiwi API"""
@@ -200,12 +891,17 @@ class FlightService:
     async def _search_serpapi(
         self, search_request: FlightSearchRequest
     ) -> List[Flight]:
-        """Search flights using SerpAPI Google Flights"""
+        """
+        Search flights using SerpAPI Google Flights.
+
+        Failures raise, so ``_fetch_from_providers`` can tell them from a
+        search that genuinely found nothing.
+        """
         try:
             return await self.serpapi_flights.search_flights(search_request)
         except Exception as e:
             logger.error(f"SerpAPI Google Flights search failed: {e}")
-            return []
+            raise
 
     async def _search_travelpayouts(
         self, search_request: FlightSearchRequest
@@ -225,54 +921,6 @@ class FlightService:
             logger.error(f"Mock API search failed: {e}")
             return []
 
-    def _deduplicate_flights(self, flights: List[Flight]) -> List[Flight]:
-        """Remove duplicate flights based on route and time"""
-        seen_flights = set()
-        unique_flights = []
-
-        for flight in flights:
-            # Create a signature for deduplication
-            signature = self._create_flight_signature(flight)
-
-            if signature not in seen_flights:
-                seen_flights.add(signature)
-                unique_flights.append(flight)
-
-        return unique_flights
-
-    def _create_flight_signature(self, flight: Flight) -> str:
-        """Create a unique signature for flight deduplication"""
-        # Use first and last segment details + departure time
-        first_segment = flight.segments[0]
-        last_segment = flight.segments[-1]
-
-        return f"{first_segment.origin.code}_{last_segment.destination.code}_{first_segment.departure_time.isoformat()}_{flight.price}"
-
-    def _apply_filters(
-        self, flights: List[Flight], search_request: FlightSearchRequest
-    ) -> List[Flight]:
-        """Apply search filters to flights"""
-        filtered_flights = flights
-
-        # Filter out flights with invalid prices (0 or negative)
-        filtered_flights = [
-            f
-            for f in filtered_flights
-            if f.price > 0 and f.currency and f.currency.strip() != ""
-        ]
-
-        # Price filter
-        if search_request.max_price:
-            filtered_flights = [
-                f for f in filtered_flights if f.price <= search_request.max_price
-            ]
-
-        # Direct flights only filter
-        if search_request.direct_flights_only:
-            filtered_flights = [f for f in filtered_flights if f.is_direct]
-
-        return filtered_flights
-
     async def _log_search(
         self,
         search_request: FlightSearchRequest,
@@ -287,22 +935,22 @@ class FlightService:
                 "origin": search_request.origin,
                 "destination": search_request.destination,
                 "departure_date": search_request.departure_date.isoformat(),
-                "return_date": search_request.return_date.isoformat()
-                if search_request.return_date
-                else None,
+                "return_date": (
+                    search_request.return_date.isoformat()
+                    if search_request.return_date
+                    else None
+                ),
                 "adults": search_request.adults,
                 "children": search_request.children,
                 "results_count": response.total_results,
                 "cache_hit": cache_hit,
                 "search_time_ms": response.search_time_ms,
                 "providers": response.providers,
-                "created_at": "now()",
+                "created_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            if supabase:
-                await supabase.table("search_logs").insert(search_log).execute()
-            else:
-                logger.info("Database not configured - search logging disabled")
+            # Queued for a background batch insert, off the request path
+            search_log_writer.write(search_log)
 
         except Exception as e:
             logger.error(f"Failed to log search: {e}")
@@ -1,14 +1,16 @@
-import asyncio
 import time
 import uuid
+from datetime import datetime, timezone
 from typing import List
+import numpy as np
+from app.fx import fx
 from app.models.hotels import HotelSearchRequest, HotelSearchResponse, Hotel
 from app.integrations.serpapi_hotels import (
-    search_hotels_serpapi,
+    serpapi_hotels_client,
     HotelSearchParams as SerpHotelSearchParams,
 )
 from app.services.cache_service import CacheService
-from app.database import supabase
+from app.batch_writer import search_log_writer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,9 +47,10 @@ class HotelService:
             serpapi_hotels = await self._search_serpapi(search_request)
             all_hotels.extend(serpapi_hotels)
 
-            # Apply filters and sort
+            # Normalize prices to USD, then filter and sort on them
+            self._normalize_prices(all_hotels)
             filtered_hotels = self._apply_filters(all_hotels, search_request)
-            sorted_hotels = sorted(filtered_hotels, key=lambda x: x.price_per_night)
+            sorted_hotels = sorted(filtered_hotels, key=lambda x: x.price_per_night_usd)
 
             # Create response
             response = HotelSearchResponse(
@@ -101,11 +104,7 @@ class HotelService:
                 rooms=search_request.rooms,
             )
 
-            # Search using SerpAPI (run in thread pool since it's synchronous)
-            loop = asyncio.get_event_loop()
-            serpapi_response = await loop.run_in_executor(
-                None, search_hotels_serpapi, serpapi_params
-            )
+            serpapi_response = await serpapi_hotels_client.search_hotels(serpapi_params)
 
             # Convert SerpAPI hotels to our Hotel model
             hotels = []
@@ -137,17 +136,34 @@ class HotelService:
             logger.error(f"SerpAPI search failed: {e}")
             return []
 
+    @staticmethod
+    def _normalize_prices(hotels: List[Hotel]):
+        """Attach USD prices to every hotel, converting the whole list at once"""
+        if not hotels:
+            return
+        currencies = np.array([(h.currency or "").strip() for h in hotels])
+        per_night = fx.to_usd_array(
+            np.array([h.price_per_night for h in hotels]), currencies
+        )
+        totals = fx.to_usd_array(np.array([h.total_price for h in hotels]), currencies)
+        for hotel, night_usd, total_usd in zip(
+            hotels, per_night.tolist(), totals.tolist()
+        ):
+            if not np.isnan(night_usd):
+                hotel.price_per_night_usd = night_usd
+                hotel.total_price_usd = total_usd
+
     def _apply_filters(
         self, hotels: List[Hotel], search_request: HotelSearchRequest
     ) -> List[Hotel]:
         """Apply search filters to hotels"""
         filtered_hotels = hotels
 
-        # Filter out hotels with invalid prices (0 or negative)
+        # Filter out hotels with invalid prices (0 or negative) or unknown currencies
         filtered_hotels = [
             h
             for h in filtered_hotels
-            if h.price_per_night > 0 and h.currency and h.currency.strip() != ""
+            if h.price_per_night > 0 and h.price_per_night_usd is not None
         ]
 
         return filtered_hotels
@@ -163,7 +179,7 @@ class HotelService:
             search_log = {
                 "search_id": response.search_id,
                 "search_type": "hotels",
-                "destination": search_request.destination,
+                "destination_city": search_request.destination,
                 "check_in": search_request.check_in.isoformat(),
                 "check_out": search_request.check_out.isoformat(),
                 "adults": search_request.adults,
@@ -173,10 +189,11 @@ class HotelService:
                 "cache_hit": cache_hit,
                 "search_time_ms": response.search_time_ms,
                 "providers": response.providers,
-                "created_at": "now()",
+                "created_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            await supabase.table("search_logs").insert(search_log).execute()
+            # Queued for a background batch insert, off the request path
+            search_log_writer.write(search_log)
 
         except Exception as e:
             logger.error(f"Failed to log search: {e}")
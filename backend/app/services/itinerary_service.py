@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import heapq
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from app.config import settings
+from app.models.flights import (
+    Flight,
+    FlightSearchRequest,
+    FlightSortOption,
+    Itinerary,
+    MultiCitySearchRequest,
+    MultiCitySearchResponse,
+    RoundTripSearchRequest,
+    RoundTripSearchResponse,
+)
+from app.reference import reference
+from app.services.flight_service import FlightService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cheapest flights kept per leg before combining; the merge never looks deeper
+MAX_FLIGHTS_PER_LEG = 50
+
+# Upper bound on heap pops per merge, so legs that rarely connect cannot
+# turn the top-k search back into a full cross product
+MAX_EXPANSIONS_PER_RESULT = 50
+
+
+def k_cheapest_combinations(
+    legs: Sequence[Sequence[Flight]],
+    k: int,
+    is_valid: Callable[[Tuple[Flight, ...]], bool],
+    price: Callable[[Flight], float] = lambda f: f.price_usd,
+    max_total: Optional[float] = None,
+) -> Tuple[List[Tuple[Flight, ...]], bool]:
+    """
+    Return up to ``k`` valid combinations (one flight per leg) by total price.
+
+    Each leg must already be sorted by ``price``. Combinations are expanded
+    from a heap in order of total price; a combination is pushed only from
+    the positions at or after the one its parent advanced, so each index
+    tuple is generated exactly once without a visited set. Runs in
+    O(k * m log(k * m)) for m legs when most combinations are valid, and
+    stops as soon as the cheapest remaining total exceeds ``max_total``.
+
+    The second value is True when the search hit its expansion cap with
+    fewer than ``k`` results and candidates left, i.e. valid combinations
+    may have been missed.
+    """
+    if k <= 0 or not legs or any(not leg for leg in legs):
+        return [], False
+
+    start = tuple(0 for _ in legs)
+    heap = [(sum(price(leg[0]) for leg in legs), start, 0)]
+    results: List[Tuple[Flight, ...]] = []
+    max_expansions = k * MAX_EXPANSIONS_PER_RESULT
+    expansions = 0
+
+    while heap and len(results) < k and expansions < max_expansions:
+        total, indices, first_free = heapq.heappop(heap)
+        if max_total is not None and total > max_total:
+            break
+        expansions += 1
+
+        combination = tuple(leg[i] for leg, i in zip(legs, indices))
+        if is_valid(combination):
+            results.append(combination)
+
+        for position in range(first_free, len(legs)):
+            next_index = indices[position] + 1
+            if next_index >= len(legs[position]):
+                continue
+            leg = legs[position]
+            successor = indices[:position] + (next_index,) + indices[position + 1 :]
+            successor_total = (
+                total - price(leg[indices[position]]) + price(leg[next_index])
+            )
+            heapq.heappush(heap, (successor_total, successor, position))
+
+    truncated = bool(heap) and len(results) < k and expansions >= max_expansions
+    if truncated and max_total is not None and heap[0][0] > max_total:
+        truncated = False  # Everything left is over budget anyway
+    return results, truncated
+
+
+def _to_utc(moment: datetime, airport: str) -> Optional[datetime]:
+    """Naive UTC time of a local time at ``airport``, or None if unknown"""
+    if moment.tzinfo is None:
+        tz = reference.timezone(airport)
+        if not tz:
+            return None
+        try:
+            moment = moment.replace(tzinfo=ZoneInfo(tz))
+        except ZoneInfoNotFoundError:
+            return None
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ItineraryService:
+    """Builds multi-leg itineraries from cached one-way flight searches"""
+
+    def __init__(self, flight_service: Optional[FlightService] = None):
+        self.flight_service = flight_service or FlightService()
+
+    async def search_multi_city(
+        self, search_request: MultiCitySearchRequest
+    ) -> MultiCitySearchResponse:
+        """
+        Search every leg concurrently and merge them into the cheapest itineraries.
+
+        Legs go through the normal cached flight search, so latency is about
+        that of the slowest leg and repeated legs are served from cache.
+        """
+        start_time = time.time()
+        search_id = str(uuid.uuid4())
+
+        leg_requests = [
+            FlightSearchRequest(
+                origin=leg.origin.upper(),
+                destination=leg.destination.upper(),
+                departure_date=leg.departure_date,
+                adults=search_request.adults,
+                children=search_request.children,
+                infants=search_request.infants,
+                cabin_class=search_request.cabin_class,
+                direct_flights_only=search_request.direct_flights_only,
+                sort_by=FlightSortOption.PRICE,
+            )
+            for leg in search_request.legs
+        ]
+
+        leg_flights, providers, cache_hits = await self._search_legs(leg_requests)
+
+        min_connection = timedelta(minutes=search_request.min_connection_minutes)
+        combinations, truncated = k_cheapest_combinations(
+            leg_flights,
+            search_request.max_results,
+            lambda flights: self._connects(flights, min_connection),
+        )
+
+        logger.info(
+            f"Multi-city search: {len(leg_requests)} legs, "
+            f"{len(combinations)} itineraries in {int((time.time() - start_time) * 1000)}ms"
+        )
+        if truncated:
+            logger.warning(
+                f"Multi-city search {search_id} stopped at the expansion cap "
+                f"with {len(combinations)} of {search_request.max_results} itineraries"
+            )
+
+        return MultiCitySearchResponse(
+            itineraries=[self._build_itinerary(c) for c in combinations],
+            search_id=search_id,
+            search_params=search_request,
+            providers=providers,
+            cache_hits=cache_hits,
+            truncated=truncated,
+            search_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    async def compose_round_trip(
+        self, search_request: RoundTripSearchRequest
+    ) -> RoundTripSearchResponse:
+        """
+        Build round trips from two one-way searches.
+
+        Outbound and return legs are fetched concurrently as one-way searches,
+        so they share cache entries with ordinary one-way queries, and paired
+        with the k-cheapest merge subject to the minimum stay. ``max_price``
+        applies to the pair total; other filters apply to each leg, with time
+        windows applied to the outbound leg only.
+        """
+        start_time = time.time()
+        search_id = str(uuid.uuid4())
+
+        outbound_request = FlightSearchRequest(
+            **search_request.model_dump(
+                exclude={"min_stay_hours", "max_results", "max_price"}
+            )
+        ).model_copy(
+            update={
+                "origin": search_request.origin.upper(),
+                "destination": search_request.destination.upper(),
+                "return_date": None,
+                "sort_by": FlightSortOption.PRICE,
+            }
+        )
+        inbound_request = outbound_request.model_copy(
+            update={
+                "origin": outbound_request.destination,
+                "destination": outbound_request.origin,
+                "departure_date": search_request.return_date,
+                "departure_time_from": None,
+                "departure_time_to": None,
+                "arrival_time_from": None,
+                "arrival_time_to": None,
+            }
+        )
+
+        leg_flights, providers, cache_hits = await self._search_legs(
+            [outbound_request, inbound_request]
+        )
+
+        min_stay = timedelta(hours=search_request.min_stay_hours)
+        pairs, truncated = k_cheapest_combinations(
+            leg_flights,
+            search_request.max_results,
+            lambda flights: self._connects(flights, min_stay),
+            max_total=search_request.max_price,
+        )
+
+        logger.info(
+            f"Round trip {search_request.origin}<->{search_request.destination}: "
+            f"{len(pairs)} pairs from {len(leg_flights[0])}x{len(leg_flights[1])} legs"
+        )
+        if truncated:
+            logger.warning(
+                f"Round trip search {search_id} stopped at the expansion cap "
+                f"with {len(pairs)} of {search_request.max_results} pairs"
+            )
+
+        return RoundTripSearchResponse(
+            itineraries=[self._build_itinerary(p) for p in pairs],
+            search_id=search_id,
+            search_params=search_request,
+            providers=providers,
+            cache_hits=cache_hits,
+            truncated=truncated,
+            search_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    async def _search_legs(
+        self, leg_requests: List[FlightSearchRequest]
+    ) -> Tuple[List[List[Flight]], List[str], int]:
+        """Resolve legs concurrently; returns price-sorted flights per leg"""
+        semaphore = asyncio.Semaphore(settings.provider_concurrency)
+
+        async def search_leg(leg_request: FlightSearchRequest):
+            async with semaphore:
+                return await self.flight_service.get_flight_results(
+                    leg_request, limit=MAX_FLIGHTS_PER_LEG
+                )
+
+        results = await asyncio.gather(*(search_leg(r) for r in leg_requests))
+
+        leg_flights = []
+        providers = set()
+        cache_hits = 0
+        for flights, leg_providers, cache_hit in results:
+            leg_flights.append(flights)
+            providers.update(leg_providers)
+            cache_hits += int(cache_hit)
+
+        return leg_flights, sorted(providers), cache_hits
+
+    @staticmethod
+    def _connects(flights: Tuple[Flight, ...], min_gap: timedelta) -> bool:
+        """Each leg must depart at least ``min_gap`` after the previous one lands"""
+        for previous, flight in zip(flights, flights[1:]):
+            arrival = previous.segments[-1]
+            departure = flight.segments[0]
+            landed = _to_utc(arrival.arrival_time, arrival.destination.code)
+            departs = _to_utc(departure.departure_time, departure.origin.code)
+            if landed is None or departs is None:
+                # Unknown time zone: compare local times as a best effort
+                landed = arrival.arrival_time.replace(tzinfo=None)
+                departs = departure.departure_time.replace(tzinfo=None)
+            if departs - landed < min_gap:
+                return False
+        return True
+
+    @staticmethod
+    def _build_itinerary(flights: Tuple[Flight, ...]) -> Itinerary:
+        itinerary_hash = hashlib.sha1("|".join(f.id for f in flights).encode())
+        return Itinerary(
+            id=f"itin_{itinerary_hash.hexdigest()[:16]}",
+            legs=list(flights),
+            total_price=round(sum(f.price_usd for f in flights), 2),
+            currency="USD",
+            total_duration_minutes=sum(f.total_duration_minutes for f in flights),
+            total_stops=sum(f.stops for f in flights),
+        )
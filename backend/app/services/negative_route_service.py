@@ -0,0 +1,69 @@
+import time
+from app.cache import cache
+from app.config import settings
+from app.models.flights import FlightSearchRequest
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NegativeRouteIndex:
+    """
+    Routes whose provider searches keep coming back empty.
+
+    Each (origin, destination, direct-only) combination that returned no
+    flights gets a small Redis hash: the number of empty answers in a row
+    and when to probe the route again. After
+    ``settings.negative_route_threshold`` empty answers, searches skip the
+    providers until the probe time; every further empty probe doubles the
+    wait, up to ``settings.negative_route_max_backoff``. Once the probe time
+    passes, the first search to claim it goes to the providers while the
+    rest keep skipping. Any search that finds flights clears the entry.
+    Only complete provider answers count, never timeouts or failures.
+    """
+
+    @staticmethod
+    def _key(search_request: FlightSearchRequest) -> str:
+        direct = "direct" if search_request.direct_flights_only else "any"
+        return (
+            f"no_results:{search_request.origin}:{search_request.destination}:{direct}"
+        )
+
+    async def should_skip(self, search_request: FlightSearchRequest) -> bool:
+        """True if the route is known to be empty and isn't due for a re-probe"""
+        key = self._key(search_request)
+        entry = await cache.hgetall(key)
+        if int(entry.get("misses", 0)) < settings.negative_route_threshold:
+            return False
+        if time.time() < float(entry.get("probe_at", 0)):
+            return True
+        # Due for a re-probe: let one search through, skip the others meanwhile
+        return not await cache.claim(f"{key}:probe", settings.negative_route_probe_lock)
+
+    async def record(self, search_request: FlightSearchRequest, found: int):
+        """Update the route after a complete provider answer with ``found`` flights"""
+        key = self._key(search_request)
+        if found:
+            await cache.delete(key)
+            return
+
+        misses = await cache.hincrby(key, "misses")
+        if misses is None:
+            return
+
+        backoff = 0
+        if misses >= settings.negative_route_threshold:
+            backoff = min(
+                settings.negative_route_backoff
+                * 2 ** (misses - settings.negative_route_threshold),
+                settings.negative_route_max_backoff,
+            )
+            logger.info(
+                f"No flights {search_request.origin}-{search_request.destination} "
+                f"{misses} times in a row; skipping providers for {backoff}s"
+            )
+        await cache.hset(
+            key,
+            {"probe_at": f"{time.time() + backoff:.0f}"},
+            ttl=settings.negative_route_max_backoff * 2,
+        )
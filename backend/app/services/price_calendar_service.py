@@ -0,0 +1,134 @@
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from app.cache import cache
+from app.config import settings
+from app.integrations.travelpayouts_api import TravelpayoutsAPI
+from app.models.flights import PriceCalendarDay, PriceCalendarResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hash field holding the unix time of the last provider refresh. Day fields
+# are two-digit day-of-month strings ("01".."31") mapping to a USD price.
+UPDATED_FIELD = "_updated"
+
+
+class PriceCalendarService:
+    """
+    Month-view lowest fares per route.
+
+    Each route-month is one small Redis hash, filled by a single bulk
+    Travelpayouts call. A provider refresh replaces the whole month, so days
+    the provider no longer prices drop out and stale lows age out. Between
+    refreshes, live economy searches for one adult lower the day they
+    searched to their cheapest USD fare, so every cell stays comparable
+    with the provider's lowest fares.
+    """
+
+    def __init__(self):
+        self.travelpayouts_api = TravelpayoutsAPI()
+
+    @staticmethod
+    def _calendar_key(origin: str, destination: str, month: date) -> str:
+        return f"price_calendar:{origin}:{destination}:{month.strftime('%Y-%m')}"
+
+    async def get_calendar(
+        self, origin: str, destination: str, month: date
+    ) -> PriceCalendarResponse:
+        """Get the lowest fare per day for a route and month"""
+        origin = origin.upper()
+        destination = destination.upper()
+        month = month.replace(day=1)
+        cache_key = self._calendar_key(origin, destination, month)
+
+        stored = await cache.hgetall(cache_key)
+        updated = float(stored.get(UPDATED_FIELD, 0))
+        cache_hit = bool(stored) and (
+            time.time() - updated < settings.price_calendar_refresh
+        )
+
+        if not cache_hit:
+            stored = await self._refresh(cache_key, origin, destination, month, stored)
+            updated = float(stored.get(UPDATED_FIELD, 0))
+
+        days = self._decode_days(stored, month)
+        return PriceCalendarResponse(
+            origin=origin,
+            destination=destination,
+            month=month.strftime("%Y-%m"),
+            days=days,
+            cheapest_day=min(days, key=lambda d: d.price) if days else None,
+            updated_at=datetime.utcfromtimestamp(updated) if updated else None,
+            cache_hit=cache_hit,
+        )
+
+    async def record_search(
+        self, origin: str, destination: str, departure_date: date, price: float
+    ) -> None:
+        """Lower a day to a live one-way reference search's cheapest USD fare"""
+        if price <= 0:
+            return
+
+        def keep_lowest(stored: Optional[str]) -> str:
+            try:
+                if stored is not None and float(stored) <= price:
+                    return stored
+            except ValueError:
+                pass  # An unreadable cell is overwritten
+            return f"{price:.2f}"
+
+        cache_key = self._calendar_key(
+            origin.upper(), destination.upper(), departure_date
+        )
+        await cache.update_field(
+            cache_key,
+            departure_date.strftime("%d"),
+            keep_lowest,
+            ttl=settings.price_calendar_ttl,
+        )
+
+    async def _refresh(
+        self,
+        cache_key: str,
+        origin: str,
+        destination: str,
+        month: date,
+        stored: Dict[str, str],
+    ) -> Dict[str, str]:
+        """Pull the month from Travelpayouts and replace the stored month"""
+        try:
+            prices = await self.travelpayouts_api.get_month_prices(
+                origin, destination, month
+            )
+        except Exception as e:
+            logger.error(f"Price calendar refresh failed for {cache_key}: {e}")
+            return stored
+
+        fresh = {
+            day.strftime("%d"): f"{price:.2f}"
+            for day, price in prices.items()
+            if day.year == month.year and day.month == month.month
+        }
+        fresh[UPDATED_FIELD] = str(int(time.time()))
+
+        await cache.replace_hash(cache_key, fresh, ttl=settings.price_calendar_ttl)
+        logger.info(f"Price calendar {cache_key} refreshed: {len(fresh) - 1} days")
+        return fresh
+
+    @staticmethod
+    def _decode_days(stored: Dict[str, str], month: date) -> List[PriceCalendarDay]:
+        """Turn stored day fields into calendar days, skipping past dates"""
+        today = date.today()
+        days = []
+        for field, value in stored.items():
+            if field == UPDATED_FIELD:
+                continue
+            try:
+                day = month.replace(day=int(field))
+                price = float(value)
+            except ValueError:
+                continue
+            if day >= today:
+                days.append(PriceCalendarDay(date=day, price=price))
+        return sorted(days, key=lambda d: d.date)
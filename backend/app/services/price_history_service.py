@@ -0,0 +1,193 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.batch_writer import price_history_writer
+from app.cache import cache
+from app.config import settings
+from app.database import supabase
+from app.models.flights import (
+    CabinClass,
+    FlightSearchRequest,
+    PriceTrendPoint,
+    PriceTrendResponse,
+)
+from app.services.flight_columns import FlightColumns
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rollup table and bucket column per trend resolution (see database/schema.sql)
+RESOLUTIONS = {
+    "hourly": ("route_price_hourly", "bucket_start"),
+    "daily": ("route_price_daily", "day"),
+}
+# Points needed before a price is labelled low/typical/high
+MIN_POINTS_FOR_LEVEL = 3
+
+
+class PriceHistoryService:
+    """
+    Route price history from live searches.
+
+    Each one-way, one-adult result set fetched from the providers with
+    connections allowed becomes a handful of observations (overall and
+    per-airline min/median USD fare), queued on the background batch
+    writer. The database downsamples them into hourly and daily buckets;
+    trends are read from those buckets and cached briefly, so charts and
+    price hints never call a provider.
+    """
+
+    def record(self, search_request: FlightSearchRequest, columns: FlightColumns):
+        """Queue price observations for a freshly fetched one-way result set"""
+        if search_request.return_date or not len(columns):
+            return
+        # History is kept per cabin; other search shapes would mix in fares
+        # for several passengers or direct flights only
+        if not search_request.is_reference_fare_search(any_cabin=True):
+            return
+
+        observed_at = datetime.now(timezone.utc).isoformat()
+        for summary in columns.price_summary():
+            price_history_writer.write(
+                {
+                    "observed_at": observed_at,
+                    "origin": search_request.origin,
+                    "destination": search_request.destination,
+                    "departure_date": search_request.departure_date.isoformat(),
+                    "cabin_class": search_request.cabin_class.value,
+                    **summary,
+                }
+            )
+
+    async def get_trend(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        cabin_class: CabinClass = CabinClass.ECONOMY,
+        airline: Optional[str] = None,
+        resolution: str = "daily",
+        days: int = 30,
+    ) -> PriceTrendResponse:
+        """Observed fares for one departure date over the last ``days`` days"""
+        origin = origin.upper()
+        destination = destination.upper()
+        airline = airline.upper() if airline else None
+        cache_key = (
+            f"price_trend:{origin}:{destination}:{departure_date.isoformat()}:"
+            f"{cabin_class.value}:{airline or ''}:{resolution}:{days}"
+        )
+
+        cached = await cache.get(cache_key)
+        if cached:
+            return PriceTrendResponse(**{**cached, "cache_hit": True})
+
+        rows = await self._load_buckets(
+            origin, destination, departure_date, cabin_class, airline, resolution, days
+        )
+        response = self._build_trend(
+            origin, destination, departure_date, cabin_class, airline, resolution, rows
+        )
+        await cache.set(
+            cache_key, response.model_dump(mode="json"), settings.price_trend_cache_ttl
+        )
+        return response
+
+    async def _load_buckets(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        cabin_class: CabinClass,
+        airline: Optional[str],
+        resolution: str,
+        days: int,
+    ) -> List[Dict[str, Any]]:
+        if supabase is None:
+            return []
+
+        table, bucket = RESOLUTIONS[resolution]
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        since_value = since.date().isoformat() if bucket == "day" else since.isoformat()
+
+        def query():
+            return (
+                supabase.table(table)
+                .select("*")
+                .eq("origin", origin)
+                .eq("destination", destination)
+                .eq("cabin_class", cabin_class.value)
+                .eq("departure_date", departure_date.isoformat())
+                .eq("airline", airline or "")
+                .gte(bucket, since_value)
+                .order(bucket)
+                .execute()
+                .data
+            )
+
+        try:
+            return await asyncio.to_thread(query)
+        except Exception as e:
+            logger.error(
+                f"Failed to load price history for {origin}-{destination}: {e}"
+            )
+            return []
+
+    @staticmethod
+    def _build_trend(
+        origin: str,
+        destination: str,
+        departure_date: date,
+        cabin_class: CabinClass,
+        airline: Optional[str],
+        resolution: str,
+        rows: List[Dict[str, Any]],
+    ) -> PriceTrendResponse:
+        _, bucket = RESOLUTIONS[resolution]
+        points = [
+            PriceTrendPoint(
+                # Daily buckets are UTC dates
+                bucket_start=(
+                    row[bucket] if bucket == "bucket_start" else f"{row[bucket]}T00:00Z"
+                ),
+                low=float(row["low_price_usd"]),
+                high=float(row["high_price_usd"]),
+                close=float(row["close_price_usd"]),
+                average=round(float(row["sum_min_price_usd"]) / row["observations"], 2),
+                average_median=round(
+                    float(row["sum_median_price_usd"]) / row["observations"], 2
+                ),
+                observations=row["observations"],
+            )
+            for row in rows
+            if row["observations"]
+        ]
+
+        latest_price = points[-1].close if points else None
+        typical_low = typical_high = price_level = None
+        if len(points) >= MIN_POINTS_FOR_LEVEL:
+            typical_low, typical_high = (
+                round(float(v), 2)
+                for v in np.percentile([p.average for p in points], [25, 75])
+            )
+            if latest_price <= typical_low:
+                price_level = "low"
+            elif latest_price >= typical_high:
+                price_level = "high"
+            else:
+                price_level = "typical"
+
+        return PriceTrendResponse(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            cabin_class=cabin_class,
+            airline=airline,
+            resolution=resolution,
+            points=points,
+            latest_price=latest_price,
+            typical_low=typical_low,
+            typical_high=typical_high,
+            price_level=price_level,
+        )
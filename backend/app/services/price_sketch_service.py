@@ -0,0 +1,172 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.cache import cache
+from app.config import settings
+from app.models.flights import FlightSearchRequest
+from app.reference import reference
+from app.tdigest import TDigest
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hash field every worker folds its observations into. Readers merge all
+# fields of a route-month hash, so anything else stored there still counts.
+DIGEST_FIELD = "digest"
+
+# Merged digests cached, and routes queued, in process memory
+MAX_SKETCHES_IN_MEMORY = 10000
+
+# Percentile ranks at or below / at or above these get a deal label
+GREAT_DEAL_PERCENTILE = 20
+HIGH_PRICE_PERCENTILE = 80
+
+
+def price_label(percentile: float) -> str:
+    if percentile <= GREAT_DEAL_PERCENTILE:
+        return "great_deal"
+    if percentile >= HIGH_PRICE_PERCENTILE:
+        return "high"
+    return "typical"
+
+
+class PriceSketchService:
+    """
+    Per-route, per-month fare distributions as mergeable t-digests.
+
+    Fares from every result set fetched from the providers are queued in
+    memory per route, departure month, cabin and trip type; ``observe``
+    never touches Redis. A background task folds each queued route into
+    its stored digest every ``settings.price_sketch_flush_interval``
+    seconds with one optimistic transaction, so a hot route costs each
+    worker one Redis update per interval however many searches hit it.
+    Percentile ranks come from the stored digests, cached in-process for
+    ``settings.price_sketch_refresh`` seconds, so labelling a page of
+    results is a dict lookup and one interpolation.
+    """
+
+    def __init__(self):
+        self._merged: Dict[Tuple[str, ...], Tuple[float, TDigest]] = {}
+        self._pending: Dict[str, List[np.ndarray]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.dropped = 0
+
+    @staticmethod
+    def _sketch_key(search_request: FlightSearchRequest, origin: str, destination: str):
+        trip = "return" if search_request.return_date else "oneway"
+        return (
+            f"price_sketch:{origin}:{destination}:"
+            f"{search_request.departure_date.strftime('%Y-%m')}:"
+            f"{search_request.cabin_class.value}:{trip}"
+        )
+
+    @staticmethod
+    def _decode(key: str, value: Optional[str]) -> Optional[TDigest]:
+        if not value:
+            return None
+        try:
+            return TDigest.from_string(value)
+        except Exception as e:
+            logger.error(f"Skipping unreadable price sketch {key}: {e}")
+            return None
+
+    def observe(self, search_request: FlightSearchRequest, prices: np.ndarray):
+        """Queue a fetched result set's USD prices for the route's digest"""
+        if not len(prices):
+            return
+        key = self._sketch_key(
+            search_request, search_request.origin, search_request.destination
+        )
+        pending = self._pending.get(key)
+        if pending is None:
+            if len(self._pending) >= MAX_SKETCHES_IN_MEMORY:
+                self.dropped += 1
+                return
+            pending = self._pending[key] = []
+        pending.append(np.array(prices, dtype=np.float64))
+
+    async def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and fold in everything still queued"""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), settings.price_sketch_flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        """Fold every queued route's prices into its stored digest"""
+        pending, self._pending = self._pending, {}
+        for key, batches in pending.items():
+            prices = np.concatenate(batches)
+
+            def fold(stored: Optional[str], key=key, prices=prices) -> str:
+                # An unreadable digest is replaced rather than kept failing
+                digest = self._decode(key, stored) or TDigest(
+                    settings.price_sketch_compression
+                )
+                return digest.update(prices).to_string()
+
+            await cache.update_field(
+                key, DIGEST_FIELD, fold, ttl=settings.price_sketch_ttl
+            )
+
+    async def percentile_ranks(
+        self, search_request: FlightSearchRequest, prices: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Percentile rank (0-100) of each price against the route's history.
+
+        Metro codes use the merged sketches of all their airport pairs.
+        Returns None until the history holds
+        ``settings.price_sketch_min_count`` prices.
+        """
+        keys = tuple(
+            self._sketch_key(search_request, origin, destination)
+            for origin in reference.expand(search_request.origin)
+            for destination in reference.expand(search_request.destination)
+            if origin != destination
+        )
+        digest = await self._get_merged(keys)
+        if digest.count < settings.price_sketch_min_count:
+            return None
+        return np.round(digest.cdf(prices) * 100, 1)
+
+    async def _get_merged(self, keys: Tuple[str, ...]) -> TDigest:
+        cached = self._merged.get(keys)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        hashes = await asyncio.gather(*(cache.hgetall(key) for key in keys))
+        digests: List[TDigest] = []
+        for key, stored in zip(keys, hashes):
+            for value in stored.values():
+                digest = self._decode(key, value)
+                if digest is not None:
+                    digests.append(digest)
+
+        digest = TDigest.merged(digests, settings.price_sketch_compression)
+        now = time.monotonic()
+        if len(self._merged) >= MAX_SKETCHES_IN_MEMORY:
+            self._merged = {k: v for k, v in self._merged.items() if v[0] > now}
+        self._merged[keys] = (now + settings.price_sketch_refresh, digest)
+        return digest
+
+
+price_sketches = PriceSketchService()
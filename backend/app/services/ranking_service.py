@@ -0,0 +1,128 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from app.config import settings
+
+
+class FlightRanker:
+    """
+    "Best flights" ranking over price, total duration and stops.
+
+    Flights on the Pareto front (no other flight is at least as cheap, as
+    fast and with as few stops, and strictly better on one) are tagged
+    ``pareto_optimal``; everything gets a weighted composite score relative to
+    the cheapest and fastest flight in the set. Weights come from settings so
+    they can be tuned per deployment. Works on the column arrays of
+    ``FlightColumns``.
+    """
+
+    def __init__(
+        self,
+        price_weight: Optional[float] = None,
+        duration_weight: Optional[float] = None,
+        stops_weight: Optional[float] = None,
+        dominated_penalty: Optional[float] = None,
+        recommended_bonus: Optional[float] = None,
+    ):
+        self.price_weight = self._pick(price_weight, settings.ranking_price_weight)
+        self.duration_weight = self._pick(
+            duration_weight, settings.ranking_duration_weight
+        )
+        self.stops_weight = self._pick(stops_weight, settings.ranking_stops_weight)
+        self.dominated_penalty = self._pick(
+            dominated_penalty, settings.ranking_dominated_penalty
+        )
+        self.recommended_bonus = self._pick(
+            recommended_bonus, settings.ranking_recommended_bonus
+        )
+
+    @staticmethod
+    def _pick(value: Optional[float], default: float) -> float:
+        return default if value is None else value
+
+    def score_arrays(
+        self,
+        price: np.ndarray,
+        duration: np.ndarray,
+        stops: np.ndarray,
+        recommended: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (composite scores, Pareto front mask) for a set of flights"""
+        if not len(price):
+            return np.zeros(0), np.zeros(0, dtype=bool)
+
+        on_front = self.pareto_front(price, duration, stops)
+        min_price = price.min() or 1.0
+        min_duration = duration.min() or 1
+
+        scores = (
+            self.price_weight * price / min_price
+            + self.duration_weight * duration / min_duration
+            + self.stops_weight * stops
+            + self.dominated_penalty * ~on_front
+            - self.recommended_bonus * recommended
+        )
+        return scores, on_front
+
+    def tags(
+        self,
+        price: np.ndarray,
+        duration: np.ndarray,
+        stops: np.ndarray,
+        recommended: np.ndarray,
+        on_front: np.ndarray,
+        rows: np.ndarray,
+    ) -> List[List[str]]:
+        """Ranking reasons for ``rows`` of a scored set"""
+        min_price = price.min()
+        min_duration = duration.min()
+        min_stops = stops.min()
+
+        tags = []
+        for row in rows:
+            reasons = []
+            if price[row] == min_price:
+                reasons.append("cheapest")
+            if duration[row] == min_duration:
+                reasons.append("fastest")
+            if stops[row] == min_stops:
+                reasons.append("fewest_stops")
+            if on_front[row]:
+                reasons.append("pareto_optimal")
+            if recommended[row]:
+                reasons.append("provider_recommended")
+            tags.append(reasons)
+        return tags
+
+    @staticmethod
+    def pareto_front(
+        price: np.ndarray, duration: np.ndarray, stops: np.ndarray
+    ) -> np.ndarray:
+        """
+        Flag flights not dominated on (price, duration, stops), in O(n log n).
+
+        Flights are sorted by (price, duration, stops). For each stop count,
+        a running minimum of duration over flights with no more stops tells
+        whether an earlier, different tuple dominates. Stop counts are tiny,
+        so the per-level passes add only a small constant factor. Identical
+        tuples never dominate each other.
+        """
+        n = len(price)
+        order = np.lexsort((stops, duration, price))
+        p, d, s = price[order], duration[order].astype(np.float64), stops[order]
+
+        # Start index of each run of identical tuples in sorted order
+        new_group = np.ones(n, dtype=bool)
+        new_group[1:] = (p[1:] != p[:-1]) | (d[1:] != d[:-1]) | (s[1:] != s[:-1])
+        group_start = np.maximum.accumulate(np.where(new_group, np.arange(n), 0))
+        has_earlier = group_start > 0
+
+        dominated = np.zeros(n, dtype=bool)
+        for level in np.unique(s):
+            running = np.minimum.accumulate(np.where(s <= level, d, np.inf))
+            best_before = np.full(n, np.inf)
+            best_before[has_earlier] = running[group_start[has_earlier] - 1]
+            dominated |= (s == level) & (best_before <= d)
+
+        on_front = np.empty(n, dtype=bool)
+        on_front[order] = ~dominated
+        return on_front
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional
+from app.cache import cache
+from app.config import settings
+from app.models.flights import Flight, FlightSearchResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SearchSessionService:
+    """
+    Keeps recent searches and their flights addressable by ID.
+
+    Every flight in a provider result set is stored under its content-addressed
+    ID (``flight:{id}``), and every search stores its response plus the IDs of
+    its full filtered result set under ``search_session:{search_id}``. Detail,
+    booking and share views resolve with a single key lookup instead of
+    re-running the search.
+    """
+
+    @staticmethod
+    def _flight_key(flight_id: str) -> str:
+        return f"flight:{flight_id}"
+
+    @staticmethod
+    def _session_key(search_id: str) -> str:
+        return f"search_session:{search_id}"
+
+    async def store_flights(self, flights: List[Dict[str, Any]]) -> bool:
+        """Index serialized flights by ID in one pipelined write"""
+        return await cache.set_many(
+            {self._flight_key(flight["id"]): flight for flight in flights},
+            ttl=settings.search_session_ttl,
+        )
+
+    async def get_flight(self, flight_id: str) -> Optional[Flight]:
+        cached = await cache.get(self._flight_key(flight_id))
+        if cached:
+            try:
+                return Flight(**cached)
+            except Exception as e:
+                logger.error(f"Failed to deserialize cached flight {flight_id}: {e}")
+        return None
+
+    async def save_session(
+        self, response: FlightSearchResponse, flight_ids: List[str]
+    ) -> bool:
+        """Store a search response with the IDs of every flight it matched"""
+        return await cache.set(
+            self._session_key(response.search_id),
+            {"response": response.model_dump(), "flight_ids": flight_ids},
+            ttl=settings.search_session_ttl,
+        )
+
+    async def get_session(self, search_id: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"response": FlightSearchResponse, "flight_ids": [...]}``"""
+        cached = await cache.get(self._session_key(search_id))
+        if cached:
+            try:
+                return {
+                    "response": FlightSearchResponse(**cached["response"]),
+                    "flight_ids": cached["flight_ids"],
+                }
+            except Exception as e:
+                logger.error(f"Failed to deserialize search session {search_id}: {e}")
+        return None
@@ -2,9 +2,13 @@ from celery import Celery
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from ..services.destination_service import DestinationService
+from ..services.explore_service import ExploreService, add_months, explore_key
+from ..reference import reference
+from ..config import settings
 from ..models.destinations import Destination
 import requests
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 import logging
 
 # Configure Celery for Railway + Redis
@@ -126,26 +130,23 @@ def update_destination_ratings():
         db.close()
 
 
-def fetch_flight_price_sync(city_code: str) -> float:
-    """Fetch current flight price from external API (sync version)"""
+def fetch_flight_price_sync(city_code: str) -> Optional[float]:
+    """Cheapest explore-index fare to the city from the home origin (sync version)"""
     try:
-        # Example integration with Amadeus, Skyscanner, etc.
-        # This is a mock implementation
-        import random
-
-        base_prices = {
-            "paris": 650,
-            "london": 550,
-            "rome": 580,
-            "barcelona": 520,
-            "berlin": 480,
-            "amsterdam": 520,
-            "athens": 590,
-            "istanbul": 650,
-        }
-        base_price = base_prices.get(city_code.lower(), 600)
-        variation = random.uniform(0.85, 1.15)  # ±15% variation
-        return round(base_price * variation, 2)
+        explore_service = ExploreService()
+        code = explore_service.resolve_city(city_code)
+        if code is None:
+            return None
+
+        this_month = date.today().replace(day=1)
+        pipe = redis_client.pipeline(transaction=False)
+        for n in range(settings.explore_price_months):
+            pipe.zscore(
+                explore_key(settings.explore_home_origin, add_months(this_month, n)),
+                reference.city_code(code),
+            )
+        prices = [float(score) for score in pipe.execute() if score is not None]
+        return min(prices) if prices else None
     except Exception as e:
         logger.error(f"Error fetching flight price for {city_code}: {e}")
         return None
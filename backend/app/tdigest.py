@@ -0,0 +1,152 @@
+import base64
+import math
+import struct
+from typing import Iterable, Optional
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+# Serialized header: compression, minimum, maximum
+_HEADER = struct.Struct("<fdd")
+
+
+def _k(q: float, compression: float) -> float:
+    """k1 scale function: centroids near the tails stay small"""
+    return compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+def _k_inverse(k: float, compression: float) -> float:
+    if k >= compression / 4:
+        return 1.0
+    return (math.sin(k * 2 * math.pi / compression) + 1) / 2
+
+
+class TDigest:
+    """
+    Merging t-digest for streaming quantiles.
+
+    The distribution is summarized by at most a few times ``compression``
+    weighted centroids, small near the tails and larger in the middle, so
+    extreme percentiles stay accurate. Digests merge by pooling their
+    centroids and compressing again, which makes them safe to build on
+    several workers independently and combine later. Centroids are kept as
+    sorted NumPy arrays; ``cdf`` is one ``np.interp`` over them.
+    """
+
+    def __init__(
+        self,
+        compression: float = DEFAULT_COMPRESSION,
+        means: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        minimum: float = math.inf,
+        maximum: float = -math.inf,
+    ):
+        self.compression = compression
+        self.means = np.zeros(0) if means is None else np.asarray(means, np.float64)
+        self.weights = (
+            np.zeros(0) if weights is None else np.asarray(weights, np.float64)
+        )
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: Iterable[float]) -> "TDigest":
+        """Add a batch of observations"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._compress(
+            np.concatenate((self.means, values)),
+            np.concatenate((self.weights, np.ones(len(values)))),
+        )
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one"""
+        if not len(other.means):
+            return self
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(
+            np.concatenate((self.means, other.means)),
+            np.concatenate((self.weights, other.weights)),
+        )
+        return self
+
+    @classmethod
+    def merged(
+        cls, digests: Iterable["TDigest"], compression: float = DEFAULT_COMPRESSION
+    ) -> "TDigest":
+        result = cls(compression)
+        for digest in digests:
+            result.merge(digest)
+        return result
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order].tolist(), weights[order].tolist()
+        total = sum(weights)
+
+        merged_means, merged_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        so_far = 0.0
+        q_limit = _k_inverse(_k(0.0, self.compression) + 1, self.compression)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (so_far + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+                continue
+            merged_means.append(current_mean)
+            merged_weights.append(current_weight)
+            so_far += current_weight
+            q_limit = _k_inverse(
+                _k(so_far / total, self.compression) + 1, self.compression
+            )
+            current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def _knots(self):
+        """Piecewise-linear CDF through the centroid midpoints and the extremes"""
+        cumulative = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        xs = np.concatenate(([self.minimum], self.means, [self.maximum]))
+        ys = np.concatenate(([0.0], cumulative, [1.0]))
+        return xs, ys
+
+    def cdf(self, values) -> np.ndarray:
+        """Fraction of observations at or below each value (NaN if empty)"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(self.means):
+            return np.full(values.shape, np.nan)
+        xs, ys = self._knots()
+        return np.interp(values, xs, ys)
+
+    def quantile(self, q) -> np.ndarray:
+        q = np.asarray(q, dtype=np.float64)
+        if not len(self.means):
+            return np.full(q.shape, np.nan)
+        xs, ys = self._knots()
+        return np.interp(q, ys, xs)
+
+    def to_string(self) -> str:
+        """Compact base64 form: header plus float32 means and weights"""
+        payload = _HEADER.pack(self.compression, self.minimum, self.maximum)
+        payload += self.means.astype("<f4").tobytes()
+        payload += self.weights.astype("<f4").tobytes()
+        return base64.b64encode(payload).decode()
+
+    @classmethod
+    def from_string(cls, value: str) -> "TDigest":
+        payload = base64.b64decode(value)
+        compression, minimum, maximum = _HEADER.unpack_from(payload)
+        centroids = np.frombuffer(payload, dtype="<f4", offset=_HEADER.size)
+        size = len(centroids) // 2
+        return cls(compression, centroids[:size], centroids[size:], minimum, maximum)
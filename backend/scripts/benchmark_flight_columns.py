@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar flight result stage against row-by-row processing.
+
+Generates synthetic flights with MockFlightAPI and times dedup + filter +
+ordering + building a 50-flight page, both for a fresh provider result and
+for a cache hit (where the rows arrive as JSON dicts).
+
+Usage: python scripts/benchmark_flight_columns.py [--flights 5000] [--runs 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.integrations.mock_flight_api import MockFlightAPI
+from app.models.flights import Flight, FlightSearchRequest, FlightSortOption
+from app.services.flight_columns import FlightColumns
+from app.services.ranking_service import FlightRanker
+
+PAGE_SIZE = 50
+
+
+def generate_flights(count: int, search_request: FlightSearchRequest):
+    """Synthetic result set with ~10% duplicates, like a multi-provider merge"""
+    api = MockFlightAPI()
+    flights = [api._generate_flight(search_request, i) for i in range(count)]
+    duplicates = random.sample(flights, count // 10)
+    return flights[: count - len(duplicates)] + duplicates
+
+
+def rows_pipeline(flights, search_request: FlightSearchRequest):
+    """Row-by-row reference: Python loops over Flight models"""
+    seen = set()
+    unique = []
+    for flight in flights:
+        first, last = flight.segments[0], flight.segments[-1]
+        signature = f"{first.origin.code}_{last.destination.code}_{first.departure_time.isoformat()}_{flight.price}"
+        if signature not in seen:
+            seen.add(signature)
+            unique.append(flight)
+
+    filtered = [f for f in unique if f.price > 0 and f.currency]
+    if search_request.max_price:
+        filtered = [f for f in filtered if f.price <= search_request.max_price]
+    if search_request.max_stops is not None:
+        filtered = [f for f in filtered if f.stops <= search_request.max_stops]
+    if search_request.airlines:
+        airlines = set(search_request.airlines)
+        filtered = [
+            f for f in filtered if all(s.airline.code in airlines for s in f.segments)
+        ]
+
+    return sorted(filtered, key=lambda f: f.price)[:PAGE_SIZE]
+
+
+def columns_pipeline(columns: FlightColumns, search_request, ranker):
+    """Columnar stage as used by FlightService"""
+    unique = columns.take(columns.deduplicate(columns.valid(columns.all())))
+    filtered = unique.filter(unique.all(), search_request)
+    page = unique.order(filtered, search_request.sort_by, ranker, limit=PAGE_SIZE)
+    return unique.materialize(page, ranker, filtered)
+
+
+def timed(label: str, runs: int, func):
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = func()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+    print(f"  {label:<38} {elapsed_ms:8.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    search_request = FlightSearchRequest(
+        origin="JFK",
+        destination="LAX",
+        departure_date=date.today() + timedelta(days=30),
+        max_price=700,
+        max_stops=1,
+        airlines=["AA", "DL", "UA", "B6"],
+        sort_by=FlightSortOption.PRICE,
+    )
+    ranker = FlightRanker()
+
+    print(f"📊 Generating {args.flights} synthetic flights...")
+    flights = generate_flights(args.flights, search_request)
+    cached_rows = json.loads(json.dumps([f.model_dump() for f in flights], default=str))
+    cached_columns = json.loads(
+        json.dumps(FlightColumns.from_flights(flights).to_cache(), default=str)
+    )
+
+    print(f"\nFresh provider result ({args.runs} runs, mean):")
+    rows_page = timed(
+        "rows: dedup/filter/sort",
+        args.runs,
+        lambda: rows_pipeline(flights, search_request),
+    )
+    columns_page = timed(
+        "columns: build + dedup/filter/order",
+        args.runs,
+        lambda: columns_pipeline(
+            FlightColumns.from_flights(flights), search_request, ranker
+        ),
+    )
+
+    print(f"\nCache hit ({args.runs} runs, mean):")
+    timed(
+        "rows: parse all + dedup/filter/sort",
+        args.runs,
+        lambda: rows_pipeline([Flight(**r) for r in cached_rows], search_request),
+    )
+    timed(
+        "columns: load + filter/order/page",
+        args.runs,
+        lambda: columns_pipeline(
+            FlightColumns.from_cache(cached_columns), search_request, ranker
+        ),
+    )
+
+    same = [f.price for f in rows_page] == [f.price for f in columns_page]
+    print(f"\n{'✅' if same else '❌'} Both pipelines return the same page prices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Convert search_logs to daily partitions and run partition maintenance.
+
+  migrate   One-off conversion of an existing unpartitioned search_logs table.
+            The old table is renamed to search_logs_unpartitioned, the
+            partitioned table and its functions are created from
+            database/schema.sql, then the last --keep-days days are copied
+            across one day per transaction, newest first, so live inserts
+            and the current hours' rollups are correct straight away. Pass
+            --drop-old to drop the old table once the row counts match.
+  maintain  Create partitions --days-ahead days ahead and drop rolled-up
+            partitions older than --keep-days (same as the pg_cron job).
+
+Needs a direct Postgres connection (DATABASE_URL); the Supabase REST client
+can't run DDL.
+
+Usage: python scripts/partition_search_logs.py migrate [--keep-days 30] [--drop-old]
+       python scripts/partition_search_logs.py maintain [--days-ahead 7] [--keep-days 30]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine
+
+SCHEMA_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "database",
+    "schema.sql",
+)
+OLD_TABLE = "search_logs_unpartitioned"
+# Index names are schema-wide, so the old ones move aside for the new table's
+OLD_INDEXES = [
+    "search_logs_pkey",
+    "idx_search_logs_type_date",
+    "idx_search_logs_route",
+    "idx_search_logs_destination",
+    "idx_search_logs_session",
+]
+COLUMNS = (
+    "id, search_id, search_type, origin, destination, departure_date, return_date, "
+    "destination_city, check_in, check_out, adults, children, rooms, results_count, "
+    "cache_hit, search_time_ms, providers, user_ip, user_agent, session_id, created_at"
+)
+
+
+def relkind(conn, name: str):
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+
+
+def rename_old_table(conn):
+    """Move the unpartitioned table and its indexes out of the way"""
+    conn.execute(text(f"ALTER TABLE search_logs RENAME TO {OLD_TABLE}"))
+    for index in OLD_INDEXES:
+        if relkind(conn, index) is not None:
+            conn.execute(
+                text(
+                    f"ALTER INDEX {index} RENAME TO "
+                    f"{index.replace('search_logs', OLD_TABLE, 1)}"
+                )
+            )
+
+
+def migrate(keep_days: int, drop_old: bool):
+    with engine.begin() as conn:
+        kind = relkind(conn, "search_logs")
+        if kind is None:
+            print("❌ No search_logs table; run database/schema.sql instead")
+            sys.exit(1)
+        if kind == "p" and relkind(conn, OLD_TABLE) is None:
+            print("✅ search_logs is already partitioned, nothing to migrate")
+            return
+        if kind == "r":
+            print(f"🔄 Renaming search_logs to {OLD_TABLE}")
+            rename_old_table(conn)
+            print("🏗️  Creating partitioned search_logs from schema.sql")
+            with open(SCHEMA_FILE) as f:
+                conn.exec_driver_sql(f.read())
+
+        first_day, last_day = conn.execute(
+            text(
+                f"SELECT MIN(created_at AT TIME ZONE 'UTC')::DATE, "
+                f"MAX(created_at AT TIME ZONE 'UTC')::DATE FROM {OLD_TABLE} "
+                f"WHERE created_at >= NOW() - make_interval(days => :keep_days)"
+            ),
+            {"keep_days": keep_days},
+        ).one()
+        if first_day is not None:
+            created = conn.execute(
+                text("SELECT create_search_log_partitions(7, :from_day)"),
+                {"from_day": first_day},
+            ).scalar()
+            print(f"📅 Created {created} partitions from {first_day}")
+
+    copied = 0
+    day = last_day
+    while first_day is not None and day >= first_day:
+        start = time.time()
+        # ON CONFLICT makes a rerun after an interrupted copy safe
+        with engine.begin() as conn:
+            count = conn.execute(
+                text(
+                    f"INSERT INTO search_logs ({COLUMNS}) "
+                    f"SELECT {COLUMNS} FROM {OLD_TABLE} "
+                    f"WHERE created_at >= (:day)::TIMESTAMP AT TIME ZONE 'UTC' "
+                    f"AND created_at < (:day + 1)::TIMESTAMP AT TIME ZONE 'UTC' "
+                    f"ON CONFLICT DO NOTHING"
+                ),
+                {"day": day},
+            ).rowcount
+        copied += count
+        print(f"  {day}: {count} rows in {(time.time() - start) * 1000:.0f}ms")
+        day -= timedelta(days=1)
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT refresh_search_rollups()"))
+        missing = conn.execute(
+            text(
+                f"SELECT COUNT(*) FROM {OLD_TABLE} o "
+                f"WHERE o.created_at >= NOW() - make_interval(days => :keep_days) "
+                f"AND NOT EXISTS (SELECT 1 FROM search_logs n "
+                f"WHERE n.id = o.id AND n.created_at = o.created_at)"
+            ),
+            {"keep_days": keep_days},
+        ).scalar()
+    print(f"✅ Copied {copied} rows, {missing} recent rows missing")
+
+    if missing:
+        print(f"⚠️  Keeping {OLD_TABLE}; rerun migrate to copy the rest")
+        sys.exit(1)
+    if drop_old:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {OLD_TABLE}"))
+        print(f"🗑️  Dropped {OLD_TABLE}")
+    else:
+        print(f"ℹ️  {OLD_TABLE} kept; rerun with --drop-old to remove it")
+
+
+def maintain(days_ahead: int, keep_days: int):
+    with engine.begin() as conn:
+        created = conn.execute(
+            text("SELECT create_search_log_partitions(:days_ahead)"),
+            {"days_ahead": days_ahead},
+        ).scalar()
+        dropped = conn.execute(
+            text("SELECT drop_old_search_log_partitions(:keep_days)"),
+            {"keep_days": keep_days},
+        ).scalar()
+    print(f"✅ Created {created} and dropped {dropped} search_logs partitions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Partition an existing table"
+    )
+    migrate_parser.add_argument("--keep-days", type=int, default=30)
+    migrate_parser.add_argument(
+        "--drop-old",
+        action="store_true",
+        help=f"Drop {OLD_TABLE} once every copied row is verified",
+    )
+
+    maintain_parser = subparsers.add_parser(
+        "maintain", help="Create future partitions and drop expired ones"
+    )
+    maintain_parser.add_argument("--days-ahead", type=int, default=7)
+    maintain_parser.add_argument("--keep-days", type=int, default=30)
+
+    args = parser.parse_args()
+    if args.command == "migrate":
+        migrate(args.keep_days, args.drop_old)
+    else:
+        maintain(args.days_ahead, args.keep_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Fold new search logs and route prices into the hourly and daily rollups.
+
+Calls the refresh_search_rollups() and refresh_route_price_rollups()
+database functions (see database/schema.sql). Safe to run as often as you
+like; schedule it every few minutes with cron if pg_cron isn't available.
+
+Usage: python scripts/refresh_search_rollups.py [--clean]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import supabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Also drop expired log partitions and raw price observations",
+    )
+    args = parser.parse_args()
+
+    if supabase is None:
+        print("❌ Supabase is not configured (SUPABASE_URL / SUPABASE_ANON_KEY)")
+        sys.exit(1)
+
+    hours = supabase.rpc("refresh_search_rollups").execute().data
+    print(f"✅ Refreshed {hours} hours of search rollups")
+
+    hours = supabase.rpc("refresh_route_price_rollups").execute().data
+    print(f"✅ Refreshed {hours} hours of route price history")
+
+    if args.clean:
+        dropped = supabase.rpc("clean_old_search_logs").execute().data
+        print(f"🧹 Dropped {dropped} old search log partitions")
+        deleted = supabase.rpc("clean_old_route_prices").execute().data
+        print(f"🧹 Deleted {deleted} downsampled price observations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Warm the explore index with the cheapest known fares from some origins.
+
+One Travelpayouts call per origin and month returns the cheapest cached
+fare to every destination; those overwrite the index scores, so lows
+recorded by live searches that have since gone away are replaced. Run it
+a few times a day from cron.
+
+Usage: python scripts/warm_explore_index.py [--origins NYC LON] [--months 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cache import cache
+from app.config import settings
+from app.integrations.travelpayouts_api import TravelpayoutsAPI
+from app.services.explore_service import ExploreService, add_months
+
+
+async def warm(origins, months: int):
+    await cache.connect()
+    if cache.redis_client is None:
+        print("❌ Redis is not configured (REDIS_URL)")
+        sys.exit(1)
+
+    travelpayouts_api = TravelpayoutsAPI()
+    explore_service = ExploreService()
+    this_month = date.today().replace(day=1)
+    try:
+        for origin in origins:
+            for n in range(months):
+                month = add_months(this_month, n)
+                try:
+                    prices = await travelpayouts_api.get_origin_month_prices(
+                        origin, month
+                    )
+                except Exception as e:
+                    print(f"⚠️  {origin} {month:%Y-%m}: {e}")
+                    continue
+                await explore_service.record_bulk(origin, month, prices)
+                print(f"✅ {origin} {month:%Y-%m}: {len(prices)} destinations")
+    finally:
+        await cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--origins",
+        nargs="+",
+        default=[settings.explore_home_origin],
+        help="Origin airport or metro codes",
+    )
+    parser.add_argument("--months", type=int, default=settings.explore_price_months)
+    args = parser.parse_args()
+
+    asyncio.run(warm([origin.upper() for origin in args.origins], args.months))
+
+
+if __name__ == "__main__":
+    main()
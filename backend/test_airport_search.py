@@ -0,0 +1,42 @@
+# test_airport_search.py
+
+from app.reference import reference
+from app.services.airport_search_service import AirportSearchIndex, _edit_distance
+
+index = AirportSearchIndex(reference)
+
+
+def _codes(query, limit=5):
+    return [suggestion.code for suggestion in index.search(query, limit)]
+
+
+def test_exact_code_first():
+    assert _codes("JFK")[0] == "JFK"
+    assert _codes("lhr")[0] == "LHR"
+
+
+def test_city_prefix():
+    codes = _codes("lond", 10)
+    assert codes[0] == "LON"
+    assert {"LHR", "LGW"} <= set(codes)
+
+
+def test_every_token_must_match():
+    assert "JFK" in _codes("new york kennedy")
+    assert _codes("london kennedy") == []
+
+
+def test_typo_fallback():
+    for typo in ("londno", "lnodon", "londn", "londoon", "lindon"):
+        assert _codes(typo)[0] == "LON", typo
+
+
+def test_no_match():
+    assert _codes("xqzv") == []
+    assert _codes("  ") == []
+
+
+def test_edit_distance_counts_swaps_once():
+    assert _edit_distance("london", "lnodon") == 1
+    assert _edit_distance("london", "londn") == 1
+    assert _edit_distance("london", "lindan") == 2
@@ -0,0 +1,126 @@
+# test_flight_columns.py
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.models.flights import (
+    Airline,
+    Airport,
+    CabinClass,
+    Flight,
+    FlightSearchRequest,
+    FlightSegment,
+    FlightSortOption,
+)
+from app.services.flight_columns import FlightColumns
+from app.services.ranking_service import FlightRanker
+
+DAY = date.today() + timedelta(days=30)
+
+
+def _airport(code):
+    return Airport(code=code, name=code, city=code, country="US")
+
+
+def _flight(price, airlines=("AA",), hour=8, duration=300, currency="USD"):
+    departure = datetime(DAY.year, DAY.month, DAY.day, hour)
+    stops = ["JFK", *(f"X{i}" for i in range(len(airlines) - 1)), "LAX"]
+    leg = timedelta(minutes=duration // len(airlines))
+    segments = [
+        FlightSegment(
+            origin=_airport(stops[i]),
+            destination=_airport(stops[i + 1]),
+            departure_time=departure + i * leg,
+            arrival_time=departure + (i + 1) * leg,
+            duration_minutes=leg.seconds // 60,
+            flight_number=f"{airline}{100 + i}",
+            airline=Airline(code=airline, name=airline),
+            cabin_class=CabinClass.ECONOMY,
+            booking_class="Y",
+        )
+        for i, airline in enumerate(airlines)
+    ]
+    return Flight(
+        id=f"{price}-{'-'.join(airlines)}-{hour}",
+        segments=segments,
+        total_duration_minutes=duration,
+        stops=len(airlines) - 1,
+        price=price,
+        currency=currency,
+        deep_link="",
+        provider="Test",
+    )
+
+
+def _request(**filters):
+    return FlightSearchRequest(
+        origin="JFK", destination="LAX", departure_date=DAY, **filters
+    )
+
+
+def test_deduplicate_keeps_first_in_order():
+    flights = [_flight(200), _flight(150, ("DL",)), _flight(200), _flight(180)]
+    columns = FlightColumns.from_flights(flights)
+    assert columns.deduplicate(np.array([3, 2, 1, 0])).tolist() == [3, 2, 1]
+    assert columns.deduplicate(columns.all()).tolist() == [0, 1, 3]
+
+
+def test_valid_drops_bad_prices_and_currencies():
+    flights = [_flight(100), _flight(0), _flight(120, currency="")]
+    flights.append(_flight(130, currency="XXX"))
+    columns = FlightColumns.from_flights(flights)
+    assert columns.valid(columns.all()).tolist() == [0]
+
+
+def test_filter_by_airline_stops_and_time():
+    flights = [
+        _flight(100, ("AA",), hour=6),
+        _flight(110, ("AA", "DL"), hour=9),
+        _flight(120, ("AA", "UA"), hour=10),
+        _flight(130, ("DL",), hour=22),
+        _flight(140, ("UA",), hour=12),
+    ]
+    columns = FlightColumns.from_flights(flights)
+    everything = columns.all()
+
+    assert columns.filter(everything, _request(airlines=["AA", "DL"])).tolist() == [
+        0,
+        1,
+        3,
+    ]
+    assert columns.filter(everything, _request(max_stops=0)).tolist() == [0, 3, 4]
+    assert columns.filter(everything, _request(max_price=125)).tolist() == [0, 1, 2]
+    overnight = _request(departure_time_from="21:00", departure_time_to="07:00")
+    assert columns.filter(everything, overnight).tolist() == [0, 3]
+
+
+def test_filter_survives_the_cache_round_trip():
+    flights = [_flight(100, ("AA", "DL")), _flight(90, ("UA",))]
+    columns = FlightColumns.from_flights(flights)
+    cached = FlightColumns.from_cache(columns.to_cache())
+    request = _request(airlines=["DL", "AA"])
+    assert cached.filter(cached.all(), request).tolist() == [0]
+
+
+def test_order_with_limit_matches_full_sort():
+    rng = np.random.default_rng(5)
+    flights = [
+        _flight(
+            float(rng.integers(100, 130)),
+            hour=int(rng.integers(0, 24)),
+            duration=int(rng.integers(200, 260)),
+        )
+        for _ in range(60)
+    ]
+    columns = FlightColumns.from_flights(flights)
+    ranker = FlightRanker()
+    indices = columns.all()
+
+    by_price = columns.order(indices, FlightSortOption.PRICE, ranker)
+    assert np.all(np.diff(columns.price_usd[by_price]) >= 0)
+    for sort_by in FlightSortOption:
+        full = columns.order(indices, sort_by, ranker)
+        for limit in (1, 7, 60, 100):
+            limited = columns.order(indices, sort_by, ranker, limit=limit)
+            assert limited.tolist() == full[:limit].tolist(), (sort_by, limit)
@@ -0,0 +1,44 @@
+# test_geo.py
+
+import numpy as np
+
+from app.geo import AirportKDTree, haversine_km
+from app.reference import reference
+
+
+def _brute_force(latitude, longitude, radius_km):
+    km = haversine_km(latitude, longitude, reference.latitude, reference.longitude)
+    return {row for row in np.flatnonzero(km <= radius_km).tolist()}, km
+
+
+def test_within_matches_brute_force():
+    tree = AirportKDTree(reference)
+    # Include points near the antimeridian and the poles
+    points = [(51.5, -0.1), (40.6, -73.8), (-17.7, 178.0), (64.8, -147.9), (0, 0)]
+    for latitude, longitude in points:
+        for radius_km in (50, 500, 3000):
+            expected, km = _brute_force(latitude, longitude, radius_km)
+            found = tree.within(latitude, longitude, radius_km)
+            rows = {row for row, _ in found}
+            # Allow for rounding right at the boundary
+            edge = {row for row in rows ^ expected if abs(km[row] - radius_km) < 1}
+            assert rows ^ expected == edge
+            distances = [d for _, d in found]
+            assert distances == sorted(distances)
+            for row, d in found:
+                assert abs(d - km[row]) <= 0.1
+
+
+def test_within_without_radius_returns_everything():
+    tree = AirportKDTree(reference)
+    assert len(tree.within(0.0, 0.0)) == len(reference.codes)
+
+
+def test_nearby_skips_the_metro_itself():
+    tree = AirportKDTree(reference)
+    nearby = tree.nearby("LON", radius_km=300, limit=10)
+    codes = [code for code, _ in nearby]
+    assert codes and not set(codes) & set(reference.expand("LON"))
+    assert [km for _, km in nearby] == sorted(km for _, km in nearby)
+    assert all(km <= 300 for _, km in nearby)
+    assert tree.nearby("ZZZ") == []
@@ -0,0 +1,67 @@
+# test_itinerary.py
+
+import itertools
+from types import SimpleNamespace
+
+from app.services import itinerary_service
+from app.services.itinerary_service import k_cheapest_combinations
+
+
+def _leg(*prices):
+    return [SimpleNamespace(price_usd=p) for p in sorted(prices)]
+
+
+def _brute_force(legs, k, is_valid, max_total=None):
+    combinations = [
+        c
+        for c in itertools.product(*legs)
+        if is_valid(c)
+        and (max_total is None or sum(f.price_usd for f in c) <= max_total)
+    ]
+    return sorted(sum(f.price_usd for f in c) for c in combinations)[:k]
+
+
+def test_matches_brute_force():
+    legs = [_leg(100, 120, 150, 300), _leg(80, 90, 95), _leg(10, 40, 70, 75, 200)]
+
+    def is_valid(c):
+        return (c[0].price_usd + c[2].price_usd) % 20 != 10
+
+    for k in (1, 5, 20, 100):
+        results, truncated = k_cheapest_combinations(legs, k, is_valid)
+        assert [sum(f.price_usd for f in c) for c in results] == _brute_force(
+            legs, k, is_valid
+        )
+        assert not truncated
+
+
+def test_each_combination_once():
+    legs = [_leg(1, 1, 1), _leg(2, 2)]
+    results, _ = k_cheapest_combinations(legs, 10, lambda c: True)
+    assert len(results) == 6
+    assert len({tuple(map(id, c)) for c in results}) == 6
+
+
+def test_max_total():
+    legs = [_leg(100, 200, 300), _leg(50, 60)]
+    results, truncated = k_cheapest_combinations(
+        legs, 10, lambda c: True, max_total=260
+    )
+    assert [sum(f.price_usd for f in c) for c in results] == [150, 160, 250, 260]
+    assert not truncated
+
+
+def test_empty_leg():
+    assert k_cheapest_combinations([_leg(1), []], 5, lambda c: True) == ([], False)
+    assert k_cheapest_combinations([_leg(1)], 0, lambda c: True) == ([], False)
+
+
+def test_expansion_cap_is_reported(monkeypatch):
+    monkeypatch.setattr(itinerary_service, "MAX_EXPANSIONS_PER_RESULT", 2)
+    legs = [_leg(*range(20)), _leg(*range(20))]
+
+    results, truncated = k_cheapest_combinations(legs, 3, lambda c: False)
+    assert results == [] and truncated
+
+    results, truncated = k_cheapest_combinations(legs, 3, lambda c: True)
+    assert len(results) == 3 and not truncated
@@ -0,0 +1,47 @@
+# test_ranking.py
+
+import numpy as np
+
+from app.services.ranking_service import FlightRanker
+
+
+def _dominated(price, duration, stops, i):
+    for j in range(len(price)):
+        no_worse = (
+            price[j] <= price[i] and duration[j] <= duration[i] and stops[j] <= stops[i]
+        )
+        better = price[j] < price[i] or duration[j] < duration[i] or stops[j] < stops[i]
+        if no_worse and better:
+            return True
+    return False
+
+
+def test_pareto_front_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        n = int(rng.integers(1, 40))
+        # Small value ranges so ties and duplicate tuples are common
+        price = rng.integers(100, 110, n).astype(np.float64)
+        duration = rng.integers(60, 70, n)
+        stops = rng.integers(0, 3, n)
+        expected = [not _dominated(price, duration, stops, i) for i in range(n)]
+        assert FlightRanker.pareto_front(price, duration, stops).tolist() == expected
+
+
+def test_identical_flights_share_the_front():
+    front = FlightRanker.pareto_front(
+        np.array([100.0, 100.0, 120.0]), np.array([90, 90, 80]), np.array([0, 0, 1])
+    )
+    assert front.tolist() == [True, True, True]
+
+
+def test_dominated_flights_score_worse():
+    ranker = FlightRanker(1.0, 1.0, 0.0, dominated_penalty=10.0, recommended_bonus=0)
+    scores, front = ranker.score_arrays(
+        np.array([100.0, 150.0]),
+        np.array([120, 130]),
+        np.array([0, 1]),
+        np.array([False, False]),
+    )
+    assert front.tolist() == [True, False]
+    assert scores[0] < scores[1]
@@ -0,0 +1,52 @@
+# test_tdigest.py
+
+import numpy as np
+
+from app.tdigest import TDigest
+
+
+def _prices(n, seed):
+    return np.random.default_rng(seed).lognormal(5.5, 0.4, n)
+
+
+def test_quantiles_close_to_exact():
+    prices = _prices(20000, 1)
+    digest = TDigest(100).update(prices)
+    assert digest.count == len(prices)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        exact = np.quantile(prices, q)
+        assert abs(digest.quantile(q) - exact) / exact < 0.02
+    ranks = digest.cdf(np.quantile(prices, [0.1, 0.5, 0.9]))
+    assert np.allclose(ranks, [0.1, 0.5, 0.9], atol=0.01)
+
+
+def test_merge_matches_single_digest():
+    a, b = _prices(5000, 2), _prices(5000, 3)
+    merged = TDigest.merged([TDigest(100).update(a), TDigest(100).update(b)], 100)
+    single = TDigest(100).update(np.concatenate((a, b)))
+    assert merged.count == single.count
+    assert merged.minimum == single.minimum and merged.maximum == single.maximum
+    q = [0.05, 0.5, 0.95]
+    assert np.allclose(merged.quantile(q), single.quantile(q), rtol=0.02)
+
+
+def test_size_is_bounded():
+    digest = TDigest(100)
+    for seed in range(20):
+        digest.update(_prices(1000, seed))
+    assert len(digest.means) < 500
+
+
+def test_string_round_trip():
+    digest = TDigest(100).update(_prices(1000, 4))
+    restored = TDigest.from_string(digest.to_string())
+    assert restored.compression == digest.compression
+    assert restored.count == digest.count
+    assert np.allclose(restored.quantile([0.1, 0.9]), digest.quantile([0.1, 0.9]))
+
+
+def test_empty_and_non_finite():
+    digest = TDigest(100)
+    assert np.isnan(digest.cdf([100.0])).all()
+    digest.update([np.nan, np.inf])
+    assert digest.count == 0
@@ -1,6 +1,10 @@
--- Create search_logs table for analytics
+-- Create search_logs table for analytics. Range-partitioned by day on
+-- created_at (UTC): inserts only touch the current day's small partition and
+-- its indexes, and retention drops whole partitions instead of DELETE-ing
+-- rows. Existing unpartitioned tables are converted with
+-- backend/scripts/partition_search_logs.py.
 CREATE TABLE IF NOT EXISTS search_logs (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    id UUID DEFAULT gen_random_uuid(),
     search_id UUID NOT NULL,
     search_type VARCHAR(20) NOT NULL CHECK (search_type IN ('flights', 'hotels')),
     
@@ -31,58 +35,582 @@ CREATE TABLE IF NOT EXISTS search_logs (
     user_agent TEXT,
     session_id UUID,
     
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    -- The partition key has to be part of the primary key
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
--- Create indexes for analytics queries
+-- Catches rows for days without a partition (e.g. if maintenance stopped
+-- running); create_search_log_partitions() moves them out again
+CREATE TABLE IF NOT EXISTS search_logs_default PARTITION OF search_logs DEFAULT;
+
+-- Create indexes for analytics queries (created on every partition)
 CREATE INDEX IF NOT EXISTS idx_search_logs_type_date ON search_logs(search_type, created_at);
 CREATE INDEX IF NOT EXISTS idx_search_logs_route ON search_logs(origin, destination) WHERE search_type = 'flights';
 CREATE INDEX IF NOT EXISTS idx_search_logs_destination ON search_logs(destination_city) WHERE search_type = 'hotels';
 CREATE INDEX IF NOT EXISTS idx_search_logs_session ON search_logs(session_id);
 
--- Create popular_routes view for caching optimization
+-- Create daily partitions search_logs_YYYYMMDD from from_day (default today,
+-- UTC) through days_ahead days from now. Each partition is built detached,
+-- takes over any of its rows sitting in the default partition, then is
+-- attached, so running this late never fails on rows that already arrived.
+-- The default partition stays locked from the move until commit, so rows
+-- for days without a partition wait briefly rather than break the attach.
+CREATE OR REPLACE FUNCTION create_search_log_partitions(
+    days_ahead INTEGER DEFAULT 7,
+    from_day DATE DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    part_day DATE := COALESCE(from_day, (NOW() AT TIME ZONE 'UTC')::DATE);
+    last_day DATE := (NOW() AT TIME ZONE 'UTC')::DATE + days_ahead;
+    partition_name TEXT;
+    lower_bound TIMESTAMP WITH TIME ZONE;
+    upper_bound TIMESTAMP WITH TIME ZONE;
+    created_count INTEGER := 0;
+BEGIN
+    WHILE part_day <= last_day LOOP
+        partition_name := 'search_logs_' || to_char(part_day, 'YYYYMMDD');
+        IF to_regclass(partition_name) IS NULL THEN
+            lower_bound := part_day::TIMESTAMP AT TIME ZONE 'UTC';
+            upper_bound := (part_day + 1)::TIMESTAMP AT TIME ZONE 'UTC';
+
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE search_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                partition_name
+            );
+            -- Hold off rows bound for the default partition until the new
+            -- partition is attached, or one arriving after the move would
+            -- make the attach fail. The lock lasts until the transaction ends.
+            LOCK TABLE search_logs_default IN ACCESS EXCLUSIVE MODE;
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM search_logs_default
+                     WHERE created_at >= %L AND created_at < %L RETURNING *)
+                 INSERT INTO %I SELECT * FROM moved',
+                lower_bound, upper_bound, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE search_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, lower_bound, upper_bound
+            );
+            created_count := created_count + 1;
+        END IF;
+        part_day := part_day + 1;
+    END LOOP;
+
+    RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop daily partitions whose whole day is older than keep_days and already
+-- folded into the rollups (see refresh_search_rollups()). Dropping a table is
+-- a catalog change, so retention costs the same however many rows it removes.
+CREATE OR REPLACE FUNCTION drop_old_search_log_partitions(keep_days INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff TIMESTAMP WITH TIME ZONE;
+    watermark TIMESTAMP WITH TIME ZONE;
+    partition_name TEXT;
+    dropped_count INTEGER := 0;
+BEGIN
+    SELECT rolled_up_to - INTERVAL '1 hour' INTO watermark
+    FROM search_rollup_state WHERE name = 'search_logs';
+    IF watermark IS NULL THEN
+        RETURN 0;
+    END IF;
+    cutoff := LEAST(NOW() - make_interval(days => keep_days), watermark);
+
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'search_logs'::regclass
+          AND c.relname ~ '^search_logs_[0-9]{8}$'
+        ORDER BY c.relname
+    LOOP
+        -- search_logs_YYYYMMDD holds that UTC day
+        EXIT WHEN (to_date(substring(partition_name FROM 13), 'YYYYMMDD') + 1)::TIMESTAMP
+            AT TIME ZONE 'UTC' > cutoff;
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped_count := dropped_count + 1;
+    END LOOP;
+
+    -- Stragglers in the default partition are few; delete them row by row
+    DELETE FROM search_logs_default WHERE created_at < cutoff;
+
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep a week of partitions ahead and drop expired ones
+CREATE OR REPLACE FUNCTION maintain_search_log_partitions()
+RETURNS VOID AS $$
+BEGIN
+    PERFORM create_search_log_partitions(7);
+    PERFORM drop_old_search_log_partitions(30);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_search_log_partitions(7);
+
+-- Run partition maintenance daily (if using pg_cron), or call
+-- backend/scripts/partition_search_logs.py maintain from any scheduler
+-- SELECT cron.schedule('maintain-search-log-partitions', '15 0 * * *', 'SELECT maintain_search_log_partitions();');
+
+-- ─────────────────────────────
+-- Search analytics rollups
+-- ─────────────────────────────
+-- Hourly and daily aggregates per flight route (origin, destination) and per
+-- hotel destination (origin = '', destination = destination_city). Readers use
+-- these instead of scanning raw search_logs, so their cost depends on the
+-- number of routes, not on traffic. refresh_search_rollups() folds new logs in.
+
+-- Search time histogram bucket lower bounds in ms; mergeable across hours,
+-- so daily percentiles come from summed hourly histograms
+CREATE OR REPLACE FUNCTION search_time_bounds()
+RETURNS INTEGER[] AS $$
+    SELECT ARRAY[0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 8000, 12000, 20000]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS search_rollup_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    search_type VARCHAR(20) NOT NULL,
+    origin VARCHAR(3) NOT NULL DEFAULT '',
+    destination VARCHAR(255) NOT NULL DEFAULT '',
+    search_count INTEGER NOT NULL,
+    cache_hits INTEGER NOT NULL,
+    zero_results INTEGER NOT NULL,
+    total_search_time_ms BIGINT NOT NULL,
+    p50_search_time_ms INTEGER,
+    p95_search_time_ms INTEGER,
+    search_time_histogram INTEGER[] NOT NULL,
+    last_searched TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (bucket_start, search_type, origin, destination)
+);
+
+CREATE TABLE IF NOT EXISTS search_rollup_daily (
+    day DATE NOT NULL,
+    search_type VARCHAR(20) NOT NULL,
+    origin VARCHAR(3) NOT NULL DEFAULT '',
+    destination VARCHAR(255) NOT NULL DEFAULT '',
+    search_count INTEGER NOT NULL,
+    cache_hits INTEGER NOT NULL,
+    zero_results INTEGER NOT NULL,
+    total_search_time_ms BIGINT NOT NULL,
+    p50_search_time_ms INTEGER,
+    p95_search_time_ms INTEGER,
+    search_time_histogram INTEGER[] NOT NULL,
+    last_searched TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (day, search_type, origin, destination)
+);
+
+-- Logs before rolled_up_to are in the rollups (bar late arrivals, see below)
+CREATE TABLE IF NOT EXISTS search_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    rolled_up_to TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Bucket ids from width_bucket(search_time_ms, search_time_bounds()) -> counts
+CREATE OR REPLACE FUNCTION search_time_histogram(bucket_ids INTEGER[])
+RETURNS INTEGER[] AS $$
+    SELECT array_agg(COALESCE(counts.n, 0) ORDER BY b.id)
+    FROM generate_series(0, array_length(search_time_bounds(), 1)) AS b(id)
+    LEFT JOIN (
+        SELECT id, COUNT(*)::INTEGER AS n FROM unnest(bucket_ids) AS id GROUP BY id
+    ) counts ON counts.id = b.id
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION add_histograms(a INTEGER[], b INTEGER[])
+RETURNS INTEGER[] AS $$
+    SELECT CASE WHEN a IS NULL THEN b ELSE
+        ARRAY(
+            SELECT COALESCE(x, 0) + COALESCE(y, 0)
+            FROM unnest(a, b) WITH ORDINALITY AS t(x, y, i)
+            ORDER BY i
+        )
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE AGGREGATE sum_histograms(INTEGER[]) (
+    SFUNC = add_histograms,
+    STYPE = INTEGER[]
+);
+
+-- Percentile from a histogram, interpolating linearly inside the bucket
+CREATE OR REPLACE FUNCTION histogram_percentile(hist INTEGER[], q DOUBLE PRECISION)
+RETURNS INTEGER AS $$
+DECLARE
+    bounds INTEGER[] := search_time_bounds();
+    total BIGINT;
+    target DOUBLE PRECISION;
+    seen BIGINT := 0;
+    lower_ms INTEGER;
+    upper_ms INTEGER;
+BEGIN
+    SELECT SUM(n) INTO total FROM unnest(hist) AS n;
+    IF total IS NULL OR total = 0 THEN
+        RETURN NULL;
+    END IF;
+    target := q * total;
+
+    -- hist[i] counts width_bucket i - 1, i.e. [bounds[i - 1], bounds[i])
+    FOR i IN 1 .. array_length(hist, 1) LOOP
+        IF hist[i] > 0 AND seen + hist[i] >= target THEN
+            lower_ms := COALESCE(bounds[i - 1], 0);
+            upper_ms := COALESCE(bounds[i], bounds[array_length(bounds, 1)]);
+            RETURN (lower_ms + (upper_ms - lower_ms) * (target - seen) / hist[i])::INTEGER;
+        END IF;
+        seen := seen + hist[i];
+    END LOOP;
+    RETURN bounds[array_length(bounds, 1)];
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Fold new search logs into the rollups. Each run recomputes whole hours from
+-- the last watermark (minus one hour for late batch inserts) through the
+-- current hour, then the days those hours touch, so it is idempotent and its
+-- cost depends on recent traffic only. Returns the number of hours refreshed.
+CREATE OR REPLACE FUNCTION refresh_search_rollups()
+RETURNS INTEGER AS $$
+DECLARE
+    watermark TIMESTAMP WITH TIME ZONE;
+    from_hour TIMESTAMP WITH TIME ZONE;
+    to_hour TIMESTAMP WITH TIME ZONE := date_trunc('hour', NOW()) + INTERVAL '1 hour';
+BEGIN
+    SELECT rolled_up_to INTO watermark
+    FROM search_rollup_state WHERE name = 'search_logs'
+    FOR UPDATE;
+
+    IF watermark IS NULL THEN
+        SELECT date_trunc('hour', MIN(created_at)) INTO from_hour FROM search_logs;
+        IF from_hour IS NULL THEN
+            RETURN 0;
+        END IF;
+    ELSE
+        from_hour := watermark - INTERVAL '1 hour';
+    END IF;
+
+    INSERT INTO search_rollup_hourly (
+        bucket_start, search_type, origin, destination, search_count, cache_hits,
+        zero_results, total_search_time_ms, p50_search_time_ms, p95_search_time_ms,
+        search_time_histogram, last_searched
+    )
+    SELECT
+        date_trunc('hour', created_at),
+        search_type,
+        COALESCE(CASE WHEN search_type = 'flights' THEN origin END, ''),
+        COALESCE(CASE WHEN search_type = 'flights' THEN destination ELSE destination_city END, ''),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE cache_hit),
+        COUNT(*) FILTER (WHERE results_count = 0),
+        SUM(search_time_ms),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY search_time_ms)::INTEGER,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY search_time_ms)::INTEGER,
+        search_time_histogram(array_agg(width_bucket(search_time_ms, search_time_bounds()))),
+        MAX(created_at)
+    FROM search_logs
+    WHERE created_at >= from_hour AND created_at < to_hour
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (bucket_start, search_type, origin, destination) DO UPDATE SET
+        search_count = EXCLUDED.search_count,
+        cache_hits = EXCLUDED.cache_hits,
+        zero_results = EXCLUDED.zero_results,
+        total_search_time_ms = EXCLUDED.total_search_time_ms,
+        p50_search_time_ms = EXCLUDED.p50_search_time_ms,
+        p95_search_time_ms = EXCLUDED.p95_search_time_ms,
+        search_time_histogram = EXCLUDED.search_time_histogram,
+        last_searched = EXCLUDED.last_searched;
+
+    INSERT INTO search_rollup_daily (
+        day, search_type, origin, destination, search_count, cache_hits,
+        zero_results, total_search_time_ms, p50_search_time_ms, p95_search_time_ms,
+        search_time_histogram, last_searched
+    )
+    SELECT
+        day, search_type, origin, destination, search_count, cache_hits,
+        zero_results, total_search_time_ms,
+        histogram_percentile(hist, 0.5),
+        histogram_percentile(hist, 0.95),
+        hist, last_searched
+    FROM (
+        SELECT
+            (bucket_start AT TIME ZONE 'UTC')::DATE AS day,
+            search_type,
+            origin,
+            destination,
+            SUM(search_count) AS search_count,
+            SUM(cache_hits) AS cache_hits,
+            SUM(zero_results) AS zero_results,
+            SUM(total_search_time_ms) AS total_search_time_ms,
+            sum_histograms(search_time_histogram) AS hist,
+            MAX(last_searched) AS last_searched
+        FROM search_rollup_hourly
+        WHERE bucket_start >= date_trunc('day', from_hour AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+            AND bucket_start < to_hour
+        GROUP BY 1, 2, 3, 4
+    ) days
+    ON CONFLICT (day, search_type, origin, destination) DO UPDATE SET
+        search_count = EXCLUDED.search_count,
+        cache_hits = EXCLUDED.cache_hits,
+        zero_results = EXCLUDED.zero_results,
+        total_search_time_ms = EXCLUDED.total_search_time_ms,
+        p50_search_time_ms = EXCLUDED.p50_search_time_ms,
+        p95_search_time_ms = EXCLUDED.p95_search_time_ms,
+        search_time_histogram = EXCLUDED.search_time_histogram,
+        last_searched = EXCLUDED.last_searched;
+
+    INSERT INTO search_rollup_state (name, rolled_up_to)
+    VALUES ('search_logs', date_trunc('hour', NOW()))
+    ON CONFLICT (name) DO UPDATE SET rolled_up_to = EXCLUDED.rolled_up_to;
+
+    RETURN (EXTRACT(EPOCH FROM to_hour - from_hour) / 3600)::INTEGER;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE INDEX IF NOT EXISTS idx_search_rollup_daily_type_day ON search_rollup_daily(search_type, day);
+
+-- Run the incremental rollup every 5 minutes (if using pg_cron), or call
+-- backend/scripts/refresh_search_rollups.py from any scheduler
+-- SELECT cron.schedule('refresh-search-rollups', '*/5 * * * *', 'SELECT refresh_search_rollups();');
+
+-- Create popular_routes view for caching optimization (reads the daily rollup)
 CREATE OR REPLACE VIEW popular_routes AS
 SELECT 
     origin,
     destination,
-    COUNT(*) as search_count,
-    AVG(search_time_ms) as avg_search_time,
-    MAX(created_at) as last_searched
-FROM search_logs 
+    SUM(search_count) as search_count,
+    SUM(total_search_time_ms)::NUMERIC / SUM(search_count) as avg_search_time,
+    MAX(last_searched) as last_searched,
+    SUM(cache_hits)::NUMERIC / SUM(search_count) as cache_hit_ratio,
+    SUM(zero_results)::NUMERIC / SUM(search_count) as zero_result_rate,
+    histogram_percentile(sum_histograms(search_time_histogram), 0.5) as p50_search_time,
+    histogram_percentile(sum_histograms(search_time_histogram), 0.95) as p95_search_time
+FROM search_rollup_daily 
 WHERE search_type = 'flights' 
-    AND created_at >= NOW() - INTERVAL '7 days'
+    AND day >= (NOW() AT TIME ZONE 'UTC')::DATE - 7
 GROUP BY origin, destination
 ORDER BY search_count DESC;
 
--- Create popular_destinations view
+-- Create popular_destinations view (reads the daily rollup)
 CREATE OR REPLACE VIEW popular_destinations AS
 SELECT 
-    destination_city,
-    COUNT(*) as search_count,
-    AVG(search_time_ms) as avg_search_time,
-    MAX(created_at) as last_searched
-FROM search_logs 
+    destination as destination_city,
+    SUM(search_count) as search_count,
+    SUM(total_search_time_ms)::NUMERIC / SUM(search_count) as avg_search_time,
+    MAX(last_searched) as last_searched,
+    SUM(cache_hits)::NUMERIC / SUM(search_count) as cache_hit_ratio,
+    SUM(zero_results)::NUMERIC / SUM(search_count) as zero_result_rate,
+    histogram_percentile(sum_histograms(search_time_histogram), 0.5) as p50_search_time,
+    histogram_percentile(sum_histograms(search_time_histogram), 0.95) as p95_search_time
+FROM search_rollup_daily 
 WHERE search_type = 'hotels' 
-    AND created_at >= NOW() - INTERVAL '7 days'
-GROUP BY destination_city
+    AND day >= (NOW() AT TIME ZONE 'UTC')::DATE - 7
+GROUP BY destination
 ORDER BY search_count DESC;
 
--- Create function to clean old search logs (keep last 30 days)
+-- Create function to clean old search logs (keep last 30 days). Drops whole
+-- daily partitions, and only those already folded into the rollups; returns
+-- the number of partitions dropped. Hourly rollups are kept 90 days and daily
+-- rollups indefinitely.
 CREATE OR REPLACE FUNCTION clean_old_search_logs()
 RETURNS INTEGER AS $$
+DECLARE
+    dropped_count INTEGER;
+BEGIN
+    dropped_count := drop_old_search_log_partitions(30);
+
+    DELETE FROM search_rollup_hourly
+    WHERE bucket_start < NOW() - INTERVAL '90 days';
+
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create scheduled job to run cleanup weekly (if using pg_cron)
+-- SELECT cron.schedule('clean-search-logs', '0 2 * * 0', 'SELECT clean_old_search_logs();');
+
+-- ─────────────────────────────
+-- Route price history
+-- ─────────────────────────────
+-- Every one-way search fetched from the providers appends one observation for
+-- the whole result set (airline = '') and one per validating airline. Raw
+-- points are append-only and ordered by observed_at, so BRIN indexes stay a
+-- few pages while indexing the whole table. refresh_route_price_rollups()
+-- downsamples them to hourly and daily buckets, which the price-trend API
+-- reads; raw points are kept 7 days and hourly buckets 30.
+CREATE TABLE IF NOT EXISTS route_price_observations (
+    observed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    origin VARCHAR(3) NOT NULL,
+    destination VARCHAR(3) NOT NULL,
+    departure_date DATE NOT NULL,
+    cabin_class VARCHAR(20) NOT NULL,
+    airline VARCHAR(3) NOT NULL DEFAULT '',
+    min_price_usd NUMERIC(10, 2) NOT NULL,
+    median_price_usd NUMERIC(10, 2) NOT NULL,
+    offers INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_route_price_observations_observed
+ON route_price_observations USING BRIN (observed_at);
+
+-- Hourly/daily buckets of observation time per route, departure date, cabin
+-- and airline. Sums are kept alongside the averages so buckets merge exactly.
+CREATE TABLE IF NOT EXISTS route_price_hourly (
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    origin VARCHAR(3) NOT NULL,
+    destination VARCHAR(3) NOT NULL,
+    departure_date DATE NOT NULL,
+    cabin_class VARCHAR(20) NOT NULL,
+    airline VARCHAR(3) NOT NULL DEFAULT '',
+    observations INTEGER NOT NULL,
+    low_price_usd NUMERIC(10, 2) NOT NULL,
+    high_price_usd NUMERIC(10, 2) NOT NULL,
+    close_price_usd NUMERIC(10, 2) NOT NULL,
+    sum_min_price_usd NUMERIC(14, 2) NOT NULL,
+    sum_median_price_usd NUMERIC(14, 2) NOT NULL,
+    PRIMARY KEY (origin, destination, cabin_class, departure_date, airline, bucket_start)
+);
+
+CREATE TABLE IF NOT EXISTS route_price_daily (
+    day DATE NOT NULL,
+    origin VARCHAR(3) NOT NULL,
+    destination VARCHAR(3) NOT NULL,
+    departure_date DATE NOT NULL,
+    cabin_class VARCHAR(20) NOT NULL,
+    airline VARCHAR(3) NOT NULL DEFAULT '',
+    observations INTEGER NOT NULL,
+    low_price_usd NUMERIC(10, 2) NOT NULL,
+    high_price_usd NUMERIC(10, 2) NOT NULL,
+    close_price_usd NUMERIC(10, 2) NOT NULL,
+    sum_min_price_usd NUMERIC(14, 2) NOT NULL,
+    sum_median_price_usd NUMERIC(14, 2) NOT NULL,
+    PRIMARY KEY (origin, destination, cabin_class, departure_date, airline, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_route_price_hourly_bucket
+ON route_price_hourly USING BRIN (bucket_start);
+
+-- Downsample new observations, the same way refresh_search_rollups() does:
+-- whole hours from the watermark minus one hour, then the days they touch.
+-- low/high are the lowest and highest minimum fare seen in the bucket and
+-- close the latest one. Returns the number of hours refreshed.
+CREATE OR REPLACE FUNCTION refresh_route_price_rollups()
+RETURNS INTEGER AS $$
+DECLARE
+    watermark TIMESTAMP WITH TIME ZONE;
+    from_hour TIMESTAMP WITH TIME ZONE;
+    to_hour TIMESTAMP WITH TIME ZONE := date_trunc('hour', NOW()) + INTERVAL '1 hour';
+BEGIN
+    SELECT rolled_up_to INTO watermark
+    FROM search_rollup_state WHERE name = 'route_price_observations'
+    FOR UPDATE;
+
+    IF watermark IS NULL THEN
+        SELECT date_trunc('hour', MIN(observed_at)) INTO from_hour
+        FROM route_price_observations;
+        IF from_hour IS NULL THEN
+            RETURN 0;
+        END IF;
+    ELSE
+        from_hour := watermark - INTERVAL '1 hour';
+    END IF;
+
+    INSERT INTO route_price_hourly (
+        bucket_start, origin, destination, departure_date, cabin_class, airline,
+        observations, low_price_usd, high_price_usd, close_price_usd,
+        sum_min_price_usd, sum_median_price_usd
+    )
+    SELECT
+        date_trunc('hour', observed_at),
+        origin, destination, departure_date, cabin_class, airline,
+        COUNT(*),
+        MIN(min_price_usd),
+        MAX(min_price_usd),
+        (array_agg(min_price_usd ORDER BY observed_at DESC))[1],
+        SUM(min_price_usd),
+        SUM(median_price_usd)
+    FROM route_price_observations
+    WHERE observed_at >= from_hour AND observed_at < to_hour
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ON CONFLICT (origin, destination, cabin_class, departure_date, airline, bucket_start)
+    DO UPDATE SET
+        observations = EXCLUDED.observations,
+        low_price_usd = EXCLUDED.low_price_usd,
+        high_price_usd = EXCLUDED.high_price_usd,
+        close_price_usd = EXCLUDED.close_price_usd,
+        sum_min_price_usd = EXCLUDED.sum_min_price_usd,
+        sum_median_price_usd = EXCLUDED.sum_median_price_usd;
+
+    INSERT INTO route_price_daily (
+        day, origin, destination, departure_date, cabin_class, airline,
+        observations, low_price_usd, high_price_usd, close_price_usd,
+        sum_min_price_usd, sum_median_price_usd
+    )
+    SELECT
+        (bucket_start AT TIME ZONE 'UTC')::DATE,
+        origin, destination, departure_date, cabin_class, airline,
+        SUM(observations),
+        MIN(low_price_usd),
+        MAX(high_price_usd),
+        (array_agg(close_price_usd ORDER BY bucket_start DESC))[1],
+        SUM(sum_min_price_usd),
+        SUM(sum_median_price_usd)
+    FROM route_price_hourly
+    WHERE bucket_start >= date_trunc('day', from_hour AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        AND bucket_start < to_hour
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ON CONFLICT (origin, destination, cabin_class, departure_date, airline, day)
+    DO UPDATE SET
+        observations = EXCLUDED.observations,
+        low_price_usd = EXCLUDED.low_price_usd,
+        high_price_usd = EXCLUDED.high_price_usd,
+        close_price_usd = EXCLUDED.close_price_usd,
+        sum_min_price_usd = EXCLUDED.sum_min_price_usd,
+        sum_median_price_usd = EXCLUDED.sum_median_price_usd;
+
+    INSERT INTO search_rollup_state (name, rolled_up_to)
+    VALUES ('route_price_observations', date_trunc('hour', NOW()))
+    ON CONFLICT (name) DO UPDATE SET rolled_up_to = EXCLUDED.rolled_up_to;
+
+    RETURN (EXTRACT(EPOCH FROM to_hour - from_hour) / 3600)::INTEGER;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop downsampled raw points after 7 days and hourly buckets after 30.
+-- Observations are ordered by observed_at, so the BRIN index narrows the
+-- delete to the oldest block ranges. Daily buckets for departures that have
+-- flown go after a year. Returns the number of raw points deleted.
+CREATE OR REPLACE FUNCTION clean_old_route_prices()
+RETURNS INTEGER AS $$
 DECLARE
     deleted_count INTEGER;
+    watermark TIMESTAMP WITH TIME ZONE;
 BEGIN
-    DELETE FROM search_logs 
-    WHERE created_at < NOW() - INTERVAL '30 days';
-    
+    SELECT rolled_up_to - INTERVAL '1 hour' INTO watermark
+    FROM search_rollup_state WHERE name = 'route_price_observations';
+    IF watermark IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    DELETE FROM route_price_observations
+    WHERE observed_at < LEAST(NOW() - INTERVAL '7 days', watermark);
     GET DIAGNOSTICS deleted_count = ROW_COUNT;
+
+    DELETE FROM route_price_hourly
+    WHERE bucket_start < NOW() - INTERVAL '30 days';
+
+    DELETE FROM route_price_daily
+    WHERE departure_date < CURRENT_DATE - 365;
+
     RETURN deleted_count;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create scheduled job to run cleanup weekly (if using pg_cron)
--- SELECT cron.schedule('clean-search-logs', '0 2 * * 0', 'SELECT clean_old_search_logs();');
+-- Downsample every 5 minutes and clean up nightly (if using pg_cron), or call
+-- backend/scripts/refresh_search_rollups.py from any scheduler
+-- SELECT cron.schedule('refresh-route-prices', '*/5 * * * *', 'SELECT refresh_route_price_rollups();');
+-- SELECT cron.schedule('clean-route-prices', '30 2 * * *', 'SELECT clean_old_route_prices();');
 
 -- Optional: Create table for caching API responses
 CREATE TABLE IF NOT EXISTS api_cache (
@@ -111,12 +639,39 @@ $$ LANGUAGE plpgsql;
 -- Enable Row Level Security (optional)
 ALTER TABLE search_logs ENABLE ROW LEVEL SECURITY;
 
+-- Policies are dropped first so the schema can be re-applied
+-- (scripts/partition_search_logs.py runs it during migration)
+
 -- Create policy for anonymous access (for logging)
+DROP POLICY IF EXISTS "Allow anonymous insert" ON search_logs;
 CREATE POLICY "Allow anonymous insert" ON search_logs
 FOR INSERT TO anon
 WITH CHECK (true);
 
 -- Create policy for authenticated read access
+DROP POLICY IF EXISTS "Allow authenticated read" ON search_logs;
 CREATE POLICY "Allow authenticated read" ON search_logs
 FOR SELECT TO authenticated
+USING (true);
+
+-- Price history: written by the API like search logs; the downsampled
+-- buckets are public price data
+ALTER TABLE route_price_observations ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow anonymous insert" ON route_price_observations;
+CREATE POLICY "Allow anonymous insert" ON route_price_observations
+FOR INSERT TO anon
+WITH CHECK (true);
+
+ALTER TABLE route_price_hourly ENABLE ROW LEVEL SECURITY;
+ALTER TABLE route_price_daily ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read" ON route_price_hourly;
+CREATE POLICY "Allow public read" ON route_price_hourly
+FOR SELECT TO anon, authenticated
+USING (true);
+
+DROP POLICY IF EXISTS "Allow public read" ON route_price_daily;
+CREATE POLICY "Allow public read" ON route_price_daily
+FOR SELECT TO anon, authenticated
 USING (true);
\ No newline at end of file
@@ -148,7 +148,7 @@ export const useGuides = () => {
 };
 
 // Import types for search functions
-import type { FlightSearchParams, FlightSearchResponse, HotelSearchParams, HotelSearchResponse } from '@/types';
+import type { AirportSuggestion, BatchFlightSearchItem, BatchFlightSearchResponse, FlightSearchParams, FlightSearchResponse, HotelSearchParams, HotelSearchResponse } from '@/types';
 
 // Flight search function
 export async function searchFlights(params: FlightSearchParams): Promise<FlightSearchResponse> {
@@ -167,6 +167,25 @@ export async function searchFlights(params: FlightSearchParams): Promise<FlightS
   return response.json();
 }
 
+// Several flight searches in one request; items come back in the same order,
+// each with a result or, if that search failed, an error
+export async function searchFlightsBatch(searches: FlightSearchParams[], limit = 10): Promise<BatchFlightSearchItem[]> {
+  const response = await fetch(`${API_BASE_URL}/api/v1/flights/search/batch`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ searches, limit }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`Batch flight search failed: ${response.statusText}`);
+  }
+
+  const data: BatchFlightSearchResponse = await response.json();
+  return data.results;
+}
+
 // Hotel search function
 export async function searchHotels(params: HotelSearchParams): Promise<HotelSearchResponse> {
   const response = await fetch(`${API_BASE_URL}/api/v1/hotels/search`, {
@@ -182,4 +201,17 @@ export async function searchHotels(params: HotelSearchParams): Promise<HotelSear
   }
 
   return response.json();
-}
\ No newline at end of file
+}
+
+// Airport autocomplete; responses are cacheable, so repeated keystrokes hit the HTTP cache
+export async function searchAirports(query: string, limit = 8, signal?: AbortSignal): Promise<AirportSuggestion[]> {
+  const params = new URLSearchParams({ query, limit: String(limit) });
+  const response = await fetch(`${API_BASE_URL}/api/v1/flights/airports/search?${params}`, { signal });
+
+  if (!response.ok) {
+    throw new Error(`Airport search failed: ${response.statusText}`);
+  }
+
+  const data = await response.json();
+  return data.airports;
+}
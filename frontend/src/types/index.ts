@@ -5,6 +5,10 @@ export interface Airport {
   country: string
 }
 
+export interface AirportSuggestion extends Airport {
+  type: 'airport' | 'metro'
+}
+
 export interface Airline {
   code: string
   name: string
@@ -31,9 +35,12 @@ export interface Flight {
   stops: number
   price: number
   currency: string
+  price_usd?: number
   deep_link: string
   provider: string
   last_updated: string
+  price_percentile?: number
+  price_label?: 'great_deal' | 'typical' | 'high'
 }
 
 export interface FlightSearchParams {
@@ -47,6 +54,29 @@ export interface FlightSearchParams {
   cabin_class: string
   max_price?: number
   direct_flights_only: boolean
+  nearby_airports?: number
+  nearby_radius_km?: number
+}
+
+export interface FlightFacets {
+  airlines: { code: string; name: string; count: number }[]
+  stops: { stops: number; count: number }[]
+  price_histogram: { min_price: number; max_price: number; count: number }[]
+  departure_hours: number[]
+  min_price?: number
+  max_price?: number
+  min_duration_minutes?: number
+  max_duration_minutes?: number
+}
+
+export interface NearbyAlternative {
+  origin: string
+  destination: string
+  distance_km: number
+  min_price?: number
+  savings?: number
+  flight_count: number
+  cache_hit: boolean
 }
 
 export interface FlightSearchResponse {
@@ -57,6 +87,18 @@ export interface FlightSearchResponse {
   providers: string[]
   cache_hit: boolean
   search_time_ms: number
+  facets?: FlightFacets
+  nearby_alternatives?: NearbyAlternative[]
+}
+
+export interface BatchFlightSearchItem {
+  result?: FlightSearchResponse
+  error?: string
+}
+
+export interface BatchFlightSearchResponse {
+  results: BatchFlightSearchItem[]
+  search_time_ms: number
 }
 
 export interface HotelLocation {
@@ -97,6 +139,8 @@ export interface Hotel {
   price_per_night: number
   total_price: number
   currency: string
+  price_per_night_usd?: number
+  total_price_usd?: number
   room_type: RoomType
   amenities: HotelAmenity[]
   images: HotelImage[]